@@ -0,0 +1,380 @@
+import asyncio
+import heapq
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import insert, select
+from app.config import get_settings
+from app.database import async_session
+from app.models import Alert, AlertRule, Node
+
+logger = logging.getLogger(__name__)
+
+ANY_EVENT = "*"
+
+# Rule kind -> event type it is evaluated on
+RULE_KINDS: Dict[str, str] = {
+    "battery_below": "telemetry",
+    "channel_utilization_above": "telemetry",
+    "geofence_enter": "position",
+    "geofence_leave": "position",
+    "silent": ANY_EVENT,  # Any event from the node resets the timer
+}
+# Geofences only alert on crossing the boundary, not on where a node first shows up
+TRANSITION_KINDS = ("geofence_enter", "geofence_leave")
+
+FIRING = "firing"
+RESOLVED = "resolved"
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + \
+        math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Immutable copy of an ``alert_rules`` row, as the engine uses it."""
+    id: int
+    name: str
+    kind: str
+    node_id: Optional[str]
+    threshold: float
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    consecutive: int = 1
+
+    @classmethod
+    def from_row(cls, row: AlertRule) -> "Rule":
+        return cls(row.id, row.name, row.kind, row.node_id, row.threshold,
+                   row.latitude, row.longitude, max(row.consecutive or 1, 1))
+
+
+class RuleState:
+    """Where one rule stands for one node."""
+
+    __slots__ = ("active", "notified", "primed", "streak", "value")
+
+    def __init__(self, primed: bool):
+        self.active = False
+        self.notified = False  # A firing alert went out, so clearing sends a resolved one
+        self.primed = primed  # False until the first reading of a transition-only rule
+        self.streak = 0  # Consecutive readings disagreeing with ``active``
+        self.value: Optional[float] = None
+
+
+def _event_node(event_type: str, data: dict) -> Optional[str]:
+    node_id = data.get("node_id") or data.get("from_node_id")
+    if node_id is None and event_type == "node_update":
+        node_id = data.get("id")
+    return node_id
+
+
+class AlertEngine:
+    """Evaluates alert rules incrementally as radio events arrive.
+
+    Rules are indexed by (event type, node), with ``None`` for rules on every
+    node, so an event only touches the rules that can fire on it. Each
+    (rule, node) pair keeps a small state: whether it is firing, and how many
+    consecutive readings disagreed. A rule fires, or clears, once
+    ``consecutive`` readings in a row say so, which debounces values
+    hovering around the threshold.
+
+    Silence rules use a min-heap of deadlines like the liveness index: any
+    event from a node pushes its deadline back, and a background tick fires
+    the ones that passed, so no per-node polling is needed.
+
+    Alerts go out as ``alert`` WebSocket events and are stored in the
+    ``alerts`` table from a background task, off the event path.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._rules: Dict[int, Rule] = {}
+        self._index: Dict[Tuple[str, Optional[str]], List[Rule]] = {}
+        self._states: Dict[Tuple[int, str], RuleState] = {}
+        self._heard: Dict[str, float] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._deadline: Dict[Tuple[int, str], float] = {}
+        self._outbox: List[dict] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._evaluated = 0
+        self._fired = 0
+
+    # ----- Rules -----
+
+    def _reindex(self):
+        index: Dict[Tuple[str, Optional[str]], List[Rule]] = {}
+        for rule in self._rules.values():
+            index.setdefault((RULE_KINDS[rule.kind], rule.node_id), []).append(rule)
+        self._index = index
+
+    def set_rules(self, rules: List[Rule]):
+        self._rules = {rule.id: rule for rule in rules}
+        self._states.clear()
+        self._heap.clear()
+        self._deadline.clear()
+        self._reindex()
+        for rule in rules:
+            self._track_silence(rule)
+
+    def set_rule(self, rule: Rule):
+        """Add or replace a rule. Its state starts over."""
+        self.remove_rule(rule.id)
+        self._rules[rule.id] = rule
+        self._reindex()
+        self._track_silence(rule)
+
+    def remove_rule(self, rule_id: int):
+        if self._rules.pop(rule_id, None) is None:
+            return
+        for key in [k for k in self._states if k[0] == rule_id]:
+            del self._states[key]
+        for key in [k for k in self._deadline if k[0] == rule_id]:
+            del self._deadline[key]  # Heap entries without a deadline are skipped
+        self._reindex()
+
+    def _track_silence(self, rule: Rule):
+        if rule.kind != "silent":
+            return
+        now = time.time()
+        nodes = [rule.node_id] if rule.node_id else list(self._heard)
+        for node in nodes:
+            last_heard = self._heard.get(node)
+            if last_heard is None:
+                continue
+            if last_heard + rule.threshold * 60 > now:
+                self._schedule(rule, node, last_heard)
+            else:
+                # Already silent when the rule was loaded: counts as firing, but
+                # only nodes going silent while watched send an alert, so a
+                # restart doesn't re-alert every long-gone node (nor resolve it
+                # when it's heard again)
+                state = self._states[(rule.id, node)] = RuleState(primed=True)
+                state.active = True
+                state.value = round((now - last_heard) / 60, 1)
+
+    async def load(self):
+        """Load enabled rules, and when nodes were last heard for silence rules."""
+        async with async_session() as db:
+            rows = (await db.execute(select(AlertRule).where(AlertRule.enabled == True))).scalars().all()
+            heard = (await db.execute(select(Node.id, Node.last_heard).where(Node.last_heard.isnot(None)))).all()
+        for node_id, last_heard in heard:
+            self._heard.setdefault(node_id, last_heard.timestamp())
+        self.set_rules([Rule.from_row(row) for row in rows if row.kind in RULE_KINDS])
+        logger.info(f"[ALERT] Loaded {len(self._rules)} rules")
+
+    # ----- Evaluation -----
+
+    def process(self, event_type: str, data: dict):
+        """Evaluate the rules an event can affect. Registered as a client manager callback."""
+        node = _event_node(event_type, data)
+        if not node:
+            return
+        now = time.time()
+        self._heard[node] = now  # Also for silence rules added later
+        if not self._rules:
+            return
+
+        for rule in self._index.get((ANY_EVENT, node), []) + self._index.get((ANY_EVENT, None), []):
+            state = self._states.get((rule.id, node))
+            if state is not None and state.active:
+                self._transition(rule, node, state, False, None)
+            self._schedule(rule, node, now)
+
+        rules = self._index.get((event_type, node), []) + self._index.get((event_type, None), [])
+        for rule in rules:
+            reading = self._reading(rule, data)
+            if reading is not None:
+                self._evaluated += 1
+                self._evaluate(rule, node, *reading)
+
+    def _reading(self, rule: Rule, data: dict) -> Optional[Tuple[bool, float]]:
+        """(condition holds, value) for an event, or None if it says nothing about the rule."""
+        kind = rule.kind
+        if kind == "battery_below":
+            value = data.get("battery_level")
+            return None if value is None else (value < rule.threshold, value)
+        if kind == "channel_utilization_above":
+            value = data.get("channel_utilization")
+            return None if value is None else (value > rule.threshold, value)
+        if kind in TRANSITION_KINDS:
+            lat, lon = data.get("latitude"), data.get("longitude")
+            if lat is None or lon is None or rule.latitude is None or rule.longitude is None:
+                return None
+            distance = distance_m(rule.latitude, rule.longitude, lat, lon)
+            inside = distance <= rule.threshold
+            return (inside if kind == "geofence_enter" else not inside), round(distance, 1)
+        return None
+
+    def _evaluate(self, rule: Rule, node: str, condition: bool, value: float):
+        key = (rule.id, node)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = RuleState(primed=rule.kind not in TRANSITION_KINDS)
+        state.value = value
+        if not state.primed:
+            state.primed = True
+            state.active = condition
+            return
+        if condition == state.active:
+            state.streak = 0
+            return
+        state.streak += 1
+        if state.streak >= rule.consecutive:
+            self._transition(rule, node, state, condition, value)
+
+    def _transition(self, rule: Rule, node: str, state: RuleState, active: bool, value: Optional[float]):
+        state.active = active
+        state.streak = 0
+        if not active and not state.notified:
+            return  # Firing was never announced (silent when loaded), so there is nothing to resolve
+        state.notified = active
+        status = FIRING if active else RESOLVED
+        if active:
+            self._fired += 1
+        self._outbox.append({
+            "rule_id": rule.id,
+            "rule": rule.name,
+            "node_id": node,
+            "kind": rule.kind,
+            "status": status,
+            "value": value,
+            "message": self._message(rule, node, status, value),
+            "timestamp": datetime.now().isoformat()
+        })
+        logger.info(f"[ALERT] {rule.name}: {node} {status}")
+        if self._wakeup:
+            self._wakeup.set()
+
+    @staticmethod
+    def _message(rule: Rule, node: str, status: str, value: Optional[float]) -> str:
+        if status == RESOLVED:
+            return f"{node}: {rule.name} cleared"
+        if rule.kind == "battery_below":
+            return f"{node}: battery {value:g}% below {rule.threshold:g}%"
+        if rule.kind == "channel_utilization_above":
+            return f"{node}: channel utilization {value:g}% above {rule.threshold:g}%"
+        if rule.kind == "geofence_enter":
+            return f"{node}: entered geofence '{rule.name}'"
+        if rule.kind == "geofence_leave":
+            return f"{node}: left geofence '{rule.name}' ({value:g} m from center)"
+        return f"{node}: silent for {value:g} minutes"
+
+    # ----- Silence -----
+
+    def _schedule(self, rule: Rule, node: str, last_heard: float):
+        deadline = last_heard + rule.threshold * 60
+        key = (rule.id, node)
+        current = self._deadline.get(key)
+        # An entry already due earlier is rescheduled from the latest time when it pops
+        if current is None or deadline < current:
+            self._deadline[key] = deadline
+            heapq.heappush(self._heap, (deadline, rule.id, node))
+
+    def advance(self, now: Optional[float] = None):
+        """Fire silence rules whose deadline passed."""
+        now = now or time.time()
+        while self._heap and self._heap[0][0] <= now:
+            deadline, rule_id, node = heapq.heappop(self._heap)
+            key = (rule_id, node)
+            if self._deadline.get(key) != deadline:
+                continue  # Superseded, or the rule was removed
+            del self._deadline[key]
+            rule = self._rules[rule_id]
+            last_heard = self._heard[node]
+            if last_heard + rule.threshold * 60 > now:
+                self._schedule(rule, node, last_heard)
+                continue
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = RuleState(primed=True)
+            if not state.active:
+                self._transition(rule, node, state, True, round((now - last_heard) / 60, 1))
+
+    # ----- Output -----
+
+    async def _flush(self):
+        from app.routers.websocket import broadcast
+
+        alerts = self._outbox
+        self._outbox = []
+        for alert in alerts:
+            await broadcast({"type": "alert", "data": alert})
+        try:
+            async with async_session() as db:
+                await db.execute(insert(Alert), [
+                    {**{k: v for k, v in alert.items() if k != "rule"},
+                     "timestamp": datetime.fromisoformat(alert["timestamp"])}
+                    for alert in alerts
+                ])
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"[ALERT] Failed to store {len(alerts)} alerts: {e}")
+
+    async def _run(self):
+        try:
+            await self.load()
+        except Exception as e:
+            logger.error(f"[ALERT] Failed to load rules: {e}")
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.settings.alerts_tick)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                self.advance()
+                if self._outbox:
+                    await self._flush()
+            except Exception as e:
+                logger.error(f"[ALERT] Tick error: {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._outbox:
+            await self._flush()
+
+    # ----- Queries -----
+
+    def active(self) -> List[dict]:
+        """Rule/node pairs currently firing."""
+        return [
+            {"rule_id": rule_id, "rule": self._rules[rule_id].name, "node_id": node,
+             "kind": self._rules[rule_id].kind, "value": state.value}
+            for (rule_id, node), state in self._states.items()
+            if state.active and rule_id in self._rules
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "rules": len(self._rules),
+            "states": len(self._states),
+            "silence_timers": len(self._deadline),
+            "evaluated": self._evaluated,
+            "fired": self._fired
+        }
+
+
+# Singleton instance
+alert_engine = AlertEngine()
@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Advertised by every Meshtastic radio (meshtastic.ble_interface.SERVICE_UUID)
+MESHTASTIC_SERVICE_UUID = "6ba1b218-15a8-461f-9fa8-5dcae273eafd"
+# Seconds before a scanner that failed to start (no adapter, BlueZ busy) is retried
+RETRY_DELAY = 30.0
+
+
+@dataclass
+class Advertisement:
+    name: Optional[str]
+    address: str
+    rssi: Optional[int]
+    meshtastic: bool
+    seen: float  # time.monotonic()
+    device: Any  # bleak BLEDevice, handed to the connect so it doesn't scan again
+
+
+class BleDiscovery:
+    """Background BLE scanner keeping the latest advertisement of each nearby device.
+
+    Scans while any BLE radio wants its device: while connecting and while
+    reconnecting (``acquire``/``release``, or ``wait_for``). Entries older than
+    ``ble_discovery_ttl`` are ignored. A connect uses the cached device
+    instead of the library's own 10 second scan, and a reconnect is woken by
+    the radio's first advertisement after it reboots.
+
+    Scanning pauses while an interface is being opened, since BlueZ adapters
+    often fail to connect while discovering.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._seen: Dict[str, Advertisement] = {}  # Lowercased address -> advertisement
+        self._by_name: Dict[str, str] = {}  # Name -> lowercased address
+        self._waiters: List[Tuple[str, float, asyncio.Future]] = []  # (key, seen after, future)
+        self._users = 0
+        self._pauses = 0
+        self._scanner = None
+        self._started_at: Optional[float] = None
+        self._retry_at = 0.0
+        self._update_lock: Optional[asyncio.Lock] = None
+        self._last_prune = 0.0
+        self._adverts = 0
+        self._woken = 0
+        self._last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.ble_discovery_ttl > 0
+
+    @property
+    def scanning(self) -> bool:
+        return self._scanner is not None
+
+    # ----- Scanner lifecycle -----
+
+    async def _update(self):
+        """Start or stop the scanner to match the current users and pauses."""
+        if self._update_lock is None:
+            self._update_lock = asyncio.Lock()
+        async with self._update_lock:
+            want = self.enabled and self._users > 0 and self._pauses == 0
+            if want and self._scanner is None and time.monotonic() >= self._retry_at:
+                from bleak import BleakScanner
+                scanner = BleakScanner(detection_callback=self._on_advertisement)
+                try:
+                    await scanner.start()
+                except Exception as e:
+                    self._last_error = str(e)
+                    self._retry_at = time.monotonic() + RETRY_DELAY
+                    logger.warning(f"[BLE] Discovery scanner failed to start: {e}")
+                    return
+                self._scanner = scanner
+                self._started_at = time.monotonic()
+                self._last_error = None
+                logger.info("[BLE] Discovery scanner started")
+            elif not want and self._scanner is not None:
+                scanner, self._scanner, self._started_at = self._scanner, None, None
+                try:
+                    await scanner.stop()
+                except Exception as e:
+                    logger.debug(f"[BLE] Discovery scanner stop failed: {e}")
+                logger.info("[BLE] Discovery scanner stopped")
+
+    async def acquire(self):
+        """Keep scanning until the matching ``release``."""
+        self._users += 1
+        await self._update()
+
+    async def release(self):
+        self._users = max(0, self._users - 1)
+        await self._update()
+
+    async def pause(self):
+        """Stop scanning until the matching ``resume``, e.g. while opening a BLE interface."""
+        self._pauses += 1
+        await self._update()
+
+    async def resume(self):
+        self._pauses = max(0, self._pauses - 1)
+        await self._update()
+
+    async def stop(self):
+        self._users = 0
+        await self._update()
+        for _, _, future in self._waiters:
+            if not future.done():
+                future.set_result(None)
+        self._waiters.clear()
+
+    # ----- Advertisements -----
+
+    def _on_advertisement(self, device, advertisement_data):
+        """bleak detection callback, called on the event loop."""
+        now = time.monotonic()
+        name = advertisement_data.local_name or device.name
+        key = device.address.lower()
+        uuids = advertisement_data.service_uuids or ()
+        entry = Advertisement(
+            name=name,
+            address=device.address,
+            rssi=advertisement_data.rssi,
+            meshtastic=MESHTASTIC_SERVICE_UUID in uuids or bool(name and "Meshtastic" in name),
+            seen=now,
+            device=device
+        )
+        self._seen[key] = entry
+        if name:
+            self._by_name[name] = key
+        self._adverts += 1
+
+        if self._waiters:
+            pending = []
+            for waiter in self._waiters:
+                target, after, future = waiter
+                if future.done():
+                    continue
+                if target in (key, name) and now > after:
+                    future.set_result(entry)
+                    self._woken += 1
+                else:
+                    pending.append(waiter)
+            self._waiters = pending
+
+        if now - self._last_prune > self.settings.ble_discovery_ttl:
+            self._prune(now)
+
+    def _prune(self, now: float):
+        self._last_prune = now
+        cutoff = now - self.settings.ble_discovery_ttl
+        for key in [key for key, entry in self._seen.items() if entry.seen < cutoff]:
+            del self._seen[key]
+        for name in [name for name, key in self._by_name.items() if key not in self._seen]:
+            del self._by_name[name]
+
+    def lookup(self, target: Optional[str]) -> Optional[Advertisement]:
+        """Latest fresh advertisement of a device, by name or address.
+
+        Safe to call from the connect thread pool.
+        """
+        if not target or not self.enabled:
+            return None
+        key = self._by_name.get(target) or target.lower()
+        entry = self._seen.get(key)
+        if entry is None or time.monotonic() - entry.seen > self.settings.ble_discovery_ttl:
+            return None
+        return entry
+
+    async def wait_for(self, target: str, timeout: float, after: Optional[float] = None) -> Optional[Advertisement]:
+        """Advertisement of ``target`` seen after ``after`` (any fresh one if None).
+
+        Scans while waiting. Returns None if it isn't heard within ``timeout``,
+        or right away if the scanner can't be started.
+        """
+        if after is None:
+            entry = self.lookup(target)
+            if entry is not None:
+                return entry
+            after = 0.0
+        future = asyncio.get_running_loop().create_future()
+        # Names are matched as advertised, addresses lowercased
+        self._waiters.append((target.lower() if _is_address(target) else target, after, future))
+        await self.acquire()
+        try:
+            if not self.scanning and self._pauses == 0:
+                return None  # The scanner failed to start, so nothing can arrive
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._waiters = [waiter for waiter in self._waiters if waiter[2] is not future]
+            await self.release()
+
+    def covers(self, duration: float) -> bool:
+        """Whether the cache holds everything a ``duration`` second scan would find."""
+        return (self._started_at is not None
+                and time.monotonic() - self._started_at >= min(duration, self.settings.ble_discovery_ttl))
+
+    def devices(self, max_age: Optional[float] = None) -> List[Advertisement]:
+        """Advertisements heard within ``max_age`` seconds (default: the TTL)."""
+        now = time.monotonic()
+        ttl = self.settings.ble_discovery_ttl
+        max_age = min(max_age, ttl) if max_age is not None else ttl
+        return [entry for entry in self._seen.values() if now - entry.seen <= max_age]
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "enabled": self.enabled,
+            "scanning": self.scanning,
+            "scanning_for": round(now - self._started_at, 1) if self._started_at is not None else None,
+            "users": self._users,
+            "paused": self._pauses > 0,
+            "devices": [
+                {"name": entry.name, "address": entry.address, "rssi": entry.rssi,
+                 "meshtastic": entry.meshtastic, "age": round(now - entry.seen, 1)}
+                for entry in sorted(self.devices(), key=lambda entry: entry.seen, reverse=True)
+                if entry.meshtastic
+            ],
+            "advertisements": self._adverts,
+            "woken": self._woken,  # Waits ended early by an advertisement
+            "last_error": self._last_error
+        }
+
+
+_interface_class = None
+
+
+def ble_interface_class():
+    """meshtastic BLEInterface that connects to a cached advertisement instead of scanning first."""
+    global _interface_class
+    if _interface_class is None:
+        from meshtastic.ble_interface import BLEInterface
+
+        class DiscoveredBLEInterface(BLEInterface):
+            def find_device(self, address):
+                entry = ble_discovery.lookup(address)
+                if entry is not None:
+                    logger.info(f"[BLE] Using cached advertisement of {address} at {entry.address}")
+                    return entry.device
+                return super().find_device(address)
+
+        _interface_class = DiscoveredBLEInterface
+    return _interface_class
+
+
+def _is_address(target: str) -> bool:
+    """BLE MAC address, or a CoreBluetooth UUID on macOS."""
+    return target.count(":") == 5 or target.count("-") == 4
+
+
+# Singleton instance
+ble_discovery = BleDiscovery()
@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.database import async_session
+from app.models import Message
+from app.projections import message_tags
+from app.response_cache import response_cache
+from app.client_manager import client_manager
+from app.send_scheduler import Priority, QueueFullError
+
+logger = logging.getLogger(__name__)
+
+# Job states
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+FINISHED_STATES = (COMPLETED, CANCELLED, FAILED)
+
+# Seconds to wait before retrying when the outbound queue is full
+QUEUE_FULL_RETRY_DELAY = 2.0
+
+
+class BroadcastJob:
+    """A "send a DM to every node" run that can be polled, cancelled and resumed."""
+
+    def __init__(self, text: str, channel: int, targets: List[Tuple[str, str]],
+                 skipped: int, delay_seconds: float):
+        self.id = uuid.uuid4().hex[:12]
+        self.text = text
+        self.channel = channel
+        self.targets = targets  # (node_id, display name)
+        self.skipped = skipped
+        self.delay_seconds = delay_seconds
+        self.results: Dict[str, bool] = {}  # node_id -> delivered to radio
+        self.status = PENDING
+        self.error: Optional[str] = None
+        self.current_node: Optional[str] = None
+        self.current_node_id: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def total(self) -> int:
+        return len(self.targets)
+
+    @property
+    def sent(self) -> int:
+        return sum(1 for ok in self.results.values() if ok)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for ok in self.results.values() if not ok)
+
+    @property
+    def remaining(self) -> List[Tuple[str, str]]:
+        return [t for t in self.targets if self.results.get(t[0]) is not True]
+
+    def progress(self) -> dict:
+        """Payload for the broadcast_progress WebSocket event."""
+        return {
+            "job_id": self.id,
+            "status": "sending" if self.status == RUNNING else self.status,
+            "total": self.total,
+            "current": len(self.results),
+            "sent": self.sent,
+            "failed": self.failed,
+            "current_node": self.current_node,
+            "current_node_id": self.current_node_id
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "text": self.text,
+            "channel": self.channel,
+            "status": self.status,
+            "total": self.total,
+            "processed": len(self.results),
+            "sent": self.sent,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class BroadcastJobManager:
+    """Runs broadcast-all jobs in the background.
+
+    Sends are bounded by ``broadcast_concurrency`` and queued at BULK priority,
+    so operator DMs and channel broadcasts still jump ahead in the outbound
+    scheduler. Progress is coalesced to one WebSocket update per
+    ``broadcast_progress_interval`` and outgoing Message rows are written in
+    batches instead of one session per message.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._jobs: "OrderedDict[str, BroadcastJob]" = OrderedDict()
+
+    def get(self, job_id: str) -> Optional[BroadcastJob]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[BroadcastJob]:
+        return list(reversed(self._jobs.values()))
+
+    def start(self, text: str, targets: List[Tuple[str, str]], skipped: int,
+              channel: int = 0, delay_seconds: float = 0.0) -> BroadcastJob:
+        job = BroadcastJob(text, channel, targets, skipped, delay_seconds)
+        self._jobs[job.id] = job
+        self._prune()
+        self._launch(job)
+        logger.info(f"[BCAST] Job {job.id} started: {job.total} nodes")
+        return job
+
+    def cancel(self, job_id: str) -> Optional[BroadcastJob]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if job.task and not job.task.done():
+            job.task.cancel()
+        elif job.status == PENDING:
+            job.status = CANCELLED
+        return job
+
+    def resume(self, job_id: str) -> Optional[BroadcastJob]:
+        """Restart a finished job, sending only to nodes that didn't get the message."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if job.status in (PENDING, RUNNING):
+            return job
+
+        # Forget failures so they are retried; keep successful sends
+        job.results = {node_id: ok for node_id, ok in job.results.items() if ok}
+        job.error = None
+        job.finished_at = None
+        self._launch(job)
+        logger.info(f"[BCAST] Job {job.id} resumed: {len(job.remaining)} nodes remaining")
+        return job
+
+    def _launch(self, job: BroadcastJob):
+        job.status = RUNNING
+        job.task = asyncio.create_task(self._run(job))
+
+    def _prune(self):
+        """Keep a bounded history of finished jobs."""
+        while len(self._jobs) > self.settings.broadcast_job_history:
+            for job_id, job in self._jobs.items():
+                if job.status in FINISHED_STATES:
+                    del self._jobs[job_id]
+                    break
+            else:
+                return
+
+    async def _run(self, job: BroadcastJob):
+        from app.routers.websocket import broadcast
+
+        job.started_at = job.started_at or datetime.now()
+        semaphore = asyncio.Semaphore(max(1, self.settings.broadcast_concurrency))
+        pending_rows: List[Message] = []
+        last_progress = 0.0
+        last_flush = time.monotonic()
+        my_node_num = client_manager.my_node_num
+        my_node_id = f"!{my_node_num:08x}" if my_node_num else None
+
+        async def publish(force: bool = False):
+            nonlocal last_progress
+            now = time.monotonic()
+            if force or now - last_progress >= self.settings.broadcast_progress_interval:
+                last_progress = now
+                await broadcast({"type": "broadcast_progress", "data": job.progress()})
+
+        async def flush(force: bool = False):
+            nonlocal last_flush
+            if not pending_rows:
+                return
+            if not force and len(pending_rows) < self.settings.broadcast_db_batch_size \
+                    and time.monotonic() - last_flush < self.settings.broadcast_progress_interval:
+                return
+            rows = pending_rows[:]
+            pending_rows.clear()
+            last_flush = time.monotonic()
+            try:
+                async with async_session() as db:
+                    db.add_all(rows)
+                    await db.commit()
+                response_cache.invalidate(message_tags(job.channel))
+            except Exception as e:
+                # Messages were sent, just not saved - don't count as failed
+                logger.warning(f"[BCAST] Failed to save {len(rows)} messages to DB: {e}")
+
+        async def send_one(node_id: str, node_name: str):
+            async with semaphore:
+                job.current_node = node_name
+                job.current_node_id = node_id
+                while True:
+                    if not client_manager.connected:
+                        raise ConnectionError("Not connected to device")
+                    try:
+                        success = await client_manager.send_message(
+                            text=job.text,
+                            destination=node_id,
+                            channel=job.channel,
+                            priority=Priority.BULK
+                        )
+                        break
+                    except QueueFullError:
+                        await asyncio.sleep(QUEUE_FULL_RETRY_DELAY)
+
+                job.results[node_id] = success
+                if success:
+                    pending_rows.append(Message(
+                        from_node_id=my_node_id,
+                        to_node_id=node_id,
+                        channel=job.channel,
+                        text=job.text,
+                        timestamp=datetime.now(),  # Same local clock as received messages
+                        is_outgoing=True
+                    ))
+                await publish()
+                await flush()
+
+                if job.delay_seconds > 0:
+                    await asyncio.sleep(job.delay_seconds)
+
+        await broadcast({"type": "broadcast_progress", "data": {**job.progress(), "status": "started"}})
+
+        tasks = [asyncio.create_task(send_one(node_id, name)) for node_id, name in job.remaining]
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            errors = [r for r in results if isinstance(r, Exception)]
+            if errors:
+                job.status = FAILED
+                job.error = str(errors[0])
+            else:
+                job.status = COMPLETED
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            job.status = CANCELLED
+        finally:
+            job.finished_at = datetime.now()
+            job.current_node = None
+            job.current_node_id = None
+            await flush(force=True)
+            await publish(force=True)
+            logger.info(f"[BCAST] Job {job.id} {job.status}: sent={job.sent}, failed={job.failed}")
+
+
+# Singleton instance
+broadcast_jobs = BroadcastJobManager()
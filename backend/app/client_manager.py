@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.events import RadioEvent, ConnectionEvent
+from app.meshtastic_client import MeshtasticClient, parse_device_spec
+from app.send_scheduler import Priority
+from app.traceroute_manager import traceroute_manager
+
+logger = logging.getLogger(__name__)
+
+# Connection event fields that describe a radio's reconnect state. They are only
+# surfaced at the top level when no radio is connected.
+RECONNECT_FIELDS = ("reconnecting", "attempt", "max_attempts", "reconnect_failed", "unexpected", "reset")
+
+
+class ClientManager:
+    """Runs one MeshtasticClient per gateway radio and presents a merged mesh.
+
+    - Each radio has its own interface and ingest queue/thread.
+    - Packets heard by more than one radio are delivered once (deduplicated on
+      sender + packet id within ``packet_dedup_window``).
+    - Node DBs are merged, keeping the freshest entry per node.
+    - Outbound messages go through the radio with the best path to the
+      destination (fewest hops, then best SNR, then most recently heard).
+    - Every event is tagged with the ``radio`` that received it.
+
+    The first configured radio is the primary: it is used for broadcasts and
+    its identity is reported as "my node".
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.clients: List[MeshtasticClient] = []
+        self._event_callbacks: List[Callable] = []
+        self._seen: "OrderedDict[Tuple, float]" = OrderedDict()
+        self._seen_lock = threading.Lock()
+        self._duplicates = 0
+
+        # Primary radio uses the configured transport; extras carry their own prefix
+        self._add_client(MeshtasticClient())
+        seen = {(self.clients[0].transport, self.clients[0].device_name)}
+        if self.settings.meshtastic_extra_devices:
+            for spec in self.settings.meshtastic_extra_devices.split(","):
+                if not spec.strip():
+                    continue
+                transport, target = parse_device_spec(spec.strip())
+                if (transport, target) in seen:
+                    continue
+                seen.add((transport, target))
+                self._add_client(MeshtasticClient(device_name=target, transport=transport))
+
+    def _add_client(self, client: MeshtasticClient):
+        client.packet_filter = self._accept_packet
+
+        async def on_event(event_type: str, data: RadioEvent, _client=client):
+            await self._dispatch(_client, event_type, data)
+
+        client.add_event_callback(on_event)
+        self.clients.append(client)
+
+    # ----- Radio selection -----
+
+    @property
+    def primary(self) -> MeshtasticClient:
+        """First connected radio, else the first configured one."""
+        for client in self.clients:
+            if client.connected:
+                return client
+        return self.clients[0]
+
+    def get_client(self, radio_id: str) -> Optional[MeshtasticClient]:
+        for client in self.clients:
+            if client.radio_id == radio_id:
+                return client
+        return None
+
+    def route_for(self, destination: Optional[str]) -> MeshtasticClient:
+        """Pick the radio with the best path to ``destination``."""
+        if not destination:
+            return self.primary
+
+        best = None
+        best_key = None
+        for client in self.clients:
+            if not client.connected:
+                continue
+            node = (client.nodes or {}).get(destination)
+            if not isinstance(node, dict):
+                continue
+            hops = node.get("hopsAway")
+            key = (
+                hops if hops is not None else 99,
+                -(node.get("snr") if node.get("snr") is not None else -99.0),
+                -(node.get("lastHeard") or 0)
+            )
+            if best_key is None or key < best_key:
+                best, best_key = client, key
+
+        return best or self.primary
+
+    # ----- Dedup and event fan-out -----
+
+    def _accept_packet(self, client: MeshtasticClient, packet: dict) -> bool:
+        """Called on each radio's ingest thread. False for packets already seen."""
+        if len(self.clients) == 1:
+            return True
+
+        packet_id = packet.get("id")
+        sender = packet.get("from")
+        if not packet_id or sender is None:
+            return True
+
+        key = (sender, packet_id)
+        now = time.monotonic()
+        with self._seen_lock:
+            # Expire old entries (oldest first)
+            while self._seen:
+                oldest_key, seen_at = next(iter(self._seen.items()))
+                if now - seen_at < self.settings.packet_dedup_window:
+                    break
+                self._seen.popitem(last=False)
+
+            if key in self._seen:
+                self._duplicates += 1
+                return False
+            self._seen[key] = now
+            return True
+
+    def add_event_callback(self, callback: Callable):
+        self._event_callbacks.append(callback)
+
+    def remove_event_callback(self, callback: Callable):
+        if callback in self._event_callbacks:
+            self._event_callbacks.remove(callback)
+
+    async def _dispatch(self, client: MeshtasticClient, event_type: str, data: RadioEvent):
+        if event_type == "connection":
+            # Report the merged status so one radio dropping doesn't look like a full disconnect
+            radio_status = data.status
+            status = {**self.get_connection_status(), "radio_status": radio_status}
+            if not self.connected:
+                for field in RECONNECT_FIELDS:
+                    if field in radio_status:
+                        status[field] = radio_status[field]
+            data = ConnectionEvent(status, data.ts_ms)
+
+        data.set_radio(client.radio_id)
+
+        for callback in self._event_callbacks:
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(event_type, data)
+                else:
+                    callback(event_type, data)
+            except Exception as e:
+                logger.error(f"Error in event callback: {e}")
+
+    # ----- Client-compatible API -----
+
+    @property
+    def connected(self) -> bool:
+        return any(client.connected for client in self.clients)
+
+    @property
+    def my_node_num(self) -> Optional[int]:
+        return self.primary.my_node_num
+
+    @property
+    def my_node_nums(self) -> List[int]:
+        return [c.my_node_num for c in self.clients if c.connected and c.my_node_num is not None]
+
+    @property
+    def interface(self):
+        return self.primary.interface
+
+    @property
+    def last_error(self) -> Optional[str]:
+        errors = [f"{c.radio_id}: {c.last_error}" for c in self.clients if c.last_error and not c.connected]
+        if len(self.clients) == 1:
+            return self.clients[0].last_error
+        return "; ".join(errors) or None
+
+    @property
+    def last_scan_result(self) -> Optional[dict]:
+        return self.primary.last_scan_result
+
+    @property
+    def close_failed(self) -> bool:
+        return any(client._close_failed for client in self.clients)
+
+    async def connect(self) -> bool:
+        """Connect every configured radio. True if at least one connected."""
+        for client in self.clients:
+            if not client.connected:
+                await client.connect()
+        return self.connected
+
+    async def disconnect(self):
+        await asyncio.gather(*(client.disconnect() for client in self.clients))
+
+    async def reset_ble(self) -> dict:
+        results = {}
+        for client in self.clients:
+            results[client.radio_id] = await client.reset_ble()
+        primary = results[self.clients[0].radio_id]
+        if len(self.clients) == 1:
+            return primary
+        return {**primary, "radios": results}
+
+    async def scan_ble_devices(self, timeout: float = 10.0) -> dict:
+        # Scanning is adapter-wide; report against the first BLE radio's configured name
+        client = next((c for c in self.clients if c.is_ble), self.clients[0])
+        return await client.scan_ble_devices(timeout)
+
+    def device_config(self, radio: Optional[str] = None):
+        """(client, config cache) for ``radio``, or the primary radio."""
+        client = self.get_client(radio) if radio else self.primary
+        if client is None:
+            return None, None
+        return client, client.config_cache
+
+    def get_connection_status(self) -> dict:
+        status = self.primary.get_connection_status()
+        status["connected"] = self.connected
+        if len(self.clients) > 1:
+            status["radios"] = [client.get_connection_status() for client in self.clients]
+        return status
+
+    def get_nodes(self) -> dict:
+        """Merged node DB across radios, keeping the most recently heard entry."""
+        connected = [c for c in self.clients if c.connected]
+        if len(connected) <= 1:
+            return connected[0].get_nodes() if connected else {}
+
+        merged: Dict[str, dict] = {}
+        heard_by: Dict[str, List[str]] = {}
+        for client in connected:
+            for node_id, node in client.get_nodes().items():
+                heard_by.setdefault(node_id, []).append(client.radio_id)
+                current = merged.get(node_id)
+                if current is None or (node.get("lastHeard") or 0) > (current.get("lastHeard") or 0):
+                    merged[node_id] = node
+
+        return {
+            node_id: {**node, "heardBy": heard_by[node_id]}
+            for node_id, node in merged.items()
+        }
+
+    async def send_message(self, text: str, destination: Optional[str] = None, channel: int = 0,
+                           priority: Optional[Priority] = None) -> bool:
+        client = self.route_for(destination)
+        return await client.send_message(text, destination, channel, priority)
+
+    async def send_traceroute(self, destination: str, hop_limit: int = 3, channel: int = 0) -> bool:
+        client = self.route_for(destination)
+        return await client.send_traceroute(destination, hop_limit, channel)
+
+    def start_traceroute(self, destination: str, hop_limit: int, channel: int) -> Tuple[asyncio.Task, bool]:
+        """Start (or join) a traceroute through the best radio. See TracerouteManager.start."""
+        return traceroute_manager.start(self.route_for(destination), destination, hop_limit, channel)
+
+    def stats(self) -> dict:
+        return {
+            "duplicates_dropped": self._duplicates,
+            "radios": {
+                client.radio_id: {"connected": client.connected, **client.ingest_stats()}
+                for client in self.clients
+            }
+        }
+
+
+# Singleton instance
+client_manager = ClientManager()
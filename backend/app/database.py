@@ -1,13 +1,26 @@
+import hashlib
+import logging
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
 engine = create_async_engine(settings.database_url, echo=False)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+# Column type changes that create_all can't apply to existing tables.
+# Each must be safe to repeat; they run whenever the schema fingerprint changes.
+COLUMN_MIGRATIONS = (
+    # REAL rounded integer metrics (uptime_seconds) above 2^24
+    "ALTER TABLE telemetry_samples ALTER COLUMN value TYPE double precision",
+)
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -17,6 +30,39 @@ async def get_db():
         yield session
 
 
-async def init_db():
+def schema_fingerprint() -> str:
+    """Hash of every table, column and type defined by the models."""
+    parts = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        for column in table.columns:
+            parts.append(f"{table.name}.{column.name}:{column.type}")
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+async def init_db() -> bool:
+    """Create missing tables, but only when the models changed since the last run.
+
+    A single SELECT of the stored fingerprint replaces create_all's per-table
+    reflection on every start. Returns True if create_all ran. create_all
+    only adds tables; column type changes are listed in COLUMN_MIGRATIONS.
+    """
+    from app.models import SchemaInfo
+
+    fingerprint = schema_fingerprint()
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT fingerprint FROM schema_info WHERE id = 1"))
+            if result.scalar_one_or_none() == fingerprint:
+                logger.info("Database schema up to date")
+                return False
+    except Exception:
+        pass  # First run (no schema_info table yet)
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        for statement in COLUMN_MIGRATIONS:
+            await conn.execute(text(statement))
+        await conn.execute(SchemaInfo.__table__.delete())
+        await conn.execute(SchemaInfo.__table__.insert().values(id=1, fingerprint=fingerprint))
+    logger.info("Database schema created/updated")
+    return True
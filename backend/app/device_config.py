@@ -0,0 +1,107 @@
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from app.etag import etag_for
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ("channels", "local_config", "module_config", "metadata")
+
+# Never served over the API: any key containing one of these, ignoring case
+# and underscores (MessageToDict turns ``network.wifi_psk`` into ``wifiPsk``)
+SECRET_KEY_PARTS = ("psk", "password", "privatekey", "adminkey")
+
+
+def _is_secret(key: str) -> bool:
+    key = key.lower().replace("_", "")
+    return any(part in key for part in SECRET_KEY_PARTS)
+
+
+def _redact(value):
+    if isinstance(value, dict):
+        return {k: _redact(v) for k, v in value.items() if not _is_secret(k)}
+    if isinstance(value, list):
+        return [_redact(v) for v in value]
+    return value
+
+
+def _to_dict(message) -> dict:
+    if message is None:
+        return {}
+    if isinstance(message, dict):
+        return message
+    from google.protobuf.json_format import MessageToDict
+    return MessageToDict(message)
+
+
+class DeviceConfigCache:
+    """Snapshot of a radio's channels, config, module config and metadata.
+
+    Filled once after connect so API calls don't walk the live interface
+    objects. Admin packets (config may have changed) and reconnects invalidate
+    it; the next read rebuilds the snapshot. Each section has an ETag for
+    conditional GETs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sections: Dict[str, Tuple[object, str]] = {}
+        self._stale = True
+        self._loads = 0
+
+    def load(self, interface):
+        """Build every section from ``interface``."""
+        sections = {}
+        local_node = getattr(interface, "localNode", None)
+
+        channels = []
+        for i, ch in enumerate(getattr(local_node, "channels", None) or []):
+            if ch.role != 0:  # DISABLED
+                channels.append({
+                    "index": i,
+                    "name": ch.settings.name or f"Channel {i}",
+                    "role": ch.role
+                })
+        sections["channels"] = channels
+        sections["local_config"] = _redact(_to_dict(getattr(local_node, "localConfig", None)))
+        sections["module_config"] = _redact(_to_dict(getattr(local_node, "moduleConfig", None)))
+        sections["metadata"] = _to_dict(getattr(interface, "metadata", None))
+
+        with self._lock:
+            self._sections = {name: (value, etag_for(value)) for name, value in sections.items()}
+            self._stale = False
+            self._loads += 1
+        logger.debug(f"[CONFIG] Loaded device config ({len(channels)} channels)")
+
+    def invalidate(self):
+        with self._lock:
+            self._stale = True
+
+    def clear(self):
+        with self._lock:
+            self._sections = {}
+            self._stale = True
+
+    def get(self, section: str, interface=None) -> Tuple[Optional[object], Optional[str]]:
+        """(value, etag) for a section, reloading from ``interface`` if stale."""
+        if self._stale and interface is not None:
+            try:
+                self.load(interface)
+            except Exception as e:
+                logger.warning(f"[CONFIG] Could not reload device config: {e}")
+        with self._lock:
+            return self._sections.get(section, (None, None))
+
+    def all(self, interface=None) -> Tuple[dict, Optional[str]]:
+        """Every section and a combined ETag."""
+        sections = {}
+        etags = []
+        for name in SECTIONS:
+            value, etag = self.get(name, interface)
+            sections[name] = value
+            etags.append(etag or "")
+        return sections, etag_for(etags) if any(etags) else None
+
+    @property
+    def loads(self) -> int:
+        return self._loads
@@ -0,0 +1,33 @@
+import hashlib
+import json
+from typing import Any, Optional
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+
+def etag_for(payload: Any) -> str:
+    """Strong ETag for a JSON-serializable payload."""
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match", "")
+    return etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*"
+
+
+def etag_response(request: Request, payload: Any, etag: Optional[str] = None) -> Response:
+    """JSON response with an ETag, or 304 if the client already has this version."""
+    etag = etag or etag_for(payload)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=payload, headers=headers)
+
+
+def bytes_response(request: Request, body: bytes, etag: str) -> Response:
+    """Like etag_response, for an already encoded JSON body."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
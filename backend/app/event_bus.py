@@ -0,0 +1,371 @@
+import asyncio
+import base64
+import inspect
+import json
+import logging
+import os
+from typing import Dict, Iterable, Optional, Set
+from app.config import get_settings
+from app.response_cache import response_cache
+from app.ws_encoding import dumps
+
+logger = logging.getLogger(__name__)
+
+# Process roles
+ROLE_ALL = "all"  # Single process: radio, DB writes and API (default)
+ROLE_INGEST = "ingest"  # Owns the radios and DB writes, serves the bus
+ROLE_API = "api"  # Stateless API/WebSocket worker, connects to the bus
+
+# Read-only endpoints an API worker answers from the database itself.
+# Everything else needs radio or in-memory state and goes to the ingest process.
+WORKER_LOCAL_ROUTES = {
+    ("GET", "/"),
+    ("GET", "/health"),
+    ("GET", "/api/messages"),
+    ("GET", "/api/nodes"),
+    ("GET", "/api/telemetry"),
+    ("GET", "/api/telemetry/positions"),
+    ("GET", "/api/telemetry/series"),
+}
+WORKER_LOCAL_PREFIXES = ("/docs", "/redoc", "/openapi.json", "/api/export")
+
+# Client manager methods a worker may call on the ingest process, and
+# whether they need a connected radio (None is returned otherwise)
+REMOTE_CALLS = {
+    "send_message": True,
+    "send_traceroute": True,
+    "get_connection_status": False,
+}
+
+MAX_LINE = 64 * 1024 * 1024  # Largest bus message (a forwarded response body)
+MAX_WORKER_BACKLOG = 8 * 1024 * 1024  # Unsent bytes before a slow worker is dropped
+
+
+class BusUnavailableError(ConnectionError):
+    """The ingest process could not be reached."""
+
+
+class RemoteError(Exception):
+    """An exception raised on the ingest process while handling a request."""
+
+    def __init__(self, error_type: str, message: str):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+class EventBus:
+    """Local bus between the ingest process and API/WebSocket workers.
+
+    The ingest process listens on a Unix socket; each worker keeps one
+    connection to it. Messages are newline-delimited JSON. The ingest side
+    publishes every WebSocket event to all workers, which fan it out to their
+    own clients. Workers send requests with an ``id`` and get a reply with the
+    same ``id``: forwarded HTTP requests (run in-process against the ingest
+    app) and a few client manager calls made from the WebSocket.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.role = self.settings.process_role
+        self._app = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._workers: Set[asyncio.StreamWriter] = set()
+        self._request_tasks: Set[asyncio.Task] = set()  # Strong references until each finishes
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._task: Optional[asyncio.Task] = None
+        self._published = 0
+        self._requests = 0
+        self._dropped_workers = 0
+
+    @property
+    def is_ingest(self) -> bool:
+        return self.role == ROLE_INGEST
+
+    @property
+    def is_worker(self) -> bool:
+        return self.role == ROLE_API
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    def serves_locally(self, method: str, path: str) -> bool:
+        """Whether an API worker handles this request without the ingest process."""
+        return (method, path.rstrip("/") or "/") in WORKER_LOCAL_ROUTES or path.startswith(WORKER_LOCAL_PREFIXES)
+
+    @staticmethod
+    def _encode(message: dict) -> bytes:
+        return dumps(message).encode() + b"\n"
+
+    # ----- Ingest side -----
+
+    async def start_server(self, app):
+        """Listen for workers. ``app`` handles forwarded HTTP requests."""
+        self._app = app
+        path = self.settings.event_bus_path
+        if os.path.exists(path):
+            os.unlink(path)  # Left over from a previous run
+        self._server = await asyncio.start_unix_server(self._serve_worker, path=path, limit=MAX_LINE)
+        logger.info(f"[BUS] Listening on {path}")
+
+    async def _serve_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._workers.add(writer)
+        logger.info(f"[BUS] Worker connected. Total: {len(self._workers)}")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self._handle_request(json.loads(line), writer))
+                self._request_tasks.add(task)
+                task.add_done_callback(self._request_tasks.discard)
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"[BUS] Worker connection error: {e}")
+        finally:
+            self._workers.discard(writer)
+            writer.close()
+            logger.info(f"[BUS] Worker disconnected. Total: {len(self._workers)}")
+
+    async def _handle_request(self, message: dict, writer: asyncio.StreamWriter):
+        self._requests += 1
+        reply = {"id": message.get("id")}
+        try:
+            op = message.get("op")
+            if op == "http":
+                reply["result"] = await self._dispatch_http(message)
+            elif op == "call":
+                reply["result"] = await self._dispatch_call(message["method"], message.get("kwargs") or {})
+            else:
+                raise ValueError(f"Unknown bus operation: {op}")
+        except Exception as e:
+            reply["error"] = str(e)
+            reply["error_type"] = type(e).__name__
+        if writer.is_closing():
+            return
+        writer.write(self._encode(reply))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _dispatch_call(self, method: str, kwargs: dict):
+        from app.client_manager import client_manager
+
+        if method not in REMOTE_CALLS:
+            raise ValueError(f"Method not available over the bus: {method}")
+        if REMOTE_CALLS[method] and not client_manager.connected:
+            return None
+        result = getattr(client_manager, method)(**kwargs)
+        return await result if inspect.isawaitable(result) else result
+
+    async def _dispatch_http(self, message: dict) -> dict:
+        """Run a forwarded request against the local app and collect the response."""
+        path = message["path"]
+        body = base64.b64decode(message.get("body") or "")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": message["method"],
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": message.get("query", "").encode(),
+            "root_path": "",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in message.get("headers", [])],
+            "client": ("bus", 0),
+            "server": ("ingest", 0),
+        }
+        response = {"status": 500, "headers": [], "body": b""}
+        done = asyncio.Event()
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(event):
+            if event["type"] == "http.response.start":
+                response["status"] = event["status"]
+                response["headers"] = [(k.decode(), v.decode()) for k, v in event.get("headers", [])]
+            elif event["type"] == "http.response.body":
+                response["body"] += event.get("body", b"")
+
+        try:
+            await self._app(scope, receive, send)
+        finally:
+            done.set()
+        response["body"] = base64.b64encode(response["body"]).decode()
+        return response
+
+    async def publish(self, message: dict, stream_id: Optional[str] = None):
+        """Send an event to every connected worker. No-op outside the ingest role.
+
+        ``stream_id`` identifies the numbering of the event's ``seq``.
+        """
+        if not self._workers:
+            return
+        self._published += 1
+        self._send_to_workers(self._encode({"op": "event", "message": message, "stream": stream_id}))
+
+    def invalidate(self, tags: Iterable[str]):
+        """Pass response cache invalidations on to the workers."""
+        if self._workers:
+            self._send_to_workers(self._encode({"op": "invalidate", "tags": sorted(tags)}))
+
+    def _send_to_workers(self, data: bytes):
+        for writer in list(self._workers):
+            if writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_WORKER_BACKLOG:
+                # Never let one stalled worker hold up ingest; it reconnects
+                logger.warning("[BUS] Dropping worker that is not reading")
+                self._dropped_workers += 1
+                self._workers.discard(writer)
+                writer.close()
+                continue
+            writer.write(data)
+
+    # ----- Worker side -----
+
+    def start_client(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_client())
+
+    async def _run_client(self):
+        from app.routers.websocket import broadcast
+
+        path = self.settings.event_bus_path
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(path, limit=MAX_LINE)
+            except OSError as e:
+                logger.debug(f"[BUS] Ingest process not reachable at {path}: {e}")
+                await asyncio.sleep(self.settings.event_bus_reconnect_delay)
+                continue
+
+            self._writer = writer
+            # Invalidations may have been missed while disconnected
+            response_cache.clear()
+            logger.info(f"[BUS] Connected to ingest process at {path}")
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    message = json.loads(line)
+                    if "id" in message:
+                        future = self._pending.pop(message["id"], None)
+                        if future and not future.done():
+                            future.set_result(message)
+                    elif message.get("op") == "event":
+                        await broadcast(message["message"], message.get("stream"))
+                    elif message.get("op") == "invalidate":
+                        response_cache.invalidate(message["tags"])
+            except (ConnectionError, ValueError) as e:
+                logger.warning(f"[BUS] Connection error: {e}")
+            finally:
+                self._writer = None
+                writer.close()
+                for future in self._pending.values():
+                    if not future.done():
+                        future.set_exception(BusUnavailableError("Ingest process connection lost"))
+                self._pending.clear()
+            logger.warning("[BUS] Disconnected from ingest process, reconnecting...")
+            await asyncio.sleep(self.settings.event_bus_reconnect_delay)
+
+    async def request(self, payload: dict):
+        """Send a request to the ingest process and wait for its result."""
+        if self._writer is None:
+            raise BusUnavailableError("Ingest process not connected")
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(self._encode({**payload, "id": request_id}))
+        try:
+            await self._writer.drain()
+            reply = await asyncio.wait_for(future, self.settings.event_bus_timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+        if "error" in reply:
+            if reply.get("error_type") == "QueueFullError":
+                from app.send_scheduler import QueueFullError
+                raise QueueFullError(reply["error"])
+            raise RemoteError(reply.get("error_type", "Exception"), reply["error"])
+        return reply.get("result")
+
+    async def call(self, method: str, **kwargs):
+        """Call a client manager method on the ingest process."""
+        return await self.request({"op": "call", "method": method, "kwargs": kwargs})
+
+    async def forward_http(self, request):
+        """Proxy a FastAPI request to the ingest process."""
+        from fastapi.responses import JSONResponse, Response
+
+        payload = {
+            "op": "http",
+            "method": request.method,
+            "path": request.url.path,
+            "query": request.url.query,
+            "headers": [[k, v] for k, v in request.headers.items()],
+            "body": base64.b64encode(await request.body()).decode(),
+        }
+        try:
+            result = await self.request(payload)
+        except BusUnavailableError:
+            return JSONResponse({"detail": "Ingest process unavailable"}, status_code=503)
+        except asyncio.TimeoutError:
+            return JSONResponse({"detail": "Ingest process did not respond"}, status_code=504)
+
+        response = Response(content=base64.b64decode(result["body"]), status_code=result["status"])
+        response.raw_headers = [(k.encode(), v.encode()) for k, v in result["headers"]]
+        return response
+
+    # ----- Lifecycle -----
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._request_tasks):
+            task.cancel()
+        if self._request_tasks:
+            await asyncio.gather(*self._request_tasks, return_exceptions=True)
+        if self._server:
+            self._server.close()
+            for writer in list(self._workers):
+                writer.close()
+            self._workers.clear()
+            await self._server.wait_closed()
+            self._server = None
+            if os.path.exists(self.settings.event_bus_path):
+                os.unlink(self.settings.event_bus_path)
+
+    def stats(self) -> dict:
+        return {
+            "role": self.role,
+            "path": self.settings.event_bus_path,
+            "workers": len(self._workers),
+            "connected": self.connected if self.is_worker else None,
+            "events_published": self._published,
+            "requests_handled": self._requests,
+            "requests_in_flight": len(self._request_tasks),
+            "pending_requests": len(self._pending),
+            "workers_dropped": self._dropped_workers
+        }
+
+
+# Singleton instance
+event_bus = EventBus()
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from typing import Callable, List, Optional
+from sqlalchemy import insert, select, func
+from app.config import get_settings
+from app.events import RadioEvent
+from app.database import engine
+from app.models import Event
+
+logger = logging.getLogger(__name__)
+
+FLUSH_CHUNK = 1000  # Rows per INSERT statement
+# Advisory lock held by every transaction that appends to the log, so event IDs
+# become visible in order even when an import runs alongside the dashboard
+EVENT_LOG_LOCK = 0x6d657368
+
+
+class EventStore:
+    """Append-only log of radio events, written as one sequential stream.
+
+    Events are buffered in memory and written with multi-row INSERTs every
+    ``event_store_flush_interval`` seconds, or as soon as
+    ``event_store_batch_size`` are waiting. Only this class writes to the
+    ``events`` table besides the importer, and both hold ``EVENT_LOG_LOCK``
+    while appending, so IDs are assigned in commit order and the projections
+    can safely use the last applied ID as their checkpoint.
+
+    If the database is unreachable, up to ``event_store_queue_size`` events
+    are kept and retried; beyond that the oldest are dropped.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._skip = {t.strip() for t in self.settings.event_store_skip.split(",") if t.strip()}
+        self._buffer: List[dict] = []
+        self._listeners: List[Callable[[], None]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._appended = 0
+        self._written = 0
+        self._dropped = 0
+        self._last_id: Optional[int] = None
+        self._failing = False
+
+    def append(self, event_type: str, data: RadioEvent):
+        """Queue an event for writing. Called from the event loop."""
+        if event_type in self._skip:
+            return
+        self._buffer.append(data.to_row())
+        self._appended += 1
+        if len(self._buffer) > self.settings.event_store_queue_size:
+            del self._buffer[0]
+            self._dropped += 1
+        if self._wakeup and len(self._buffer) >= self.settings.event_store_batch_size:
+            self._wakeup.set()
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Call ``callback`` after each successful write."""
+        self._listeners.append(callback)
+
+    async def flush(self) -> int:
+        """Write buffered events. Returns the number written."""
+        if not self._buffer:
+            return 0
+        rows = self._buffer
+        self._buffer = []
+
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(select(func.pg_advisory_xact_lock(EVENT_LOG_LOCK)))
+                for i in range(0, len(rows), FLUSH_CHUNK):
+                    result = await conn.execute(insert(Event).returning(Event.id), rows[i:i + FLUSH_CHUNK])
+                    self._last_id = max(result.scalars().all(), default=self._last_id)
+        except Exception as e:
+            if not self._failing:
+                logger.warning(f"[EVENTS] Failed to write events, retrying: {e}")
+            self._failing = True
+            # Retry on the next flush, keeping the newest if over the limit
+            self._buffer = rows + self._buffer
+            overflow = len(self._buffer) - self.settings.event_store_queue_size
+            if overflow > 0:
+                del self._buffer[:overflow]
+                self._dropped += overflow
+            return 0
+
+        if self._failing:
+            logger.info("[EVENTS] Writing events again")
+            self._failing = False
+        self._written += len(rows)
+        logger.debug(f"[EVENTS] Wrote {len(rows)} events")
+        for callback in self._listeners:
+            callback()
+        return len(rows)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.settings.event_store_flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"[EVENTS] Flush loop error: {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "appended": self._appended,
+            "written": self._written,
+            "buffered": len(self._buffer),
+            "dropped": self._dropped,
+            "last_id": self._last_id,
+            "skipped_types": sorted(self._skip)
+        }
+
+
+# Singleton instance
+event_store = EventStore()
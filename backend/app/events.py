@@ -0,0 +1,454 @@
+"""Typed radio events for the packet hot path.
+
+Handlers in MeshtasticClient create one of these per decoded packet instead of
+a dict. An event holds its fields in slots plus a single epoch-millisecond
+timestamp, and builds each serialized form at most once, on first use:
+
+- ``to_dict()``: the WebSocket payload, identical to the dicts sent before
+- ``to_json()`` / ``to_msgpack()``: encoded payloads, shared by every client
+  frame and the event bus
+- ``to_row()``: the ``events`` table row, built from the slots
+
+Every event a radio emits is one of these, so consumers (the client
+manager, the event log, the importer) have a single code path. Events are
+read-only Mappings over ``to_dict()``, so callbacks written for dict
+payloads (``data.get("node_id")``) keep working.
+"""
+import json
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from typing import ClassVar, Optional, Tuple
+from app.telemetry_buffer import TELEMETRY_FIELDS
+from app.ws_encoding import packb, json_default
+
+
+def now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+class RadioEvent(Mapping):
+    """Base class: subclasses list their payload keys in ``fields`` and ``__slots__``."""
+
+    __slots__ = ("ts_ms", "radio", "_dict", "_json", "_msgpack", "_row")
+
+    event_type: ClassVar[str] = ""
+    fields: ClassVar[Tuple[str, ...]] = ()
+    optional: ClassVar[Tuple[str, ...]] = ()  # Fields left out of the payload when None
+    node_field: ClassVar[Optional[str]] = "node_id"  # Field stored in the ``events.node_id`` column
+    json_safe: ClassVar[bool] = True  # False for payloads holding decoded packet dicts (bytes...)
+
+    def __init__(self, ts_ms: Optional[int] = None):
+        self.ts_ms = ts_ms or now_ms()
+        self.radio: Optional[str] = None
+        self._dict = None
+        self._json = None
+        self._msgpack = None
+        self._row = None
+
+    @property
+    def node_id(self) -> Optional[str]:
+        return getattr(self, self.node_field) if self.node_field else None
+
+    @property
+    def datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.ts_ms / 1000)
+
+    def set_time(self, ts_ms: int):
+        """Change the timestamp, e.g. to a packet's receive time. Drops cached forms."""
+        self.ts_ms = ts_ms
+        self._dict = self._json = self._msgpack = self._row = None
+
+    def set_radio(self, radio: Optional[str]):
+        """Tag the event with the radio that heard it. Drops cached forms."""
+        self.radio = radio
+        self._dict = self._json = self._msgpack = self._row = None
+
+    # ----- Serialized forms -----
+
+    def to_dict(self) -> dict:
+        if self._dict is None:
+            data = {field: getattr(self, field) for field in self.fields}
+            for field in self.optional:
+                if data[field] is None:
+                    del data[field]
+            data["timestamp"] = self.datetime.isoformat()
+            if self.radio is not None:
+                data["radio"] = self.radio
+            self._dict = data
+        return self._dict
+
+    def to_json(self) -> str:
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), default=json_default)
+        return self._json
+
+    def to_msgpack(self) -> bytes:
+        if self._msgpack is None:
+            self._msgpack = packb(self.to_dict())
+        return self._msgpack
+
+    def to_row(self) -> dict:
+        """The ``events`` row: payload without None values, node in its own column."""
+        if self._row is None:
+            data = {
+                field: value for field in self.fields
+                if field != "node_id" and (value := getattr(self, field)) is not None
+            }
+            if not self.json_safe:
+                # Round-trip so payloads with non-JSON values can't fail a whole batch
+                data = json.loads(json.dumps(data, default=str))
+            self._row = {
+                "timestamp": self.datetime,
+                "type": self.event_type,
+                "radio": self.radio,
+                "node_id": self.node_id,
+                "data": data
+            }
+        return self._row
+
+    # ----- Read-only mapping over the payload -----
+
+    def __getitem__(self, key: str):
+        return self.to_dict()[key]
+
+    def get(self, key: str, default=None):
+        if key in self.fields:
+            return getattr(self, key)  # No payload dict needed
+        return self.to_dict().get(key, default)
+
+    def __iter__(self):
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class MessageEvent(RadioEvent):
+    __slots__ = ("from_node_id", "to_node_id", "channel", "text")
+    event_type = "message"
+    fields = ("from_node_id", "to_node_id", "channel", "text")
+    node_field = "from_node_id"
+
+    def __init__(self, from_node_id: Optional[str], to_node_id: Optional[str], channel: int, text: str,
+                 ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.from_node_id = from_node_id
+        self.to_node_id = to_node_id
+        self.channel = channel
+        self.text = text
+
+
+class PositionEvent(RadioEvent):
+    __slots__ = ("node_id", "latitude", "longitude", "altitude")
+    event_type = "position"
+    fields = ("node_id", "latitude", "longitude", "altitude")
+
+    def __init__(self, node_id: Optional[str], latitude: Optional[float], longitude: Optional[float],
+                 altitude: Optional[int] = None, ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.node_id = node_id
+        self.latitude = latitude
+        self.longitude = longitude
+        self.altitude = altitude
+
+
+class NodeUpdateEvent(RadioEvent):
+    __slots__ = ("id", "long_name", "short_name", "hw_model")
+    event_type = "node_update"
+    fields = ("id", "long_name", "short_name", "hw_model")
+    node_field = "id"
+
+    def __init__(self, id: Optional[str], long_name: Optional[str], short_name: Optional[str],
+                 hw_model: Optional[str], ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.id = id
+        self.long_name = long_name
+        self.short_name = short_name
+        self.hw_model = hw_model
+
+
+class TelemetryEvent(RadioEvent):
+    """One telemetry type's metrics. ``type`` is the TELEMETRY_FIELDS key."""
+
+    __slots__ = ("node_id",)
+    event_type = "telemetry"
+    type: ClassVar[str] = ""
+    metrics: ClassVar[Tuple[str, ...]] = ()
+
+    def __init__(self, node_id: Optional[str], ts_ms: Optional[int] = None, **values):
+        super().__init__(ts_ms)
+        self.node_id = node_id
+        for metric in self.metrics:
+            setattr(self, metric, values.get(metric))
+
+    def get(self, key: str, default=None):
+        if key == "type":
+            return self.type
+        return super().get(key, default)
+
+    def to_dict(self) -> dict:
+        if self._dict is None:
+            data = {"node_id": self.node_id, "type": self.type}
+            for metric in self.metrics:
+                data[metric] = getattr(self, metric)
+            data["timestamp"] = self.datetime.isoformat()
+            if self.radio is not None:
+                data["radio"] = self.radio
+            self._dict = data
+        return self._dict
+
+    def to_row(self) -> dict:
+        if self._row is None:
+            row = super().to_row()
+            row["data"] = {"type": self.type, **row["data"]}
+        return self._row
+
+
+class DeviceTelemetry(TelemetryEvent):
+    __slots__ = TELEMETRY_FIELDS["device"]
+    type = "device"
+    metrics = TELEMETRY_FIELDS["device"]
+    fields = ("node_id",) + metrics
+
+
+class EnvironmentTelemetry(TelemetryEvent):
+    __slots__ = TELEMETRY_FIELDS["environment"]
+    type = "environment"
+    metrics = TELEMETRY_FIELDS["environment"]
+    fields = ("node_id",) + metrics
+
+
+class AirQualityTelemetry(TelemetryEvent):
+    __slots__ = TELEMETRY_FIELDS["air_quality"]
+    type = "air_quality"
+    metrics = TELEMETRY_FIELDS["air_quality"]
+    fields = ("node_id",) + metrics
+
+
+class PowerTelemetry(TelemetryEvent):
+    __slots__ = TELEMETRY_FIELDS["power"]
+    type = "power"
+    metrics = TELEMETRY_FIELDS["power"]
+    fields = ("node_id",) + metrics
+
+
+class ConnectionEvent(RadioEvent):
+    """A radio's connection status. Keys vary, so they are kept as one dict."""
+
+    __slots__ = ("status",)
+    event_type = "connection"
+    node_field = None
+    json_safe = False
+
+    def __init__(self, status: dict, ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.status = status
+
+    def get(self, key: str, default=None):
+        if key == "radio":
+            return self.radio if self.radio is not None else default
+        return self.status.get(key, default)
+
+    def to_dict(self) -> dict:
+        if self._dict is None:
+            data = dict(self.status)  # No timestamp, as before
+            if self.radio is not None:
+                data["radio"] = self.radio
+            self._dict = data
+        return self._dict
+
+    def to_row(self) -> dict:
+        if self._row is None:
+            self._row = {
+                "timestamp": self.datetime,
+                "type": self.event_type,
+                "radio": self.radio,
+                "node_id": None,
+                "data": json.loads(json.dumps(
+                    {k: v for k, v in self.status.items() if v is not None and k != "radio"}, default=str
+                ))
+            }
+        return self._row
+
+
+class AckEvent(RadioEvent):
+    __slots__ = ("to_node_id", "text", "success", "error")
+    event_type = "ack"
+    fields = ("to_node_id", "text", "success", "error")
+    optional = ("error",)
+    node_field = None
+
+    def __init__(self, to_node_id: Optional[str], text: str, success: bool, error: Optional[str] = None,
+                 ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.to_node_id = to_node_id
+        self.text = text
+        self.success = success
+        self.error = error
+
+
+class TracerouteEvent(RadioEvent):
+    __slots__ = ("from_node_id", "to_node_id", "route", "route_back", "snr_towards", "snr_back")
+    event_type = "traceroute"
+    fields = ("from_node_id", "to_node_id", "route", "route_back", "snr_towards", "snr_back")
+    node_field = "from_node_id"
+
+    def __init__(self, from_node_id: Optional[str], to_node_id: Optional[str], route: list, route_back: list,
+                 snr_towards: list, snr_back: list, ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.from_node_id = from_node_id
+        self.to_node_id = to_node_id
+        self.route = route
+        self.route_back = route_back
+        self.snr_towards = snr_towards
+        self.snr_back = snr_back
+
+
+class TracerouteErrorEvent(RadioEvent):
+    __slots__ = ("destination", "error")
+    event_type = "traceroute_error"
+    fields = ("destination", "error")
+    node_field = None
+
+    def __init__(self, destination: str, error: str, ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.destination = destination
+        self.error = error
+
+
+class RoutingEvent(RadioEvent):
+    __slots__ = ("from_node_id", "to_node_id", "request_id", "error_reason", "raw")
+    event_type = "routing"
+    fields = ("from_node_id", "to_node_id", "request_id", "error_reason", "raw")
+    node_field = "from_node_id"
+    json_safe = False
+
+    def __init__(self, from_node_id: Optional[str], to_node_id: Optional[str], request_id: Optional[int],
+                 error_reason: str, raw: dict, ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.from_node_id = from_node_id
+        self.to_node_id = to_node_id
+        self.request_id = request_id
+        self.error_reason = error_reason
+        self.raw = raw
+
+
+class NeighborInfoEvent(RadioEvent):
+    __slots__ = ("from_node_id", "neighbors", "node_broadcast_interval_secs")
+    event_type = "neighborinfo"
+    fields = ("from_node_id", "neighbors", "node_broadcast_interval_secs")
+    node_field = "from_node_id"
+
+    def __init__(self, from_node_id: Optional[str], neighbors: list,
+                 node_broadcast_interval_secs: Optional[int], ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.from_node_id = from_node_id
+        self.neighbors = neighbors
+        self.node_broadcast_interval_secs = node_broadcast_interval_secs
+
+
+class WaypointEvent(RadioEvent):
+    __slots__ = ("from_node_id", "id", "name", "description", "latitude", "longitude", "expire", "icon")
+    event_type = "waypoint"
+    fields = ("from_node_id", "id", "name", "description", "latitude", "longitude", "expire", "icon")
+    node_field = "from_node_id"
+
+    def __init__(self, from_node_id: Optional[str], id: Optional[int], name: Optional[str],
+                 description: Optional[str], latitude: Optional[float], longitude: Optional[float],
+                 expire: Optional[int], icon: Optional[int], ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.from_node_id = from_node_id
+        self.id = id
+        self.name = name
+        self.description = description
+        self.latitude = latitude
+        self.longitude = longitude
+        self.expire = expire
+        self.icon = icon
+
+
+class RangeTestEvent(RadioEvent):
+    __slots__ = ("from_node_id", "payload")
+    event_type = "range_test"
+    fields = ("from_node_id", "payload")
+    node_field = "from_node_id"
+    json_safe = False
+
+    def __init__(self, from_node_id: Optional[str], payload, ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.from_node_id = from_node_id
+        self.payload = payload
+
+
+class PaxcounterEvent(RadioEvent):
+    __slots__ = ("from_node_id", "wifi", "ble", "uptime")
+    event_type = "paxcounter"
+    fields = ("from_node_id", "wifi", "ble", "uptime")
+    node_field = "from_node_id"
+
+    def __init__(self, from_node_id: Optional[str], wifi: Optional[int], ble: Optional[int],
+                 uptime: Optional[int], ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.from_node_id = from_node_id
+        self.wifi = wifi
+        self.ble = ble
+        self.uptime = uptime
+
+
+class DecodedPacketEvent(RadioEvent):
+    """A module packet forwarded as the library decoded it (``raw``)."""
+
+    __slots__ = ("from_node_id", "raw")
+    fields = ("from_node_id", "raw")
+    node_field = "from_node_id"
+    json_safe = False
+
+    def __init__(self, from_node_id: Optional[str], raw: dict, ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.from_node_id = from_node_id
+        self.raw = raw
+
+
+class AdminEvent(DecodedPacketEvent):
+    __slots__ = ()
+    event_type = "admin"
+
+
+class StoreForwardEvent(DecodedPacketEvent):
+    __slots__ = ()
+    event_type = "store_forward"
+
+
+class DetectionSensorEvent(DecodedPacketEvent):
+    __slots__ = ()
+    event_type = "detection_sensor"
+
+
+class RawPacketEvent(RadioEvent):
+    """A packet on a port without a handler, forwarded for visibility."""
+
+    __slots__ = ("portnum", "from_node_id", "to_node_id", "decoded", "rx_time", "rx_snr", "rx_rssi",
+                 "hop_limit", "hop_start")
+    event_type = "raw_packet"
+    fields = ("portnum", "from_node_id", "to_node_id", "decoded", "rx_time", "rx_snr", "rx_rssi",
+              "hop_limit", "hop_start")
+    node_field = "from_node_id"
+    json_safe = False
+
+    def __init__(self, portnum, from_node_id: Optional[str], to_node_id: Optional[str], decoded: dict,
+                 rx_time: Optional[int], rx_snr: Optional[float], rx_rssi: Optional[int],
+                 hop_limit: Optional[int], hop_start: Optional[int], ts_ms: Optional[int] = None):
+        super().__init__(ts_ms)
+        self.portnum = portnum
+        self.from_node_id = from_node_id
+        self.to_node_id = to_node_id
+        self.decoded = decoded
+        self.rx_time = rx_time
+        self.rx_snr = rx_snr
+        self.rx_rssi = rx_rssi
+        self.hop_limit = hop_limit
+        self.hop_start = hop_start
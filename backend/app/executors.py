@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedExecutor:
+    """Named, fixed-size thread pool with queue and latency metrics."""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"radio-{name}")
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._started = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_queue_wait = 0.0
+        self._max_queue_wait = 0.0
+        self._total_run_time = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a blocking callable on this pool and await its result."""
+        submitted_at = time.monotonic()
+
+        def call():
+            started_at = time.monotonic()
+            queue_wait = started_at - submitted_at
+            with self._lock:
+                self._started += 1
+                self._total_queue_wait += queue_wait
+                self._max_queue_wait = max(self._max_queue_wait, queue_wait)
+            try:
+                result = fn(*args)
+            except BaseException:
+                with self._lock:
+                    self._failed += 1
+                    self._total_run_time += time.monotonic() - started_at
+                raise
+            with self._lock:
+                self._completed += 1
+                self._total_run_time += time.monotonic() - started_at
+            return result
+
+        with self._lock:
+            self._submitted += 1
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._pool, call)
+
+    def stats(self) -> dict:
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "max_workers": self.max_workers,
+                "queued": self._submitted - self._started,
+                "active": self._started - finished,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_queue_wait_seconds": round(self._total_queue_wait / self._started, 4) if self._started else 0.0,
+                "max_queue_wait_seconds": round(self._max_queue_wait, 4),
+                "avg_run_seconds": round(self._total_run_time / finished, 4) if finished else 0.0
+            }
+
+    def shutdown(self):
+        # Don't wait: a hung BLE call must not block process shutdown
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class RadioExecutors:
+    """Dedicated thread pools for blocking radio I/O.
+
+    - connect: interface construction (BLE connect + config download)
+    - send: sendData calls from the outbound scheduler
+    - wait: calls that can block for a long time, such as an interface close
+      that hangs until the BLE stack gives up
+
+    Keeping them apart means a hung close or slow connect can never take the
+    thread an operator's message send needs, and none of them compete with the
+    event loop's default executor.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.connect = InstrumentedExecutor("connect", settings.executor_connect_workers)
+        self.send = InstrumentedExecutor("send", settings.executor_send_workers)
+        self.wait = InstrumentedExecutor("wait", settings.executor_wait_workers)
+
+    def all(self) -> dict:
+        return {"connect": self.connect, "send": self.send, "wait": self.wait}
+
+    def stats(self) -> dict:
+        return {name: executor.stats() for name, executor in self.all().items()}
+
+    def shutdown(self):
+        for executor in self.all().values():
+            executor.shutdown()
+
+
+# Singleton instance
+radio_executors = RadioExecutors()
@@ -0,0 +1,201 @@
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from sqlalchemy import Table, select, or_, Boolean, DateTime, Float, Integer, BigInteger
+from app.database import engine
+from app.models import Message, Telemetry, TelemetrySample, Position, Node, Event
+
+
+@dataclass(frozen=True)
+class Dataset:
+    table: Table
+    time_column: str
+    node_columns: Tuple[str, ...]  # A row matches a node filter on any of these
+
+
+DATASETS = {
+    "messages": Dataset(Message.__table__, "timestamp", ("from_node_id", "to_node_id")),
+    "telemetry": Dataset(Telemetry.__table__, "timestamp", ("node_id",)),
+    "telemetry_samples": Dataset(TelemetrySample.__table__, "timestamp", ("node_id",)),
+    "positions": Dataset(Position.__table__, "timestamp", ("node_id",)),
+    "nodes": Dataset(Node.__table__, "last_heard", ("id",)),
+    "events": Dataset(Event.__table__, "timestamp", ("node_id",)),
+}
+
+# format -> (media type, file extension)
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class ExportError(ValueError):
+    """Invalid export request."""
+
+
+def require_pyarrow():
+    """Parquet output needs the optional pyarrow package."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ExportError("Parquet export needs pyarrow (pip install pyarrow)")
+
+
+def build_query(dataset: Dataset, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                nodes: Optional[Sequence[str]] = None):
+    """All columns of ``dataset`` in [start, end), optionally only for ``nodes``, oldest first."""
+    table = dataset.table
+    time_column = table.c[dataset.time_column]
+    query = select(table).order_by(time_column)
+    if start:
+        query = query.where(time_column >= start)
+    if end:
+        query = query.where(time_column < end)
+    if nodes:
+        query = query.where(or_(*(table.c[c].in_(nodes) for c in dataset.node_columns)))
+    return query
+
+
+async def stream_rows(query, batch_size: int) -> AsyncIterator[List[tuple]]:
+    """Rows of ``query`` in batches, read through a server-side cursor."""
+    async with engine.connect() as conn:
+        result = await conn.stream(query, execution_options={"yield_per": batch_size})
+        async for batch in result.partitions(batch_size):
+            yield batch
+
+
+def _text_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+async def encode_ndjson(columns: List[str], batches: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_text_value, separators=(",", ":")) + "\n"
+            for row in batch
+        ).encode()
+
+
+async def encode_csv(columns: List[str], batches: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for batch in batches:
+        writer.writerows([_text_value(v) for v in row] for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out whatever was written since the last drain."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema(table: Table):
+    import pyarrow as pa
+
+    def arrow_type(column):
+        if isinstance(column.type, (Integer, BigInteger)):
+            return pa.int64()
+        if isinstance(column.type, Float):
+            return pa.float64()
+        if isinstance(column.type, Boolean):
+            return pa.bool_()
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us")
+        return pa.string()
+
+    return pa.schema([(column.name, arrow_type(column)) for column in table.columns])
+
+
+async def encode_parquet(table: Table, batches: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    """One Parquet row group per batch, so memory stays bounded by the batch size."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(table)
+    string_columns = {f.name for f in schema if pa.types.is_string(f.type)}
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for batch in batches:
+            columns = {}
+            for i, name in enumerate(schema.names):
+                values = [row[i] for row in batch]
+                if name in string_columns:
+                    values = [None if v is None else str(_text_value(v)) for v in values]
+                columns[name] = values
+            writer.write_table(pa.table(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(name: str, fmt: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  nodes: Optional[Sequence[str]] = None, compress: bool = False,
+                  batch_size: int = 5000) -> AsyncIterator[bytes]:
+    """Encoded bytes of a dataset export. Raises ExportError for bad arguments."""
+    dataset = DATASETS.get(name)
+    if dataset is None:
+        raise ExportError(f"Unknown dataset '{name}' (expected one of: {', '.join(DATASETS)})")
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown format '{fmt}' (expected one of: {', '.join(FORMATS)})")
+    if fmt == "parquet":
+        require_pyarrow()
+
+    batches = stream_rows(build_query(dataset, start, end, nodes), batch_size)
+    columns = [column.name for column in dataset.table.columns]
+    if fmt == "ndjson":
+        stream = encode_ndjson(columns, batches)
+    elif fmt == "csv":
+        stream = encode_csv(columns, batches)
+    else:
+        stream = encode_parquet(dataset.table, batches)
+
+    # Parquet pages are already compressed
+    if compress and fmt != "parquet":
+        stream = gzip_stream(stream)
+    return stream
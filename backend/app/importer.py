@@ -0,0 +1,387 @@
+"""Bulk import of historical data into a dashboard instance.
+
+Accepts the NDJSON and CSV files produced by ``/api/export`` (optionally
+gzipped) and packet captures: NDJSON with one received packet per line, as
+delivered by the meshtastic library (``fromId``, ``rxTime``, ``decoded``...).
+Captures are decoded by the same handlers as live packets; packets without
+``rxTime`` are skipped, since they couldn't be matched on a second import.
+
+Rows are loaded with COPY into a staging table and only inserted where they
+don't match an existing row, so the same file can be imported twice.
+Messages, telemetry, positions and captures become events in the event log,
+and the projections are caught up (or rebuilt) afterwards. Nodes and
+outgoing messages are not event-sourced and are merged into their tables.
+
+    python -m app.importer telemetry-20250401-120000.csv.gz
+    python -m app.importer --dataset capture field-kit-3.ndjson
+    python -m app.importer --rebuild export/*.ndjson
+
+The dataset is taken from the file name prefix unless ``--dataset`` is given.
+"""
+import argparse
+import asyncio
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import text, select, func, Boolean, Float, Integer, BigInteger
+from app.config import get_settings
+from app.database import engine, init_db
+from app.event_store import EVENT_LOG_LOCK
+from app.events import RadioEvent, MessageEvent, PositionEvent, DeviceTelemetry
+from app.export import DATASETS
+from app.projections import projector
+
+logger = logging.getLogger(__name__)
+
+# Exported projections that are rebuilt from the event log rather than imported
+DERIVED_DATASETS = ("telemetry_samples",)
+IMPORT_DATASETS = tuple(d for d in DATASETS if d not in DERIVED_DATASETS) + ("capture",)
+
+EVENT_COLUMNS = ("timestamp", "type", "radio", "node_id", "data")
+NODE_COLUMNS = ("id", "num", "long_name", "short_name", "mac_addr", "hw_model", "role", "latitude",
+                "longitude", "altitude", "battery_level", "voltage", "snr", "hops_away", "last_heard",
+                "is_favorite")
+MESSAGE_COLUMNS = ("from_node_id", "to_node_id", "channel", "text", "timestamp", "is_outgoing",
+                   "ack_received", "ack_failed", "ack_error")
+TELEMETRY_FIELDS = ("battery_level", "voltage", "channel_utilization", "air_util_tx", "uptime_seconds")
+
+# Projections affected by each dataset, for --rebuild
+AFFECTED_PROJECTIONS = {
+    "messages": ["nodes", "messages"],
+    "telemetry": ["nodes", "telemetry", "telemetry_samples"],
+    "positions": ["nodes", "positions"],
+    "nodes": [],
+    "events": None,  # All
+    "capture": None,
+}
+
+
+class ImportFileError(ValueError):
+    """A file that cannot be imported."""
+
+
+# ----- Reading -----
+
+def _open_text(path: str) -> io.TextIOBase:
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    if magic == b"\x1f\x8b":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def detect_dataset(path: str) -> str:
+    name = os.path.basename(path).lower()
+    for dataset in DERIVED_DATASETS:
+        if name.startswith(dataset):
+            raise ImportFileError(f"{path}: {dataset} is rebuilt from the event log; "
+                                  "import the telemetry or events export instead")
+    for dataset in IMPORT_DATASETS:
+        if name.startswith(dataset):
+            return dataset
+    raise ImportFileError(f"Cannot tell the dataset of {path}; pass --dataset")
+
+
+def detect_format(path: str) -> str:
+    name = os.path.basename(path).lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    raise ImportFileError(f"Cannot tell the format of {path}; pass --format")
+
+
+def _coerce(column_type, value: str):
+    """Typed value of a CSV field, using the column type of the exported table."""
+    if value == "":
+        return None
+    if isinstance(column_type, Boolean):
+        return value.lower() in ("true", "1", "t", "yes")
+    if isinstance(column_type, (Integer, BigInteger)):
+        return int(float(value))
+    if isinstance(column_type, Float):
+        return float(value)
+    return value  # Strings, and ISO timestamps parsed later
+
+
+def read_records(path: str, fmt: str, dataset: str) -> Iterator[dict]:
+    with _open_text(path) as f:
+        if fmt == "ndjson":
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"[IMPORT] {path}:{line_number}: not JSON, skipped")
+            return
+
+        if dataset == "capture":
+            raise ImportFileError("Packet captures must be NDJSON")
+        types = {column.name: column.type for column in DATASETS[dataset].table.columns}
+        for row in csv.DictReader(f):
+            yield {k: _coerce(types.get(k), v) for k, v in row.items() if k in types}
+
+
+def _parse_time(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    return datetime.fromisoformat(value)
+
+
+# ----- Conversion to events -----
+
+def _capture_decoder():
+    from app.meshtastic_client import MeshtasticClient
+
+    class CaptureDecoder(MeshtasticClient):
+        """Runs captured packets through the live handlers, collecting the events."""
+
+        def __init__(self):
+            super().__init__(radio_id="import", transport="tcp")
+            self.events: List[tuple] = []
+
+        def _schedule_event(self, event_type: str, data: RadioEvent):
+            self.events.append((event_type, data))
+
+        def decode(self, packet: dict) -> List[tuple]:
+            rx_time = packet.get("rxTime")
+            if not rx_time:
+                # Stamped at import time it would be a new event on every import
+                raise ValueError(f"packet {packet.get('id')} from {packet.get('fromId')} has no rxTime")
+            self.events = []
+            self._process_packet(packet)
+            # Handlers stamp events with the current time
+            for _, data in self.events:
+                data.set_time(int(rx_time * 1000))
+            return self.events
+
+    return CaptureDecoder()
+
+
+def record_to_events(dataset: str, record: dict, decoder=None) -> List[tuple]:
+    """(event type, payload) pairs for an imported record."""
+    if dataset == "capture":
+        return decoder.decode(record)
+
+    ts = record.get("timestamp")
+    ts_ms = int(_parse_time(ts).timestamp() * 1000) if ts else None
+    if dataset == "messages":
+        return [("message", MessageEvent(
+            record.get("from_node_id"), record.get("to_node_id"),
+            record.get("channel") or 0, record.get("text") or "", ts_ms=ts_ms
+        ))]
+    if dataset == "telemetry":
+        return [("telemetry", DeviceTelemetry(
+            record.get("node_id"), ts_ms=ts_ms, **{field: record.get(field) for field in TELEMETRY_FIELDS}
+        ))]
+    if dataset == "positions":
+        return [("position", PositionEvent(
+            record.get("node_id"), record.get("latitude"), record.get("longitude"),
+            record.get("altitude"), ts_ms=ts_ms
+        ))]
+    raise ImportFileError(f"No event mapping for dataset {dataset}")
+
+
+def _event_row(record: dict) -> dict:
+    """An exported ``events`` row, ready to be appended again."""
+    data = record.get("data")
+    if isinstance(data, str):
+        data = json.loads(data)
+    return {
+        "timestamp": _parse_time(record.get("timestamp")) or datetime.now(),
+        "type": record["type"],
+        "radio": record.get("radio"),
+        "node_id": record.get("node_id"),
+        "data": data or {}
+    }
+
+
+# ----- Loading -----
+
+class Importer:
+    """Loads batches through COPY into temporary staging tables, then merges them."""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.counts: Dict[str, int] = {
+            "records": 0, "skipped": 0, "events": 0, "events_inserted": 0,
+            "messages_inserted": 0, "nodes_merged": 0
+        }
+
+    @staticmethod
+    async def _copy(conn, table: str, columns, records: List[tuple]):
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(table, records=records, columns=list(columns))
+
+    async def load_events(self, rows: List[dict]):
+        if not rows:
+            return
+        records = [
+            (row["timestamp"], row["type"], row["radio"], row["node_id"],
+             json.dumps(row["data"], separators=(",", ":"), default=str))
+            for row in rows
+        ]
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "CREATE TEMP TABLE IF NOT EXISTS import_events "
+                "(timestamp timestamp, type varchar(32), radio varchar, node_id varchar, data text) "
+                "ON COMMIT DELETE ROWS"
+            ))
+            await self._copy(conn, "import_events", EVENT_COLUMNS, records)
+            await conn.execute(select(func.pg_advisory_xact_lock(EVENT_LOG_LOCK)))
+            result = await conn.execute(text(
+                "INSERT INTO events (timestamp, type, radio, node_id, data) "
+                "SELECT DISTINCT s.timestamp, s.type, s.radio, s.node_id, s.data::jsonb FROM import_events s "
+                "WHERE NOT EXISTS (SELECT 1 FROM events e WHERE e.timestamp = s.timestamp AND e.type = s.type "
+                "AND e.node_id IS NOT DISTINCT FROM s.node_id AND e.data = s.data::jsonb) "
+                "ORDER BY s.timestamp"
+            ))
+        self.counts["events"] += len(rows)
+        self.counts["events_inserted"] += result.rowcount
+
+    async def load_outgoing_messages(self, records: List[dict]):
+        if not records:
+            return
+        rows = [
+            tuple(_parse_time(r.get(c)) if c == "timestamp" else r.get(c) for c in MESSAGE_COLUMNS)
+            for r in records
+        ]
+        columns = ", ".join(MESSAGE_COLUMNS)
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "CREATE TEMP TABLE IF NOT EXISTS import_messages "
+                "(from_node_id varchar, to_node_id varchar, channel integer, text text, timestamp timestamp, "
+                "is_outgoing boolean, ack_received boolean, ack_failed boolean, ack_error varchar) "
+                "ON COMMIT DELETE ROWS"
+            ))
+            await self._copy(conn, "import_messages", MESSAGE_COLUMNS, rows)
+            result = await conn.execute(text(
+                f"INSERT INTO messages ({columns}) SELECT DISTINCT {', '.join('s.' + c for c in MESSAGE_COLUMNS)} "
+                "FROM import_messages s WHERE NOT EXISTS (SELECT 1 FROM messages m "
+                "WHERE m.is_outgoing AND m.timestamp = s.timestamp AND m.text = s.text "
+                "AND m.to_node_id IS NOT DISTINCT FROM s.to_node_id)"
+            ))
+        self.counts["messages_inserted"] += result.rowcount
+
+    async def load_nodes(self, records: List[dict]):
+        if not records:
+            return
+        # Last record per node wins within a batch (ON CONFLICT can't touch a row twice)
+        latest = {r["id"]: r for r in records if r.get("id")}
+        rows = [
+            tuple(_parse_time(r.get(c)) if c == "last_heard" else r.get(c) for c in NODE_COLUMNS)
+            for r in latest.values()
+        ]
+        columns = ", ".join(NODE_COLUMNS)
+        # Keep what this instance already knows; fill gaps and take the newest last_heard
+        updates = ", ".join(
+            f"{c} = GREATEST(nodes.{c}, excluded.{c})" if c == "last_heard"
+            else f"{c} = COALESCE(nodes.{c}, false) OR COALESCE(excluded.{c}, false)" if c == "is_favorite"
+            else f"{c} = COALESCE(nodes.{c}, excluded.{c})"
+            for c in NODE_COLUMNS if c != "id"
+        )
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "CREATE TEMP TABLE IF NOT EXISTS import_nodes "
+                "(LIKE nodes INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            ))
+            await self._copy(conn, "import_nodes", NODE_COLUMNS, rows)
+            result = await conn.execute(text(
+                f"INSERT INTO nodes ({columns}) SELECT {columns} FROM import_nodes "
+                f"ON CONFLICT (id) DO UPDATE SET {updates}, updated_at = now()"
+            ))
+        self.counts["nodes_merged"] += result.rowcount
+
+    async def import_file(self, path: str, dataset: str, fmt: str):
+        logger.info(f"[IMPORT] {path} ({dataset}, {fmt})")
+        decoder = _capture_decoder() if dataset == "capture" else None
+        events: List[dict] = []
+        direct: List[dict] = []  # Nodes or outgoing messages
+
+        async def flush():
+            if dataset == "nodes":
+                await self.load_nodes(direct)
+            else:
+                await self.load_outgoing_messages(direct)
+            await self.load_events(events)
+            events.clear()
+            direct.clear()
+
+        for record in read_records(path, fmt, dataset):
+            self.counts["records"] += 1
+            try:
+                if dataset == "events":
+                    events.append(_event_row(record))
+                elif dataset == "nodes" or (dataset == "messages" and record.get("is_outgoing")):
+                    direct.append(record)
+                else:
+                    for event_type, data in record_to_events(dataset, record, decoder):
+                        events.append(data.to_row())
+            except (KeyError, TypeError, ValueError) as e:
+                self.counts["skipped"] += 1
+                logger.warning(f"[IMPORT] Skipped a record in {path}: {e}")
+
+            if len(events) + len(direct) >= self.batch_size:
+                await flush()
+                logger.info(f"[IMPORT] {self.counts['records']} records read")
+        await flush()
+
+
+async def _main(args):
+    settings = get_settings()
+    await init_db()
+    importer = Importer(args.batch_size or settings.projection_rebuild_batch_size)
+    datasets = set()
+    try:
+        for path in args.files:
+            dataset = args.dataset or detect_dataset(path)
+            fmt = args.format or detect_format(path)
+            datasets.add(dataset)
+            await importer.import_file(path, dataset, fmt)
+
+        if args.rebuild:
+            names = set()
+            for dataset in datasets:
+                affected = AFFECTED_PROJECTIONS[dataset]
+                names |= set(affected) if affected is not None else {p.name for p in projector.projections}
+            if names:
+                await projector.rebuild(list(names))  # Runs in projection order
+        else:
+            await projector.catch_up_all()
+    finally:
+        await engine.dispose()
+
+    importer.counts["duplicates"] = importer.counts["events"] - importer.counts["events_inserted"]
+    print(json.dumps(importer.counts, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import exported data or packet captures")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--dataset", choices=IMPORT_DATASETS, help="Default: from the file name")
+    parser.add_argument("--format", choices=("ndjson", "csv"), help="Default: from the file extension")
+    parser.add_argument("--batch-size", type=int, help="Rows per COPY batch")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Rebuild the affected projections from scratch instead of catching up")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s")
+    try:
+        asyncio.run(_main(args))
+    except ImportFileError as e:
+        raise SystemExit(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Run the ingest process of a split deployment.
+
+The ingest process owns the radios, writes to the database and serves the
+event bus that API workers connect to. It also answers HTTP on a private
+port for debugging. Start it before (or alongside) the workers:
+
+    python -m app.ingest
+    PROCESS_ROLE=api uvicorn app.main:app --host 0.0.0.0 --port 5001 --workers 4
+"""
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Meshtastic Dashboard ingest process")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5002)
+    args = parser.parse_args()
+
+    # Must be set before the app (and its settings) are imported
+    os.environ["PROCESS_ROLE"] = "ingest"
+
+    import uvicorn
+    uvicorn.run("app.main:app", host=args.host, port=args.port, ws_per_message_deflate=True)
+
+
+if __name__ == "__main__":
+    main()
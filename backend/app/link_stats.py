@@ -0,0 +1,298 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from app.config import get_settings
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class HistogramSketch:
+    """Fixed-resolution histogram for approximate quantiles in bounded memory.
+
+    Values are clamped to [low, high] and bucketed at ``resolution``, so a
+    quantile is accurate to half a bucket and memory never exceeds
+    (high - low) / resolution counters no matter how many values are added.
+    """
+
+    __slots__ = ("low", "high", "resolution", "buckets", "count")
+
+    def __init__(self, low: float, high: float, resolution: float):
+        self.low = low
+        self.high = high
+        self.resolution = resolution
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+
+    def add(self, value: float):
+        value = min(self.high, max(self.low, value))
+        index = int((value - self.low) // self.resolution)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return round(self.low + (index + 0.5) * self.resolution, 2)
+        return self.high
+
+
+class StreamingStat:
+    """Count, last, min/max, EWMA and sketch quantiles of one signal."""
+
+    __slots__ = ("count", "last", "min", "max", "ewma", "sketch")
+
+    def __init__(self, low: float, high: float, resolution: float):
+        self.count = 0
+        self.last: Optional[float] = None
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.ewma: Optional[float] = None
+        self.sketch = HistogramSketch(low, high, resolution)
+
+    def add(self, value: float, alpha: float):
+        self.count += 1
+        self.last = value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.ewma = value if self.ewma is None else self.ewma + alpha * (value - self.ewma)
+        self.sketch.add(value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Sketch quantile, kept within the exact observed min/max."""
+        value = self.sketch.quantile(q)
+        if value is None:
+            return None
+        return min(self.max, max(self.min, value))
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "last": self.last,
+            "min": self.min,
+            "max": self.max,
+            "ewma": round(self.ewma, 2) if self.ewma is not None else None,
+            **{f"p{int(q * 100)}": self.quantile(q) for q in QUANTILES}
+        }
+
+
+def _snr_stat() -> StreamingStat:
+    return StreamingStat(-30.0, 20.0, 0.25)
+
+
+def _rssi_stat() -> StreamingStat:
+    return StreamingStat(-150.0, 0.0, 1.0)
+
+
+def _hops_stat() -> StreamingStat:
+    return StreamingStat(0.0, 7.0, 1.0)
+
+
+class SenderStats:
+    """Everything one radio heard from one node, direct or relayed."""
+
+    __slots__ = ("packets", "last_heard", "snr", "rssi", "hops")
+
+    def __init__(self):
+        self.packets = 0
+        self.last_heard = 0.0
+        self.snr = _snr_stat()
+        self.rssi = _rssi_stat()
+        self.hops = _hops_stat()
+
+    def to_dict(self) -> dict:
+        return {
+            "packets": self.packets,
+            "last_heard": self.last_heard,
+            "snr": self.snr.to_dict(),
+            "rssi": self.rssi.to_dict(),
+            "hops": self.hops.to_dict()
+        }
+
+
+class LinkStats:
+    """Direct (zero-hop) receptions of one node by one of our radios."""
+
+    __slots__ = ("packets", "last_heard", "snr", "rssi")
+
+    def __init__(self):
+        self.packets = 0
+        self.last_heard = 0.0
+        self.snr = _snr_stat()
+        self.rssi = _rssi_stat()
+
+    def to_dict(self) -> dict:
+        return {
+            "packets": self.packets,
+            "last_heard": self.last_heard,
+            "snr": self.snr.to_dict(),
+            "rssi": self.rssi.to_dict()
+        }
+
+
+class LinkStatsTracker:
+    """Constant-memory signal statistics per sender and receiving radio, and per direct link.
+
+    Updated for every received packet on the radio reader threads, before
+    cross-radio dedup, so each radio keeps its own counts and SNR/RSSI/hops
+    for a sender instead of blending different receivers. A packet whose
+    ``hopStart`` equals its ``hopLimit`` was heard directly, so it also
+    updates the link between the sender and the radio that received it.
+    The number of tracked (sender, radio) pairs is capped at
+    ``link_stats_max_nodes``, evicting the least recently heard.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._lock = threading.Lock()
+        self._senders: "OrderedDict[Tuple[str, str], SenderStats]" = OrderedDict()  # (sender, radio)
+        self._links: Dict[Tuple[str, str], LinkStats] = {}
+        self._packets = 0
+
+    def observe(self, radio: str, packet: dict):
+        sender = packet.get("fromId")
+        if not sender:
+            return
+        snr = packet.get("rxSnr")
+        rssi = packet.get("rxRssi")
+        hop_start = packet.get("hopStart")
+        hop_limit = packet.get("hopLimit")
+        hops = hop_start - hop_limit if hop_start is not None and hop_limit is not None else None
+        if snr is None and rssi is None and hops is None:
+            return  # Locally generated, nothing was measured
+
+        alpha = self.settings.link_stats_alpha
+        now = time.time()
+        with self._lock:
+            self._packets += 1
+            key = (sender, radio)
+            stats = self._senders.get(key)
+            if stats is None:
+                stats = self._senders[key] = SenderStats()
+                self._evict()
+            else:
+                self._senders.move_to_end(key)
+            stats.packets += 1
+            stats.last_heard = now
+            if snr is not None:
+                stats.snr.add(snr, alpha)
+            if rssi is not None:
+                stats.rssi.add(rssi, alpha)
+            if hops is not None and hops >= 0:
+                stats.hops.add(hops, alpha)
+
+            if hops == 0:
+                link = self._links.get(key)
+                if link is None:
+                    link = self._links[key] = LinkStats()
+                link.packets += 1
+                link.last_heard = now
+                if snr is not None:
+                    link.snr.add(snr, alpha)
+                if rssi is not None:
+                    link.rssi.add(rssi, alpha)
+
+    def _evict(self):
+        while len(self._senders) > self.settings.link_stats_max_nodes:
+            key, _ = self._senders.popitem(last=False)
+            self._links.pop(key, None)
+
+    def get_node(self, node_id: str) -> Optional[dict]:
+        """Stats of one sender as heard by each radio, and its direct links."""
+        with self._lock:
+            radios = {radio: stats.to_dict() for (sender, radio), stats in self._senders.items()
+                      if sender == node_id}
+            if not radios:
+                return None
+            return {
+                "node_id": node_id,
+                "radios": radios,
+                "links": {
+                    radio: link.to_dict()
+                    for (sender, radio), link in self._links.items() if sender == node_id
+                }
+            }
+
+    def summary(self) -> List[dict]:
+        """One row per sender and receiving radio with the headline numbers."""
+        def ewma(stat: StreamingStat) -> Optional[float]:
+            return round(stat.ewma, 2) if stat.ewma is not None else None
+
+        with self._lock:
+            return [
+                {
+                    "node_id": node_id,
+                    "radio": radio,
+                    "packets": stats.packets,
+                    "last_heard": stats.last_heard,
+                    "snr_ewma": ewma(stats.snr),
+                    "snr_p50": stats.snr.quantile(0.5),
+                    "rssi_ewma": ewma(stats.rssi),
+                    "hops_ewma": ewma(stats.hops),
+                    "direct": (node_id, radio) in self._links
+                }
+                for (node_id, radio), stats in reversed(self._senders.items())
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            senders = {sender for sender, _ in self._senders}
+            return {"packets": self._packets, "senders": len(senders), "pairs": len(self._senders),
+                    "links": len(self._links)}
+
+    def prometheus(self) -> str:
+        """Render as Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                "# HELP mesh_packets_observed_total Packets with signal data seen by the dashboard",
+                "# TYPE mesh_packets_observed_total counter",
+                f"mesh_packets_observed_total {self._packets}",
+                "# HELP mesh_node_packets_total Packets received from a node",
+                "# TYPE mesh_node_packets_total counter",
+            ]
+            for (node_id, radio), stats in self._senders.items():
+                lines.append(f'mesh_node_packets_total{{node="{node_id}",radio="{radio}"}} {stats.packets}')
+
+            for name, attr, help_text in (
+                ("mesh_node_snr_db", "snr", "SNR of packets from a node"),
+                ("mesh_node_rssi_dbm", "rssi", "RSSI of packets from a node"),
+                ("mesh_node_hops", "hops", "Hops taken by packets from a node"),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} summary")
+                for (node_id, radio), stats in self._senders.items():
+                    stat = getattr(stats, attr)
+                    if not stat.count:
+                        continue
+                    labels = f'node="{node_id}",radio="{radio}"'
+                    for q in QUANTILES:
+                        lines.append(f'{name}{{{labels},quantile="{q}"}} {stat.quantile(q)}')
+                    lines.append(f'{name}_count{{{labels}}} {stat.count}')
+                lines.append(f"# HELP {name}_ewma {help_text} (EWMA)")
+                lines.append(f"# TYPE {name}_ewma gauge")
+                for (node_id, radio), stats in self._senders.items():
+                    stat = getattr(stats, attr)
+                    if stat.ewma is not None:
+                        lines.append(f'{name}_ewma{{node="{node_id}",radio="{radio}"}} {round(stat.ewma, 3)}')
+
+            for name, attr, help_text in (
+                ("mesh_link_snr_db_ewma", "snr", "SNR of direct receptions on a radio (EWMA)"),
+                ("mesh_link_rssi_dbm_ewma", "rssi", "RSSI of direct receptions on a radio (EWMA)"),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} gauge")
+                for (node_id, radio), link in self._links.items():
+                    stat = getattr(link, attr)
+                    if stat.ewma is not None:
+                        lines.append(f'{name}{{node="{node_id}",radio="{radio}"}} {round(stat.ewma, 3)}')
+
+        return "\n".join(lines) + "\n"
+
+
+# Singleton instance
+link_stats = LinkStatsTracker()
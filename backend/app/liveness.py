@@ -0,0 +1,184 @@
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Node states, matching the frontend badges
+ONLINE = "online"
+RECENT = "recent"
+OFFLINE = "offline"
+UNKNOWN = "unknown"
+
+STATES = (ONLINE, RECENT, OFFLINE, UNKNOWN)
+
+
+class LivenessIndex:
+    """Server-side online/recent/offline classification of nodes.
+
+    Each node has at most one live entry in a min-heap keyed by the time it
+    next crosses a threshold (online -> recent -> offline). Hearing a node
+    only pushes a new entry if its next crossing moved earlier; otherwise the
+    existing entry pops early and is rescheduled from the latest ``lastHeard``.
+    A background tick pops due entries, so work is proportional to actual
+    transitions rather than to the number of nodes.
+
+    Counts per state are kept incrementally. A ``node_status`` WebSocket event
+    is emitted only when a known node changes state.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        # Updated from the radios' ingest threads, read from the event loop
+        self._lock = threading.Lock()
+        self._last_heard: Dict[str, float] = {}
+        self._state: Dict[str, str] = {}
+        self._counts: Dict[str, int] = {state: 0 for state in STATES}
+        self._heap: List[Tuple[float, str]] = []
+        self._deadline: Dict[str, float] = {}  # node -> deadline of its live heap entry
+        self._transitions: List[dict] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def _classify(self, last_heard: float, now: float) -> str:
+        age = now - last_heard
+        if age <= self.settings.liveness_online_threshold:
+            return ONLINE
+        if age <= self.settings.liveness_recent_threshold:
+            return RECENT
+        return OFFLINE
+
+    def _set_state(self, node: str, state: str):
+        previous = self._state.get(node)
+        if previous == state:
+            return
+        self._state[node] = state
+        self._counts[state] += 1
+        if previous is None:
+            return  # First sighting is not a transition
+        self._counts[previous] -= 1
+        last_heard = self._last_heard.get(node)
+        self._transitions.append({
+            "node_id": node,
+            "status": state,
+            "previous": previous,
+            "last_heard": datetime.fromtimestamp(last_heard).isoformat() if last_heard else None
+        })
+
+    def _schedule(self, node: str, last_heard: float, now: float):
+        for threshold in (self.settings.liveness_online_threshold, self.settings.liveness_recent_threshold):
+            deadline = last_heard + threshold
+            if deadline > now:
+                break
+        else:
+            return  # Already offline, nothing left to cross
+
+        current = self._deadline.get(node)
+        if current is None or deadline < current:
+            self._deadline[node] = deadline
+            heapq.heappush(self._heap, (deadline, node))
+
+    # ----- Updates -----
+
+    def heard(self, node: str, when: Optional[float] = None):
+        """Record that ``node`` was heard at ``when`` (epoch seconds, default now)."""
+        if not node or not node.startswith("!"):
+            return
+        now = time.time()
+        when = min(when or now, now)
+        with self._lock:
+            previous = self._last_heard.get(node)
+            if previous is not None and when <= previous:
+                return
+            self._last_heard[node] = when
+            self._set_state(node, self._classify(when, now))
+            self._schedule(node, when, now)
+
+    def seed(self, nodes: dict):
+        """Load ``lastHeard`` from a radio's node DB."""
+        for node_id, node in nodes.items():
+            if not isinstance(node, dict):
+                continue
+            last_heard = node.get("lastHeard")
+            if last_heard:
+                self.heard(node_id, last_heard)
+            else:
+                with self._lock:
+                    if node_id not in self._state:
+                        self._set_state(node_id, UNKNOWN)
+
+    def advance(self, now: Optional[float] = None) -> List[dict]:
+        """Apply threshold crossings that are due. Returns transitions since the last call."""
+        now = now or time.time()
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, node = heapq.heappop(self._heap)
+                if self._deadline.get(node) != deadline:
+                    continue  # Superseded by an earlier entry
+                del self._deadline[node]
+                last_heard = self._last_heard[node]
+                self._set_state(node, self._classify(last_heard, now))
+                self._schedule(node, last_heard, now)
+
+            transitions = self._transitions
+            self._transitions = []
+        return transitions
+
+    # ----- Queries -----
+
+    def status(self, node: str) -> str:
+        return self._state.get(node, UNKNOWN)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counts": dict(self._counts),
+                "thresholds": {
+                    "online": self.settings.liveness_online_threshold,
+                    "recent": self.settings.liveness_recent_threshold
+                },
+                "nodes": dict(self._state)
+            }
+
+    # ----- Background tick -----
+
+    async def _run(self):
+        from app.routers.websocket import broadcast
+
+        while True:
+            await asyncio.sleep(self.settings.liveness_tick)
+            try:
+                transitions = self.advance()
+                if not transitions:
+                    continue
+                counts = self.counts()
+                for transition in transitions:
+                    await broadcast({"type": "node_status", "data": {**transition, "counts": counts}})
+                logger.debug(f"[LIVE] {len(transitions)} status transitions")
+            except Exception as e:
+                logger.error(f"[LIVE] Tick error: {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Singleton instance
+liveness = LivenessIndex()
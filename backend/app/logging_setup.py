@@ -0,0 +1,206 @@
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+from app.config import get_settings
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+LOG_FILE = os.path.join(LOG_DIR, "meshtastic_dashboard.log")
+
+# Logger used for per-packet lines on the BLE callback thread. It is rate-limited
+# so a packet storm can't turn into a log storm.
+PACKET_LOGGER_NAME = "app.packets"
+
+LEVEL_NAMES = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+
+class LazyQueueHandler(QueueHandler):
+    """QueueHandler that defers all formatting to the listener thread.
+
+    The stock QueueHandler formats the message on the calling thread before
+    enqueueing it. Here records are enqueued as-is so the f-string/percent
+    merge, the formatter and the file I/O all happen on the background writer.
+    When the queue is full the record is dropped instead of blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RateLimitFilter(logging.Filter):
+    """Token-bucket filter allowing ``rate`` records per second with a burst.
+
+    Suppressed records are counted and reported on the next record that passes.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        super().__init__()
+        self._lock = threading.Lock()
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self.suppressed = 0
+        self._suppressed_since_report = 0
+
+    def configure(self, rate: float, burst: Optional[int] = None):
+        with self._lock:
+            self.rate = rate
+            if burst is not None:
+                self.burst = burst
+            self._tokens = min(self._tokens, float(self.burst))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0:
+            return True
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._last) * self.rate)
+            self._last = now
+
+            if self._tokens < 1.0:
+                self.suppressed += 1
+                self._suppressed_since_report += 1
+                return False
+
+            self._tokens -= 1.0
+            if self._suppressed_since_report:
+                record.msg = f"{record.msg} [{self._suppressed_since_report} packet log lines suppressed]"
+                self._suppressed_since_report = 0
+            return True
+
+
+class LoggingPipeline:
+    """Queue-based logging: producers enqueue, one background thread writes."""
+
+    def __init__(self):
+        self.queue: Optional[queue.Queue] = None
+        self.queue_handler: Optional[LazyQueueHandler] = None
+        self.listener: Optional[QueueListener] = None
+        self.file_handler: Optional[RotatingFileHandler] = None
+        self.console_handler: Optional[logging.StreamHandler] = None
+        self.packet_filter: Optional[RateLimitFilter] = None
+
+    def configure(self):
+        """Install the queue handler on the root logger and start the writer thread."""
+        if self.listener is not None:
+            return
+
+        settings = get_settings()
+        os.makedirs(LOG_DIR, exist_ok=True)
+
+        # Create formatter with clear labels
+        log_formatter = logging.Formatter(
+            "%(asctime)s | %(levelname)-8s | %(name)-25s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
+
+        # File handler with rotation: 5MB max size, keep 1 backup (total 10MB max)
+        self.file_handler = RotatingFileHandler(
+            LOG_FILE,
+            maxBytes=5 * 1024 * 1024,  # 5MB
+            backupCount=1,  # Keep 1 backup file
+            encoding="utf-8"
+        )
+        self.file_handler.setFormatter(log_formatter)
+        self.file_handler.setLevel(settings.log_level_file.upper())
+
+        # Console handler for terminal output
+        self.console_handler = logging.StreamHandler()
+        self.console_handler.setFormatter(log_formatter)
+        self.console_handler.setLevel(settings.log_level_console.upper())
+
+        self.queue = queue.Queue(maxsize=settings.log_queue_size)
+        self.queue_handler = LazyQueueHandler(self.queue)
+        self.listener = QueueListener(
+            self.queue, self.file_handler, self.console_handler, respect_handler_level=True
+        )
+
+        # Configure root logger. The root level tracks the most verbose handler so
+        # records nobody will write are rejected before a LogRecord is built.
+        root_logger = logging.getLogger()
+        root_logger.addHandler(self.queue_handler)
+        self._sync_root_level()
+
+        # Reduce noise from third-party libraries
+        logging.getLogger("asyncio").setLevel(logging.WARNING)
+        logging.getLogger("bleak").setLevel(logging.WARNING)
+        logging.getLogger("httpcore").setLevel(logging.WARNING)
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        logging.getLogger("urllib3").setLevel(logging.WARNING)
+
+        self.packet_filter = RateLimitFilter(settings.packet_log_rate, settings.packet_log_burst)
+        logging.getLogger(PACKET_LOGGER_NAME).addFilter(self.packet_filter)
+
+        self.listener.start()
+
+    def shutdown(self):
+        """Flush pending records and stop the writer thread."""
+        if self.listener is None:
+            return
+        self.listener.stop()
+        logging.getLogger().removeHandler(self.queue_handler)
+        self.listener = None
+
+    def _sync_root_level(self):
+        levels = [h.level for h in (self.file_handler, self.console_handler) if h is not None]
+        logging.getLogger().setLevel(min(levels) if levels else logging.DEBUG)
+
+    def set_level(self, target: str, level: str):
+        """Change verbosity at runtime.
+
+        ``target`` is ``file``, ``console`` or any logger name (``root`` for the
+        root logger). Raises ValueError for unknown levels.
+        """
+        level = level.upper()
+        if level not in LEVEL_NAMES:
+            raise ValueError(f"Unknown log level '{level}'")
+
+        if target == "file" and self.file_handler:
+            self.file_handler.setLevel(level)
+            self._sync_root_level()
+        elif target == "console" and self.console_handler:
+            self.console_handler.setLevel(level)
+            self._sync_root_level()
+        elif target == "root":
+            logging.getLogger().setLevel(level)
+        else:
+            logging.getLogger(target).setLevel(level)
+
+    def get_status(self) -> dict:
+        """Current handler levels, per-logger overrides and queue health."""
+        loggers = {}
+        for name, obj in logging.root.manager.loggerDict.items():
+            if isinstance(obj, logging.Logger) and obj.level != logging.NOTSET:
+                loggers[name] = logging.getLevelName(obj.level)
+
+        return {
+            "root": logging.getLevelName(logging.getLogger().level),
+            "file": logging.getLevelName(self.file_handler.level) if self.file_handler else None,
+            "console": logging.getLevelName(self.console_handler.level) if self.console_handler else None,
+            "loggers": dict(sorted(loggers.items())),
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "queue_size": self.queue.maxsize if self.queue else 0,
+            "dropped": self.queue_handler.dropped if self.queue_handler else 0,
+            "packet_log_rate": self.packet_filter.rate if self.packet_filter else None,
+            "packet_log_burst": self.packet_filter.burst if self.packet_filter else None,
+            "packet_log_suppressed": self.packet_filter.suppressed if self.packet_filter else 0
+        }
+
+
+# Singleton instance
+logging_pipeline = LoggingPipeline()
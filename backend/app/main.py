@@ -1,52 +1,53 @@
+import asyncio
 import logging
-import os
-from logging.handlers import RotatingFileHandler
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from app.startup import startup_timer
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import init_db
-from app.routers import nodes, messages, telemetry, connection, websocket
-
-# Configure logging with file output
-LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
-LOG_FILE = os.path.join(LOG_DIR, "meshtastic_dashboard.log")
+startup_timer.mark("fastapi_import")
+from app.logging_setup import logging_pipeline, LOG_FILE
 
-# Create formatter with clear labels
-log_formatter = logging.Formatter(
-    "%(asctime)s | %(levelname)-8s | %(name)-25s | %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
-
-# File handler with rotation: 5MB max size, keep 1 backup (total 10MB max)
-file_handler = RotatingFileHandler(
-    LOG_FILE,
-    maxBytes=5 * 1024 * 1024,  # 5MB
-    backupCount=1,  # Keep 1 backup file
-    encoding="utf-8"
-)
-file_handler.setFormatter(log_formatter)
-file_handler.setLevel(logging.DEBUG)  # Capture everything to file
-
-# Console handler for terminal output
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(log_formatter)
-console_handler.setLevel(logging.INFO)  # Less verbose for console
-
-# Configure root logger
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.DEBUG)
-root_logger.addHandler(file_handler)
-root_logger.addHandler(console_handler)
-
-# Reduce noise from third-party libraries
-logging.getLogger("asyncio").setLevel(logging.WARNING)
-logging.getLogger("bleak").setLevel(logging.WARNING)
-logging.getLogger("httpcore").setLevel(logging.WARNING)
-logging.getLogger("httpx").setLevel(logging.WARNING)
-logging.getLogger("urllib3").setLevel(logging.WARNING)
+# Configure logging before anything else logs. Records go through a queue and
+# are formatted and written by a background thread, off the packet hot path.
+logging_pipeline.configure()
+startup_timer.mark("logging")
 
+from app.config import get_settings
+from app.database import init_db
+from app.event_bus import event_bus
+from app.event_store import event_store
+from app.projections import projector
+from app.response_cache import response_cache
+from app.executors import radio_executors
+from app.topology import topology
+from app.liveness import liveness
+from app.alerts import alert_engine
+from app.ble_discovery import ble_discovery
+from app.routers import nodes, messages, telemetry, connection, websocket, admin, metrics, export, alerts, \
+    topology as topology_router
+
+startup_timer.mark("imports")
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+async def initialize():
+    """Database and state that must be loaded before the API is fully ready."""
+    with startup_timer.phase("db"):
+        await init_db()
+    with startup_timer.phase("topology_load"):
+        await topology.load()
+    topology.start()
+    liveness.start()
+    with startup_timer.phase("legacy_seed"):
+        # Before any live event, so "older than the first event" means pre-upgrade
+        await projector.seed_legacy()
+    event_store.add_listener(projector.notify)
+    projector.add_listener(response_cache.invalidate)
+    event_store.start()
+    projector.start()
+    alert_engine.start()
+    startup_timer.mark_ready()
 
 
 @asynccontextmanager
@@ -57,11 +58,35 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Meshtastic Dashboard API...")
     logger.info(f"Log file: {LOG_FILE}")
     logger.info("=" * 60)
-    await init_db()
-    logger.info("Database initialized")
+    logger.info(f"Process role: {settings.process_role}")
+    init_task = None
+    if event_bus.is_worker:
+        # Stateless worker: the ingest process owns the radios, DB schema and
+        # in-memory state; we only relay events and serve DB reads
+        event_bus.start_client()
+        startup_timer.mark_ready()
+    elif settings.fast_start:
+        # Serve /health right away; DB setup finishes in the background
+        init_task = asyncio.create_task(initialize())
+    else:
+        await initialize()
+    if event_bus.is_ingest:
+        response_cache.add_listener(event_bus.invalidate)
+        await event_bus.start_server(app)
     yield
     # Shutdown
     logger.info("Shutting down...")
+    if init_task and not init_task.done():
+        init_task.cancel()
+    await event_bus.stop()
+    await event_store.stop()
+    await projector.stop()
+    await alert_engine.stop()
+    await ble_discovery.stop()
+    await topology.stop()
+    await liveness.stop()
+    radio_executors.shutdown()
+    logging_pipeline.shutdown()
 
 
 app = FastAPI(
@@ -80,12 +105,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if event_bus.is_worker:
+    @app.middleware("http")
+    async def forward_to_ingest(request: Request, call_next):
+        """Send anything needing radio or in-memory state to the ingest process."""
+        if event_bus.serves_locally(request.method, request.url.path):
+            return await call_next(request)
+        return await event_bus.forward_http(request)
+
 # Include routers
 app.include_router(nodes.router)
 app.include_router(messages.router)
 app.include_router(telemetry.router)
 app.include_router(connection.router)
 app.include_router(websocket.router)
+app.include_router(admin.router)
+app.include_router(topology_router.router)
+app.include_router(metrics.router)
+app.include_router(export.router)
+app.include_router(alerts.router)
+startup_timer.mark("router_setup")
 
 
 @app.get("/")
@@ -95,4 +134,7 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
+    health = {"status": "healthy", "ready": startup_timer.ready}
+    if settings.process_role != "all":
+        health["bus"] = event_bus.stats()
+    return health
@@ -1,19 +1,68 @@
 import asyncio
 import logging
+import queue
+import random
 import threading
-from datetime import datetime
-from typing import Callable, Optional, List
-from pubsub import pub
-from meshtastic.ble_interface import BLEInterface
+import time
+from typing import Callable, Dict, Optional, List, Tuple
 from app.config import get_settings
+from app.ble_discovery import ble_discovery, ble_interface_class
+from app.events import (
+    RadioEvent, MessageEvent, PositionEvent, NodeUpdateEvent,
+    DeviceTelemetry, EnvironmentTelemetry, AirQualityTelemetry, PowerTelemetry,
+    ConnectionEvent, AckEvent, TracerouteEvent, TracerouteErrorEvent, RoutingEvent, NeighborInfoEvent,
+    WaypointEvent, AdminEvent, RangeTestEvent, StoreForwardEvent, DetectionSensorEvent, PaxcounterEvent,
+    RawPacketEvent
+)
+from app.logging_setup import PACKET_LOGGER_NAME
+from app.executors import radio_executors
+from app.send_scheduler import send_scheduler, Priority, QueueFullError
+from app.traceroute_manager import traceroute_manager, normalize_node_id
+from app.topology import topology
+from app.link_stats import link_stats
+from app.liveness import liveness
+from app.device_config import DeviceConfigCache
 
 logger = logging.getLogger(__name__)
+# Per-packet lines go through a rate-limited logger and use lazy %-formatting so
+# the BLE callback thread never pays for string building that gets dropped.
+packet_logger = logging.getLogger(PACKET_LOGGER_NAME)
+
+TRANSPORTS = ("ble", "serial", "tcp")
+# Seconds to wait for the ingest thread to work through its queue when a radio disconnects
+INGEST_STOP_TIMEOUT = 5.0
+
+
+def parse_device_spec(spec: str) -> Tuple[str, Optional[str]]:
+    """Split a device entry into (transport, target).
+
+    "tcp:host[:port]" and "serial:/dev/ttyUSB0" select wired transports; anything
+    else is a BLE device name.
+    """
+    prefix, sep, rest = spec.partition(":")
+    if sep and prefix.lower() in ("tcp", "serial"):
+        return prefix.lower(), rest or None
+    return "ble", spec
 
 
 class MeshtasticClient:
-    def __init__(self):
-        self.interface: Optional[BLEInterface] = None
+    # pubsub topics are process-global, so every client sees every interface's
+    # packets. Map interfaces to their owning client to filter them.
+    _interface_owners: Dict[int, "MeshtasticClient"] = {}
+    # Only one interface is constructed at a time, so packets from a not-yet-owned
+    # interface can be attributed to the client that is connecting.
+    _connect_serial: Optional[asyncio.Lock] = None
+
+    def __init__(self, device_name: Optional[str] = None, radio_id: Optional[str] = None,
+                 transport: Optional[str] = None):
+        self.interface = None
         self.settings = get_settings()
+        self.transport = (transport or self.settings.meshtastic_transport or "ble").lower()
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f"Unknown transport '{self.transport}', expected one of {', '.join(TRANSPORTS)}")
+        # BLE name, serial device path or "host[:port]" depending on transport
+        self.device_name = device_name or self._default_target()
+        self.radio_id = radio_id or self.device_name or self.transport
         self._connected = False
         self._my_info = None
         self._metadata = None
@@ -25,16 +74,54 @@ class MeshtasticClient:
         self._reconnect_task: Optional[asyncio.Task] = None
         self._reconnect_attempts = 0
         self._max_reconnect_attempts = 5
-        self._reconnect_delay = 5  # seconds
+        # Wired links come back quickly; BLE needs time for the adapter to release
+        self._reconnect_delay = 5 if self.is_ble else 2  # seconds
         self._last_error: Optional[str] = None  # Store last connection error
         self._close_failed = False  # Track if last close had issues
         self._device_address: Optional[str] = None  # Store BLE address for cleanup
         self._last_scan_result: Optional[dict] = None  # Store last BLE scan results
+        self._connecting = False
+        self.config_cache = DeviceConfigCache()
+
+        # Ingest: the reader thread only enqueues; a per-radio thread decodes and dispatches
+        self._ingest_queue: "queue.Queue" = queue.Queue(maxsize=self.settings.ingest_queue_size)
+        self._ingest_thread: Optional[threading.Thread] = None
+        self._ingest_dropped = 0
+        # Optional gate set by the client manager to drop packets already heard by another radio
+        self.packet_filter: Optional[Callable[["MeshtasticClient", dict], bool]] = None
 
     @property
     def connected(self) -> bool:
         return self._connected and self.interface is not None
 
+    @property
+    def is_ble(self) -> bool:
+        return self.transport == "ble"
+
+    def _default_target(self) -> Optional[str]:
+        if self.transport == "tcp":
+            host = self.settings.meshtastic_tcp_host
+            return f"{host}:{self.settings.meshtastic_tcp_port}" if host else None
+        if self.transport == "serial":
+            return self.settings.meshtastic_serial_port
+        return self.settings.meshtastic_device_name
+
+    def _create_interface(self):
+        """Construct the library interface for this transport. Blocks until config is downloaded."""
+        if self.transport == "tcp":
+            from meshtastic.tcp_interface import TCPInterface
+            if not self.device_name:
+                raise ValueError("No TCP host configured (set MESHTASTIC_TCP_HOST)")
+            host, sep, port = self.device_name.rpartition(":")
+            if not sep or not port.isdigit():
+                host, port = self.device_name, str(self.settings.meshtastic_tcp_port)
+            return TCPInterface(hostname=host, portNumber=int(port))
+        if self.transport == "serial":
+            from meshtastic.serial_interface import SerialInterface
+            return SerialInterface(devPath=self.device_name)
+        # Connects straight to a cached advertisement when there is one
+        return ble_interface_class()(self.device_name)
+
     @property
     def my_node_num(self) -> Optional[int]:
         if self._my_info is None:
@@ -89,7 +176,7 @@ class MeshtasticClient:
 
     async def _scan_for_device(self) -> Optional[str]:
         """Scan for the Meshtastic device and return its address."""
-        device_name = self.settings.meshtastic_device_name
+        device_name = self.device_name
         logger.info(f"[BLE] Scanning for device: {device_name}")
 
         try:
@@ -122,35 +209,44 @@ class MeshtasticClient:
         """
         from bleak import BleakScanner
 
-        logger.info(f"[BLE] Starting BLE scan (timeout={timeout}s)...")
-
         result = {
             "meshtastic_devices": [],
             "other_devices": [],
-            "configured_device": self.settings.meshtastic_device_name,
+            "configured_device": self.device_name,
             "configured_device_found": False,
             "scan_duration": timeout
         }
 
         try:
-            devices = await asyncio.wait_for(
-                BleakScanner.discover(timeout=timeout),
-                timeout=timeout + 2  # Extra buffer for the discover call
-            )
+            if ble_discovery.covers(timeout):
+                # The discovery scanner has been listening at least this long
+                logger.info("[BLE] Using discovery cache instead of a new scan")
+                result["cached"] = True
+                devices = [(entry.name, entry.address, entry.rssi, entry.meshtastic)
+                           for entry in ble_discovery.devices(timeout)]
+            else:
+                logger.info(f"[BLE] Starting BLE scan (timeout={timeout}s)...")
+                discovered = await asyncio.wait_for(
+                    BleakScanner.discover(timeout=timeout),
+                    timeout=timeout + 2  # Extra buffer for the discover call
+                )
+                devices = [(device.name, device.address, getattr(device, "rssi", None),
+                            bool(device.name and "Meshtastic" in device.name))
+                           for device in discovered]
 
-            for device in devices:
-                if not device.name:
+            for name, address, rssi, is_meshtastic in devices:
+                if not name:
                     continue  # Skip unnamed devices
 
                 device_info = {
-                    "name": device.name,
-                    "address": device.address,
-                    "rssi": device.rssi if hasattr(device, 'rssi') else None
+                    "name": name,
+                    "address": address,
+                    "rssi": rssi
                 }
 
-                if "Meshtastic" in device.name:
+                if is_meshtastic:
                     result["meshtastic_devices"].append(device_info)
-                    if device.name == self.settings.meshtastic_device_name:
+                    if name == self.device_name:
                         result["configured_device_found"] = True
                 else:
                     result["other_devices"].append(device_info)
@@ -175,8 +271,12 @@ class MeshtasticClient:
         return result
 
     async def reset_ble(self) -> dict:
-        """Reset BLE connection state. Use when connection is stuck."""
-        logger.info("[BLE] Starting BLE reset...")
+        """Reset BLE connection state. Use when connection is stuck.
+
+        For wired transports there is no adapter state to clear, so this only
+        drops the interface and lets the next connect start fresh.
+        """
+        logger.info(f"[CONN] Starting connection reset ({self.transport})...")
 
         result = {
             "success": False,
@@ -189,12 +289,7 @@ class MeshtasticClient:
         self._connected = False
 
         # Unsubscribe from events
-        try:
-            pub.unsubscribe(self._on_receive, "meshtastic.receive")
-            pub.unsubscribe(self._on_connection, "meshtastic.connection.established")
-            pub.unsubscribe(self._on_disconnect, "meshtastic.connection.lost")
-        except Exception:
-            pass
+        self._unsubscribe()
 
         # Try to close interface if we have one
         if self.interface:
@@ -206,10 +301,20 @@ class MeshtasticClient:
             except Exception:
                 pass
 
+            MeshtasticClient._interface_owners.pop(id(self.interface), None)
             self.interface = None
             self._my_info = None
             self._metadata = None
             self._nodes = {}
+            self.config_cache.clear()
+        await self._stop_ingest()
+
+        if not self.is_ble:
+            result["success"] = True
+            result["message"] = f"{self.transport.upper()} connection state cleared"
+            self._close_failed = False
+            self._schedule_event("connection", ConnectionEvent({"connected": False, "reset": True}))
+            return result
 
         # Try force cleanup if we have an address
         if self._device_address:
@@ -231,7 +336,7 @@ class MeshtasticClient:
             result["message"] = "Device not found after reset. BLE may still be held by system. Try restarting the server."
             self._close_failed = True
 
-        self._schedule_event("connection", {"connected": False, "reset": True})
+        self._schedule_event("connection", ConnectionEvent({"connected": False, "reset": True}))
 
         return result
 
@@ -242,28 +347,132 @@ class MeshtasticClient:
         if callback in self._event_callbacks:
             self._event_callbacks.remove(callback)
 
-    def _schedule_event(self, event_type: str, data: dict):
+    def _schedule_event(self, event_type: str, data: RadioEvent):
         """Schedule an event to run on the main event loop (thread-safe)."""
         if self._main_loop is None:
             return
+        # Bound methods instead of per-event closures
+        self._main_loop.call_soon_threadsafe(self._start_emit, event_type, data)
 
-        async def emit():
-            for callback in self._event_callbacks:
-                try:
-                    if asyncio.iscoroutinefunction(callback):
-                        await callback(event_type, data)
-                    else:
-                        callback(event_type, data)
-                except Exception as e:
-                    logger.error(f"Error in event callback: {e}")
+    def _start_emit(self, event_type: str, data: RadioEvent):
+        asyncio.create_task(self._emit(event_type, data))
 
-        # Schedule on the main loop from any thread
-        self._main_loop.call_soon_threadsafe(
-            lambda: asyncio.create_task(emit())
-        )
+    async def _emit(self, event_type: str, data: RadioEvent):
+        for callback in self._event_callbacks:
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(event_type, data)
+                else:
+                    callback(event_type, data)
+            except Exception as e:
+                logger.error(f"Error in event callback: {e}")
+
+    # pubsub (and the meshtastic/bleak stack behind it) is only imported on first
+    # connect, so the API process starts without loading the radio libraries
+
+    def _subscribe(self):
+        from pubsub import pub
+        pub.subscribe(self._on_receive, "meshtastic.receive")
+        pub.subscribe(self._on_connection, "meshtastic.connection.established")
+        pub.subscribe(self._on_disconnect, "meshtastic.connection.lost")
+
+    def _unsubscribe(self):
+        try:
+            from pubsub import pub
+            pub.unsubscribe(self._on_receive, "meshtastic.receive")
+            pub.unsubscribe(self._on_connection, "meshtastic.connection.established")
+            pub.unsubscribe(self._on_disconnect, "meshtastic.connection.lost")
+        except Exception:
+            pass
+
+    def _owns(self, interface) -> bool:
+        """Whether a pubsub message from ``interface`` belongs to this client."""
+        owner = MeshtasticClient._interface_owners.get(id(interface))
+        if owner is None:
+            return self._connecting
+        return owner is self
 
     def _on_receive(self, packet, interface):
-        """Handle received packets."""
+        """Handle received packets (called on the radio's reader thread).
+
+        Only updates the O(1) signal statistics and enqueues the packet so the
+        reader can get back to the radio; the ingest thread does the decoding
+        and dispatch.
+        """
+        if not self._owns(interface):
+            return
+        link_stats.observe(self.radio_id, packet)
+        try:
+            self._ingest_queue.put_nowait(packet)
+        except queue.Full:
+            self._ingest_dropped += 1
+            if self._ingest_dropped % 100 == 1:
+                logger.warning(f"[{self.radio_id}] Ingest queue full, dropped {self._ingest_dropped} packets")
+
+    def _start_ingest(self):
+        if self._ingest_thread is not None and self._ingest_thread.is_alive():
+            return
+        self._ingest_thread = threading.Thread(
+            target=self._ingest_loop, args=(self._ingest_queue,), name=f"ingest-{self.radio_id}", daemon=True
+        )
+        self._ingest_thread.start()
+
+    async def _stop_ingest(self):
+        """Stop the ingest thread once it has decoded the packets already queued.
+
+        The thread keeps its queue; packets of a new connection go to a fresh
+        one, so a reconnect doesn't wait for (or take the sentinel of) the old thread.
+        """
+        thread, ingest_queue = self._ingest_thread, self._ingest_queue
+        if thread is None:
+            return
+        self._ingest_queue = queue.Queue(maxsize=self.settings.ingest_queue_size)
+        self._ingest_thread = None
+        await asyncio.to_thread(self._finish_ingest, thread, ingest_queue)
+
+    def _finish_ingest(self, thread: threading.Thread, ingest_queue: "queue.Queue"):
+        """Deliver the stop sentinel to ``thread`` and wait for it to exit."""
+        try:
+            ingest_queue.put(None, timeout=INGEST_STOP_TIMEOUT)
+        except queue.Full:
+            # Still backed up: drop the rest so the sentinel gets through
+            dropped = 0
+            while True:
+                try:
+                    ingest_queue.put_nowait(None)
+                    break
+                except queue.Full:
+                    pass
+                while not ingest_queue.empty():
+                    try:
+                        ingest_queue.get_nowait()
+                        dropped += 1
+                    except queue.Empty:
+                        break
+            self._ingest_dropped += dropped
+            logger.warning(f"[{self.radio_id}] Ingest backlog not decoded in time, dropped {dropped} packets")
+        thread.join(INGEST_STOP_TIMEOUT)
+        if thread.is_alive():
+            logger.warning(f"[{self.radio_id}] Ingest thread still decoding after {INGEST_STOP_TIMEOUT:g}s")
+
+    def _ingest_loop(self, ingest_queue: "queue.Queue"):
+        while True:
+            packet = ingest_queue.get()
+            if packet is None:
+                return
+            if self.packet_filter is not None and not self.packet_filter(self, packet):
+                continue
+            self._process_packet(packet)
+
+    def ingest_stats(self) -> dict:
+        return {
+            "queue_depth": self._ingest_queue.qsize(),
+            "queue_size": self._ingest_queue.maxsize,
+            "dropped": self._ingest_dropped
+        }
+
+    def _process_packet(self, packet):
+        """Decode a received packet and dispatch it to its handler."""
         try:
             decoded = packet.get("decoded", {})
             portnum = decoded.get("portnum")
@@ -271,7 +480,8 @@ class MeshtasticClient:
             to_id = packet.get("toId", "unknown")
 
             # Log all received packets for debugging
-            logger.debug(f"Received packet from {from_id}: portnum={portnum}")
+            packet_logger.debug("Received packet from %s: portnum=%s", from_id, portnum)
+            liveness.heard(from_id)
 
             if portnum == "TEXT_MESSAGE_APP":
                 self._handle_text_message(packet)
@@ -317,15 +527,10 @@ class MeshtasticClient:
         is_broadcast = to_id in (None, "^all", "!ffffffff", 4294967295)
         msg_type = "BROADCAST" if is_broadcast else f"DM→{to_id}"
 
-        logger.info(f"[MSG] Received {msg_type} from {from_id} on ch{channel}: {text[:50]}{'...' if len(text) > 50 else ''}")
+        logger.info("[MSG] Received %s from %s on ch%s: %.50s%s",
+                    msg_type, from_id, channel, text, "..." if len(text) > 50 else "")
 
-        self._schedule_event("message", {
-            "from_node_id": from_id,
-            "to_node_id": to_id,
-            "channel": channel,
-            "text": text,
-            "timestamp": datetime.now().isoformat()
-        })
+        self._schedule_event("message", MessageEvent(from_id, to_id, channel, text))
 
     def _handle_position(self, packet):
         """Handle position updates."""
@@ -334,13 +539,9 @@ class MeshtasticClient:
         from_id = packet.get("fromId")
 
         if position:
-            self._schedule_event("position", {
-                "node_id": from_id,
-                "latitude": position.get("latitude"),
-                "longitude": position.get("longitude"),
-                "altitude": position.get("altitude"),
-                "timestamp": datetime.now().isoformat()
-            })
+            self._schedule_event("position", PositionEvent(
+                from_id, position.get("latitude"), position.get("longitude"), position.get("altitude")
+            ))
 
     def _handle_telemetry(self, packet):
         """Handle telemetry updates - device, environment, air quality, and power metrics."""
@@ -351,69 +552,69 @@ class MeshtasticClient:
         # Device metrics (battery, utilization, uptime)
         device_metrics = telemetry.get("deviceMetrics", {})
         if device_metrics:
-            self._schedule_event("telemetry", {
-                "node_id": from_id,
-                "type": "device",
-                "battery_level": device_metrics.get("batteryLevel"),
-                "voltage": device_metrics.get("voltage"),
-                "channel_utilization": device_metrics.get("channelUtilization"),
-                "air_util_tx": device_metrics.get("airUtilTx"),
-                "uptime_seconds": device_metrics.get("uptimeSeconds"),
-                "timestamp": datetime.now().isoformat()
-            })
+            # Airtime readings pace the outbound scheduler
+            my_node_num = self.my_node_num
+            send_scheduler.report_airtime(
+                device_metrics.get("channelUtilization"),
+                device_metrics.get("airUtilTx"),
+                local=my_node_num is not None and packet.get("from") == my_node_num,
+                owner=self.radio_id
+            )
+            self._schedule_event("telemetry", DeviceTelemetry(
+                from_id,
+                battery_level=device_metrics.get("batteryLevel"),
+                voltage=device_metrics.get("voltage"),
+                channel_utilization=device_metrics.get("channelUtilization"),
+                air_util_tx=device_metrics.get("airUtilTx"),
+                uptime_seconds=device_metrics.get("uptimeSeconds")
+            ))
 
         # Environment metrics (temperature, humidity, pressure)
         environment_metrics = telemetry.get("environmentMetrics", {})
         if environment_metrics:
-            self._schedule_event("telemetry", {
-                "node_id": from_id,
-                "type": "environment",
-                "temperature": environment_metrics.get("temperature"),
-                "relative_humidity": environment_metrics.get("relativeHumidity"),
-                "barometric_pressure": environment_metrics.get("barometricPressure"),
-                "gas_resistance": environment_metrics.get("gasResistance"),
-                "iaq": environment_metrics.get("iaq"),
-                "distance": environment_metrics.get("distance"),
-                "lux": environment_metrics.get("lux"),
-                "white_lux": environment_metrics.get("whiteLux"),
-                "ir_lux": environment_metrics.get("irLux"),
-                "uv_lux": environment_metrics.get("uvLux"),
-                "wind_direction": environment_metrics.get("windDirection"),
-                "wind_speed": environment_metrics.get("windSpeed"),
-                "weight": environment_metrics.get("weight"),
-                "timestamp": datetime.now().isoformat()
-            })
+            self._schedule_event("telemetry", EnvironmentTelemetry(
+                from_id,
+                temperature=environment_metrics.get("temperature"),
+                relative_humidity=environment_metrics.get("relativeHumidity"),
+                barometric_pressure=environment_metrics.get("barometricPressure"),
+                gas_resistance=environment_metrics.get("gasResistance"),
+                iaq=environment_metrics.get("iaq"),
+                distance=environment_metrics.get("distance"),
+                lux=environment_metrics.get("lux"),
+                white_lux=environment_metrics.get("whiteLux"),
+                ir_lux=environment_metrics.get("irLux"),
+                uv_lux=environment_metrics.get("uvLux"),
+                wind_direction=environment_metrics.get("windDirection"),
+                wind_speed=environment_metrics.get("windSpeed"),
+                weight=environment_metrics.get("weight")
+            ))
 
         # Air quality metrics
         air_quality_metrics = telemetry.get("airQualityMetrics", {})
         if air_quality_metrics:
-            self._schedule_event("telemetry", {
-                "node_id": from_id,
-                "type": "air_quality",
-                "pm10": air_quality_metrics.get("pm10Standard"),
-                "pm25": air_quality_metrics.get("pm25Standard"),
-                "pm100": air_quality_metrics.get("pm100Standard"),
-                "pm10_env": air_quality_metrics.get("pm10Environmental"),
-                "pm25_env": air_quality_metrics.get("pm25Environmental"),
-                "pm100_env": air_quality_metrics.get("pm100Environmental"),
-                "co2": air_quality_metrics.get("co2"),
-                "timestamp": datetime.now().isoformat()
-            })
+            self._schedule_event("telemetry", AirQualityTelemetry(
+                from_id,
+                pm10=air_quality_metrics.get("pm10Standard"),
+                pm25=air_quality_metrics.get("pm25Standard"),
+                pm100=air_quality_metrics.get("pm100Standard"),
+                pm10_env=air_quality_metrics.get("pm10Environmental"),
+                pm25_env=air_quality_metrics.get("pm25Environmental"),
+                pm100_env=air_quality_metrics.get("pm100Environmental"),
+                co2=air_quality_metrics.get("co2")
+            ))
 
         # Power metrics
         power_metrics = telemetry.get("powerMetrics", {})
         if power_metrics:
-            self._schedule_event("telemetry", {
-                "node_id": from_id,
-                "type": "power",
-                "ch1_voltage": power_metrics.get("ch1Voltage"),
-                "ch1_current": power_metrics.get("ch1Current"),
-                "ch2_voltage": power_metrics.get("ch2Voltage"),
-                "ch2_current": power_metrics.get("ch2Current"),
-                "ch3_voltage": power_metrics.get("ch3Voltage"),
-                "ch3_current": power_metrics.get("ch3Current"),
-                "timestamp": datetime.now().isoformat()
-            })
+            self._schedule_event("telemetry", PowerTelemetry(
+                from_id,
+                ch1_voltage=power_metrics.get("ch1Voltage"),
+                ch1_current=power_metrics.get("ch1Current"),
+                ch2_voltage=power_metrics.get("ch2Voltage"),
+                ch2_current=power_metrics.get("ch2Current"),
+                ch3_voltage=power_metrics.get("ch3Voltage"),
+                ch3_current=power_metrics.get("ch3Current")
+            ))
 
     def _handle_nodeinfo(self, packet):
         """Handle node info updates."""
@@ -422,13 +623,9 @@ class MeshtasticClient:
         from_id = packet.get("fromId")
 
         if user:
-            self._schedule_event("node_update", {
-                "id": from_id,
-                "long_name": user.get("longName"),
-                "short_name": user.get("shortName"),
-                "hw_model": user.get("hwModel"),
-                "timestamp": datetime.now().isoformat()
-            })
+            self._schedule_event("node_update", NodeUpdateEvent(
+                from_id, user.get("longName"), user.get("shortName"), user.get("hwModel")
+            ))
 
     def _handle_traceroute(self, packet):
         """Handle traceroute response packets."""
@@ -458,17 +655,19 @@ class MeshtasticClient:
         formatted_route = [format_node_id(n) for n in route]
         formatted_route_back = [format_node_id(n) for n in route_back]
 
-        logger.info(f"Traceroute response from {from_id}: route={formatted_route}, routeBack={formatted_route_back}")
+        packet_logger.info("Traceroute response from %s: route=%s, routeBack=%s",
+                           from_id, formatted_route, formatted_route_back)
+
+        event = TracerouteEvent(
+            from_id, to_id, formatted_route, formatted_route_back,
+            list(snr_towards) if snr_towards else [], list(snr_back) if snr_back else []
+        )
+        # Responses to traceroutes started elsewhere (e.g. the phone app) are cached too
+        if from_id and from_id.startswith("!"):
+            traceroute_manager.record(from_id, event.to_dict())
+        topology.record_traceroute(event)
 
-        self._schedule_event("traceroute", {
-            "from_node_id": from_id,
-            "to_node_id": to_id,
-            "route": formatted_route,
-            "route_back": formatted_route_back,
-            "snr_towards": list(snr_towards) if snr_towards else [],
-            "snr_back": list(snr_back) if snr_back else [],
-            "timestamp": datetime.now().isoformat()
-        })
+        self._schedule_event("traceroute", event)
 
     def _handle_routing(self, packet):
         """Handle routing/ACK packets."""
@@ -480,14 +679,7 @@ class MeshtasticClient:
 
         error_reason = routing.get("errorReason", "NONE")
 
-        self._schedule_event("routing", {
-            "from_node_id": from_id,
-            "to_node_id": to_id,
-            "request_id": request_id,
-            "error_reason": error_reason,
-            "raw": routing,
-            "timestamp": datetime.now().isoformat()
-        })
+        self._schedule_event("routing", RoutingEvent(from_id, to_id, request_id, error_reason, routing))
 
     def _handle_neighborinfo(self, packet):
         """Handle neighbor info packets - shows mesh topology."""
@@ -506,14 +698,12 @@ class MeshtasticClient:
                 "snr": neighbor.get("snr"),
             })
 
-        logger.info(f"NeighborInfo from {from_id}: {len(formatted_neighbors)} neighbors")
+        packet_logger.info("NeighborInfo from %s: %d neighbors", from_id, len(formatted_neighbors))
+        topology.record_neighborinfo(from_id, formatted_neighbors)
 
-        self._schedule_event("neighborinfo", {
-            "from_node_id": from_id,
-            "neighbors": formatted_neighbors,
-            "node_broadcast_interval_secs": node_broadcast_interval_secs,
-            "timestamp": datetime.now().isoformat()
-        })
+        self._schedule_event("neighborinfo", NeighborInfoEvent(
+            from_id, formatted_neighbors, node_broadcast_interval_secs
+        ))
 
     def _handle_waypoint(self, packet):
         """Handle waypoint packets."""
@@ -521,61 +711,47 @@ class MeshtasticClient:
         waypoint = decoded.get("waypoint", {})
         from_id = packet.get("fromId")
 
-        self._schedule_event("waypoint", {
-            "from_node_id": from_id,
-            "id": waypoint.get("id"),
-            "name": waypoint.get("name"),
-            "description": waypoint.get("description"),
-            "latitude": waypoint.get("latitudeI", 0) / 1e7 if waypoint.get("latitudeI") else None,
-            "longitude": waypoint.get("longitudeI", 0) / 1e7 if waypoint.get("longitudeI") else None,
-            "expire": waypoint.get("expire"),
-            "icon": waypoint.get("icon"),
-            "timestamp": datetime.now().isoformat()
-        })
+        self._schedule_event("waypoint", WaypointEvent(
+            from_id,
+            id=waypoint.get("id"),
+            name=waypoint.get("name"),
+            description=waypoint.get("description"),
+            latitude=waypoint.get("latitudeI", 0) / 1e7 if waypoint.get("latitudeI") else None,
+            longitude=waypoint.get("longitudeI", 0) / 1e7 if waypoint.get("longitudeI") else None,
+            expire=waypoint.get("expire"),
+            icon=waypoint.get("icon")
+        ))
 
     def _handle_admin(self, packet):
         """Handle admin packets."""
         decoded = packet.get("decoded", {})
         from_id = packet.get("fromId")
 
-        self._schedule_event("admin", {
-            "from_node_id": from_id,
-            "raw": decoded,
-            "timestamp": datetime.now().isoformat()
-        })
+        # Config or channels may have changed; rebuild the cache on next read
+        self.config_cache.invalidate()
+
+        self._schedule_event("admin", AdminEvent(from_id, decoded))
 
     def _handle_range_test(self, packet):
         """Handle range test packets."""
         decoded = packet.get("decoded", {})
         from_id = packet.get("fromId")
 
-        self._schedule_event("range_test", {
-            "from_node_id": from_id,
-            "payload": decoded.get("payload"),
-            "timestamp": datetime.now().isoformat()
-        })
+        self._schedule_event("range_test", RangeTestEvent(from_id, decoded.get("payload")))
 
     def _handle_store_forward(self, packet):
         """Handle store and forward packets."""
         decoded = packet.get("decoded", {})
         from_id = packet.get("fromId")
 
-        self._schedule_event("store_forward", {
-            "from_node_id": from_id,
-            "raw": decoded,
-            "timestamp": datetime.now().isoformat()
-        })
+        self._schedule_event("store_forward", StoreForwardEvent(from_id, decoded))
 
     def _handle_detection_sensor(self, packet):
         """Handle detection sensor packets."""
         decoded = packet.get("decoded", {})
         from_id = packet.get("fromId")
 
-        self._schedule_event("detection_sensor", {
-            "from_node_id": from_id,
-            "raw": decoded,
-            "timestamp": datetime.now().isoformat()
-        })
+        self._schedule_event("detection_sensor", DetectionSensorEvent(from_id, decoded))
 
     def _handle_paxcounter(self, packet):
         """Handle paxcounter (people counter) packets."""
@@ -583,13 +759,9 @@ class MeshtasticClient:
         paxcounter = decoded.get("paxcounter", {})
         from_id = packet.get("fromId")
 
-        self._schedule_event("paxcounter", {
-            "from_node_id": from_id,
-            "wifi": paxcounter.get("wifi"),
-            "ble": paxcounter.get("ble"),
-            "uptime": paxcounter.get("uptime"),
-            "timestamp": datetime.now().isoformat()
-        })
+        self._schedule_event("paxcounter", PaxcounterEvent(
+            from_id, paxcounter.get("wifi"), paxcounter.get("ble"), paxcounter.get("uptime")
+        ))
 
     def _handle_unknown_packet(self, packet, portnum):
         """Handle any unrecognized packet types - forward to console for visibility."""
@@ -597,38 +769,38 @@ class MeshtasticClient:
         from_id = packet.get("fromId", "unknown")
         to_id = packet.get("toId", "unknown")
 
-        logger.info(f"Unknown packet type '{portnum}' from {from_id}")
+        packet_logger.info("Unknown packet type '%s' from %s", portnum, from_id)
 
         # Forward the raw packet data so users can see what's available
-        self._schedule_event("raw_packet", {
-            "portnum": portnum,
-            "from_node_id": from_id,
-            "to_node_id": to_id,
-            "decoded": decoded,
-            "rx_time": packet.get("rxTime"),
-            "rx_snr": packet.get("rxSnr"),
-            "rx_rssi": packet.get("rxRssi"),
-            "hop_limit": packet.get("hopLimit"),
-            "hop_start": packet.get("hopStart"),
-            "timestamp": datetime.now().isoformat()
-        })
-
-    def _on_connection(self, interface, topic=pub.AUTO_TOPIC):
+        self._schedule_event("raw_packet", RawPacketEvent(
+            portnum, from_id, to_id, decoded,
+            rx_time=packet.get("rxTime"),
+            rx_snr=packet.get("rxSnr"),
+            rx_rssi=packet.get("rxRssi"),
+            hop_limit=packet.get("hopLimit"),
+            hop_start=packet.get("hopStart")
+        ))
+
+    def _on_connection(self, interface):
         """Handle connection events from BLE library."""
+        if not self._owns(interface):
+            return
         # Just log here - don't broadcast yet, connect() will do that after interface is ready
         logger.info("BLE connection established callback received")
 
-    def _on_disconnect(self, interface, topic=pub.AUTO_TOPIC):
+    def _on_disconnect(self, interface):
         """Handle disconnection events."""
+        if not self._owns(interface):
+            return
         was_connected = self._connected
         self._connected = False
 
         if self._intentional_disconnect:
             logger.info("[CONN] Disconnected from Meshtastic device (user requested)")
-            self._schedule_event("connection", {"connected": False})
+            self._schedule_event("connection", ConnectionEvent({"connected": False}))
         else:
             logger.warning("[CONN] Unexpected disconnection from Meshtastic device")
-            self._schedule_event("connection", {"connected": False, "unexpected": True})
+            self._schedule_event("connection", ConnectionEvent({"connected": False, "unexpected": True}))
 
             # Trigger auto-reconnect if we were previously connected
             if was_connected and self._main_loop:
@@ -637,93 +809,135 @@ class MeshtasticClient:
                     lambda: asyncio.create_task(self._auto_reconnect())
                 )
 
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter, so radios dropped together don't retry in lockstep."""
+        ceiling = min(self.settings.reconnect_backoff_max, self._reconnect_delay * 2 ** (attempt - 1))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
     async def _auto_reconnect(self):
-        """Attempt to automatically reconnect after unexpected disconnection."""
+        """Attempt to automatically reconnect after unexpected disconnection.
+
+        BLE radios are retried as soon as they advertise again (typically right
+        after a reboot) instead of after the full backoff delay.
+        """
         if self._intentional_disconnect:
             logger.info("[CONN] Skipping auto-reconnect (intentional disconnect)")
             return
 
-        # Cancel any existing reconnect task
         if self._reconnect_task and not self._reconnect_task.done():
             return  # Already reconnecting
+        self._reconnect_task = asyncio.current_task()
 
         self._reconnect_attempts = 0
+        discovering = self.is_ble and bool(self.device_name) and ble_discovery.enabled
+        if discovering:
+            await ble_discovery.acquire()  # Scan for the radio's advertisements throughout
+        try:
+            # Advertisements from before the disconnect don't count
+            since = time.monotonic()
+            while self._reconnect_attempts < self._max_reconnect_attempts:
+                if self._intentional_disconnect or self._connected:
+                    logger.info("[CONN] Auto-reconnect cancelled")
+                    return
 
-        while self._reconnect_attempts < self._max_reconnect_attempts:
-            if self._intentional_disconnect or self._connected:
-                logger.info("[CONN] Auto-reconnect cancelled")
-                return
-
-            self._reconnect_attempts += 1
-            delay = self._reconnect_delay * self._reconnect_attempts  # Exponential backoff
-
-            logger.info(f"[CONN] Auto-reconnect attempt {self._reconnect_attempts}/{self._max_reconnect_attempts} in {delay}s...")
-            self._schedule_event("connection", {
-                "connected": False,
-                "reconnecting": True,
-                "attempt": self._reconnect_attempts,
-                "max_attempts": self._max_reconnect_attempts
-            })
-
-            await asyncio.sleep(delay)
-
-            if self._intentional_disconnect or self._connected:
-                return
+                self._reconnect_attempts += 1
+                delay = self._backoff_delay(self._reconnect_attempts)
+
+                logger.info(f"[CONN] Auto-reconnect attempt {self._reconnect_attempts}/{self._max_reconnect_attempts} "
+                            f"in {delay:.1f}s{' or when advertised' if discovering else ''}...")
+                self._schedule_event("connection", ConnectionEvent({
+                    "connected": False,
+                    "reconnecting": True,
+                    "attempt": self._reconnect_attempts,
+                    "max_attempts": self._max_reconnect_attempts
+                }))
+
+                if discovering:
+                    waited = time.monotonic()
+                    if await ble_discovery.wait_for(self.device_name, delay, after=since):
+                        logger.info(f"[BLE] {self.device_name} is advertising again")
+                    else:
+                        # Returns early when the scanner can't start; keep the backoff
+                        await asyncio.sleep(max(0.0, delay - (time.monotonic() - waited)))
+                else:
+                    await asyncio.sleep(delay)
 
-            try:
-                success = await self._connect_internal()
-                if success:
-                    logger.info("[CONN] Auto-reconnect successful!")
-                    self._reconnect_attempts = 0
+                if self._intentional_disconnect or self._connected:
                     return
-            except Exception as e:
-                logger.error(f"[CONN] Auto-reconnect attempt {self._reconnect_attempts} failed: {e}")
 
-        logger.error(f"[CONN] Auto-reconnect failed after {self._max_reconnect_attempts} attempts")
-        self._schedule_event("connection", {
-            "connected": False,
-            "reconnect_failed": True
-        })
+                try:
+                    success = await self._connect_internal()
+                    if success:
+                        logger.info("[CONN] Auto-reconnect successful!")
+                        self._reconnect_attempts = 0
+                        return
+                except Exception as e:
+                    logger.error(f"[CONN] Auto-reconnect attempt {self._reconnect_attempts} failed: {e}")
+                since = time.monotonic()
+
+            logger.error(f"[CONN] Auto-reconnect failed after {self._max_reconnect_attempts} attempts")
+            self._schedule_event("connection", ConnectionEvent({
+                "connected": False,
+                "reconnect_failed": True
+            }))
+        finally:
+            if discovering:
+                await ble_discovery.release()
 
     async def _connect_internal(self) -> bool:
         """Internal connect logic without lock (for reconnect use)."""
+        discovering = self.is_ble and ble_discovery.enabled
+        if discovering:
+            await ble_discovery.acquire()
         try:
             # Clean up old subscriptions first
-            try:
-                pub.unsubscribe(self._on_receive, "meshtastic.receive")
-                pub.unsubscribe(self._on_connection, "meshtastic.connection.established")
-                pub.unsubscribe(self._on_disconnect, "meshtastic.connection.lost")
-            except Exception:
-                pass
+            self._unsubscribe()
 
             # Store the main event loop for thread-safe callbacks
             self._main_loop = asyncio.get_event_loop()
 
-            logger.info(f"[CONN] Connecting to {self.settings.meshtastic_device_name}...")
+            logger.info(f"[CONN] Connecting to {self.device_name} via {self.transport}...")
+
+            if discovering and self.device_name:
+                await self._await_advertisement()
 
             # Subscribe to events
-            pub.subscribe(self._on_receive, "meshtastic.receive")
-            pub.subscribe(self._on_connection, "meshtastic.connection.established")
-            pub.subscribe(self._on_disconnect, "meshtastic.connection.lost")
-
-            # Connect via BLE (runs in thread pool)
-            loop = asyncio.get_event_loop()
-            self.interface = await loop.run_in_executor(
-                None,
-                lambda: BLEInterface(self.settings.meshtastic_device_name)
-            )
+            self._subscribe()
+
+            # Open the interface (runs on the dedicated connect pool)
+            self._start_ingest()
+            if MeshtasticClient._connect_serial is None:
+                MeshtasticClient._connect_serial = asyncio.Lock()
+            async with MeshtasticClient._connect_serial:
+                self._connecting = True
+                if discovering:
+                    await ble_discovery.pause()
+                try:
+                    self.interface = await radio_executors.connect.run(self._create_interface)
+                    MeshtasticClient._interface_owners[id(self.interface)] = self
+                finally:
+                    self._connecting = False
+                    if discovering:
+                        await ble_discovery.resume()
 
             # Store the device address for future cleanup
-            try:
-                if hasattr(self.interface, 'bleak_client') and self.interface.bleak_client:
-                    self._device_address = self.interface.bleak_client.address
-                    logger.info(f"[CONN] Stored device address: {self._device_address}")
-            except Exception as e:
-                logger.debug(f"[CONN] Could not store device address: {e}")
+            if self.is_ble:
+                try:
+                    if hasattr(self.interface, 'bleak_client') and self.interface.bleak_client:
+                        self._device_address = self.interface.bleak_client.address
+                        logger.info(f"[CONN] Stored device address: {self._device_address}")
+                except Exception as e:
+                    logger.debug(f"[CONN] Could not store device address: {e}")
 
             self._my_info = self.interface.myInfo
             self._metadata = self.interface.metadata
             self._nodes = self.interface.nodes
+            liveness.seed(self._nodes or {})
+            try:
+                self.config_cache.load(self.interface)
+            except Exception as e:
+                logger.warning(f"[CONN] Could not cache device config: {e}")
+                self.config_cache.clear()
             self._connected = True
             self._intentional_disconnect = False  # Reset on successful connect
             self._close_failed = False  # Clear any previous close failures
@@ -731,7 +945,7 @@ class MeshtasticClient:
             logger.info(f"[CONN] Connected! My node num: {self.my_node_num}")
 
             # Broadcast connection status now that everything is ready
-            self._schedule_event("connection", self.get_connection_status())
+            self._schedule_event("connection", ConnectionEvent(self.get_connection_status()))
 
             return True
 
@@ -739,9 +953,10 @@ class MeshtasticClient:
             error_msg = str(e)
             logger.error(f"[CONN] Failed to connect: {error_msg}")
             self._connected = False
+            await self._stop_ingest()
 
             # If device not found, do a scan and provide better error message
-            if "not found" in error_msg.lower() or "no meshtastic" in error_msg.lower():
+            if self.is_ble and ("not found" in error_msg.lower() or "no meshtastic" in error_msg.lower()):
                 logger.info("[CONN] Device not found, scanning to show available devices...")
                 try:
                     scan_result = await self.scan_ble_devices()
@@ -754,6 +969,25 @@ class MeshtasticClient:
                 self._last_error = error_msg
 
             return False
+        finally:
+            if discovering:
+                await ble_discovery.release()
+
+    async def _await_advertisement(self):
+        """Wait for the radio to advertise so the connect can skip the library's scan.
+
+        Raises the library's "not found" error if the discovery scanner ran for
+        the whole wait without hearing it.
+        """
+        wait = self.settings.ble_discovery_wait
+        started = time.monotonic()
+        entry = await ble_discovery.wait_for(self.device_name, wait)
+        if entry is not None:
+            logger.info(f"[BLE] {self.device_name} advertising at {entry.address} "
+                        f"(waited {time.monotonic() - started:.1f}s)")
+        elif ble_discovery.covers(wait):
+            raise RuntimeError(f"No Meshtastic BLE peripheral with identifier or address "
+                               f"'{self.device_name}' found")
 
     @property
     def last_error(self) -> Optional[str]:
@@ -779,13 +1013,13 @@ class MeshtasticClient:
                    f"Try Reset BLE or restart the server.")
 
     async def connect(self) -> bool:
-        """Connect to the Meshtastic device via BLE."""
+        """Connect to the Meshtastic device over the configured transport."""
         async with self._lock:
             if self.connected:
                 return True
 
             # If previous close failed, try to clean up BLE first
-            if self._close_failed:
+            if self._close_failed and self.is_ble:
                 logger.info("[CONN] Previous disconnect had issues, attempting BLE cleanup...")
 
                 # First, try force cleanup if we have a device address
@@ -819,12 +1053,7 @@ class MeshtasticClient:
 
         async with self._lock:
             # Unsubscribe from events FIRST to prevent callbacks during close
-            try:
-                pub.unsubscribe(self._on_receive, "meshtastic.receive")
-                pub.unsubscribe(self._on_connection, "meshtastic.connection.established")
-                pub.unsubscribe(self._on_disconnect, "meshtastic.connection.lost")
-            except Exception:
-                pass
+            self._unsubscribe()
 
             if not self.interface:
                 logger.info("[CONN] No active interface to disconnect")
@@ -835,30 +1064,42 @@ class MeshtasticClient:
                 interface_to_close = self.interface
 
                 # Store the device address before closing for potential cleanup
-                try:
-                    if hasattr(interface_to_close, 'bleak_client') and interface_to_close.bleak_client:
-                        self._device_address = interface_to_close.bleak_client.address
-                        logger.info(f"[CONN] Stored device address for cleanup: {self._device_address}")
-                except Exception:
-                    pass
+                if self.is_ble:
+                    try:
+                        if hasattr(interface_to_close, 'bleak_client') and interface_to_close.bleak_client:
+                            self._device_address = interface_to_close.bleak_client.address
+                            logger.info(f"[CONN] Stored device address for cleanup: {self._device_address}")
+                    except Exception:
+                        pass
+
+                # Drop queued sends and traceroutes - they would go to a closed interface
+                send_scheduler.cancel_all("disconnect", owner=self.radio_id)
+                traceroute_manager.cancel_all(self)
 
                 # Clear our reference immediately to prevent race conditions
+                MeshtasticClient._interface_owners.pop(id(interface_to_close), None)
+                await self._stop_ingest()
                 self.interface = None
                 self._connected = False
                 self._my_info = None
                 self._metadata = None
                 self._nodes = {}
+                self.config_cache.clear()
 
                 try:
-                    logger.info("Closing BLE interface...")
-                    # Close with timeout to prevent hanging
-                    loop = asyncio.get_event_loop()
+                    logger.info(f"Closing {self.transport.upper()} interface...")
+                    # Close with timeout to prevent hanging. Runs on the "wait" pool so a
+                    # hung close can't hold up connects or sends.
                     await asyncio.wait_for(
-                        loop.run_in_executor(None, interface_to_close.close),
+                        radio_executors.wait.run(interface_to_close.close),
                         timeout=5.0
                     )
-                    logger.info("BLE interface closed successfully")
+                    logger.info(f"{self.transport.upper()} interface closed successfully")
                 except asyncio.TimeoutError:
+                    if not self.is_ble:
+                        # Nothing held at the OS level; the next connect opens a new socket/port
+                        logger.warning(f"{self.transport.upper()} close timed out")
+                        return
                     logger.warning("BLE close timed out - attempting force cleanup...")
                     self._close_failed = True
 
@@ -879,14 +1120,14 @@ class MeshtasticClient:
                     self._close_failed = True
                 finally:
                     # Emit disconnection event BEFORE clearing main_loop
-                    self._schedule_event("connection", self.get_connection_status())
+                    self._schedule_event("connection", ConnectionEvent(self.get_connection_status()))
                     self._main_loop = None
 
     def _create_ack_callback(self, destination: str, text: str):
         """Create a callback function for ACK/NAK handling."""
         def on_response(packet):
             try:
-                logger.debug(f"[ACK] Response packet received for {destination}: {packet}")
+                packet_logger.debug("[ACK] Response packet received for %s: %s", destination, packet)
 
                 # Check if this is an ACK or NAK
                 decoded = packet.get("decoded", {})
@@ -896,32 +1137,26 @@ class MeshtasticClient:
                 # Log packet details for debugging
                 packet_type = packet.get("decoded", {}).get("portnum", "unknown")
                 from_id = packet.get("fromId", "unknown")
-                logger.debug(f"[ACK] Packet type={packet_type}, from={from_id}, routing={routing}")
+                packet_logger.debug("[ACK] Packet type=%s, from=%s, routing=%s", packet_type, from_id, routing)
 
                 if error_reason is None or error_reason == "NONE":
-                    logger.info(f"[ACK] ✓ Message to {destination} DELIVERED")
-                    self._schedule_event("ack", {
-                        "to_node_id": destination,
-                        "text": text,
-                        "success": True,
-                        "timestamp": datetime.now().isoformat()
-                    })
+                    logger.info("[ACK] ✓ Message to %s DELIVERED", destination)
+                    self._schedule_event("ack", AckEvent(destination, text, True))
                 else:
-                    logger.warning(f"[ACK] ✗ Message to {destination} FAILED: {error_reason}")
-                    self._schedule_event("ack", {
-                        "to_node_id": destination,
-                        "text": text,
-                        "success": False,
-                        "error": str(error_reason),
-                        "timestamp": datetime.now().isoformat()
-                    })
+                    logger.warning("[ACK] ✗ Message to %s FAILED: %s", destination, error_reason)
+                    self._schedule_event("ack", AckEvent(destination, text, False, str(error_reason)))
             except Exception as e:
                 logger.error(f"[ACK] Error in callback: {e}", exc_info=True)
 
         return on_response
 
-    async def send_message(self, text: str, destination: Optional[str] = None, channel: int = 0) -> bool:
-        """Send a text message. Returns True if sent successfully."""
+    async def send_message(self, text: str, destination: Optional[str] = None, channel: int = 0,
+                           priority: Optional[Priority] = None) -> bool:
+        """Send a text message through the outbound scheduler.
+
+        Returns True if sent successfully. Raises QueueFullError if the outbound
+        queue is at capacity. Priority defaults to DM or BROADCAST.
+        """
         if not self.connected:
             logger.error("Not connected to device")
             return False
@@ -929,11 +1164,12 @@ class MeshtasticClient:
         try:
             from meshtastic import portnums_pb2
 
-            loop = asyncio.get_event_loop()
-
             # For broadcasts, use "^all" instead of None
             dest_id = destination if destination else "^all"
             is_broadcast = destination is None
+            if priority is None:
+                priority = Priority.BROADCAST if is_broadcast else Priority.DM
+            interface = self.interface
 
             # Create callback for ACK handling (only for DMs, not broadcasts)
             on_response = None
@@ -944,9 +1180,8 @@ class MeshtasticClient:
             # This is required to get ACK/NAK callbacks to fire
             text_bytes = text.encode("utf-8")
 
-            await loop.run_in_executor(
-                None,
-                lambda: self.interface.sendData(
+            await send_scheduler.run(
+                lambda: interface.sendData(
                     text_bytes,
                     destinationId=dest_id,
                     portNum=portnums_pb2.PortNum.TEXT_MESSAGE_APP,
@@ -955,23 +1190,38 @@ class MeshtasticClient:
                     wantResponse=False,
                     onResponse=on_response,
                     onResponseAckPermitted=True  # Required for ACK/NAK callbacks to fire
-                )
+                ),
+                priority,
+                f"text to {dest_id}",
+                owner=self.radio_id
             )
 
             if is_broadcast:
-                logger.info(f"[MSG] Sent broadcast on channel {channel}: {text[:50]}...")
+                logger.info("[MSG] Sent broadcast on channel %s: %.50s...", channel, text)
             else:
-                logger.info(f"[MSG] Sent DM to {destination} (wantAck=True): {text[:50]}...")
+                logger.info("[MSG] Sent DM to %s (wantAck=True): %.50s...", destination, text)
             return True
+        except QueueFullError:
+            logger.warning(f"[MSG] Outbound queue full, rejecting message to {destination or 'broadcast'}")
+            raise
+        except asyncio.CancelledError:
+            # Not a failure: the caller (e.g. a cancelled broadcast job) must see it
+            logger.info(f"[MSG] Send to {destination or 'broadcast'} cancelled")
+            raise
         except Exception as e:
             logger.error(f"[MSG] Failed to send message: {e}", exc_info=True)
             return False
 
-    def _create_traceroute_response_handler(self, destination: str):
-        """Create a response handler for traceroute that sends results via WebSocket."""
+    def _create_traceroute_response_handler(self, destination: str,
+                                            on_result: Optional[Callable[[dict], None]] = None):
+        """Create a response handler for traceroute that sends results via WebSocket.
+
+        ``on_result`` is called (on the reader thread) with the route dict, or
+        with ``{"error": reason}`` for routing errors.
+        """
         def on_response(packet):
             try:
-                logger.info(f"Traceroute response received for {destination}: {packet}")
+                packet_logger.debug("Traceroute response received for %s: %s", destination, packet)
                 decoded = packet.get("decoded", {})
 
                 # Check for routing error
@@ -979,11 +1229,9 @@ class MeshtasticClient:
                 error_reason = routing.get("errorReason")
                 if error_reason and error_reason != "NONE":
                     logger.warning(f"Traceroute to {destination} failed: {error_reason}")
-                    self._schedule_event("traceroute_error", {
-                        "destination": destination,
-                        "error": str(error_reason),
-                        "timestamp": datetime.now().isoformat()
-                    })
+                    self._schedule_event("traceroute_error", TracerouteErrorEvent(destination, str(error_reason)))
+                    if on_result:
+                        on_result({"error": str(error_reason)})
                     return
 
                 # Parse traceroute data
@@ -1006,96 +1254,68 @@ class MeshtasticClient:
                     formatted_route = [format_node_id(n) for n in route]
                     formatted_route_back = [format_node_id(n) for n in route_back]
 
-                    logger.info(f"Traceroute result: {from_id} route={formatted_route}")
-
-                    self._schedule_event("traceroute", {
-                        "from_node_id": from_id,
-                        "to_node_id": to_id,
-                        "route": formatted_route,
-                        "route_back": formatted_route_back,
-                        "snr_towards": list(snr_towards) if snr_towards else [],
-                        "snr_back": list(snr_back) if snr_back else [],
-                        "timestamp": datetime.now().isoformat()
-                    })
+                    packet_logger.info("Traceroute result: %s route=%s", from_id, formatted_route)
+
+                    event = TracerouteEvent(
+                        from_id, to_id, formatted_route, formatted_route_back,
+                        list(snr_towards) if snr_towards else [], list(snr_back) if snr_back else []
+                    )
+                    self._schedule_event("traceroute", event)
+                    if on_result:
+                        on_result(event.to_dict())
             except Exception as e:
                 logger.error(f"Error handling traceroute response: {e}", exc_info=True)
 
         return on_response
 
-    async def _run_traceroute_async(self, destination: str, dest_int: int, hop_limit: int, channel: int):
-        """Run traceroute in background. Handles response/timeout via WebSocket."""
-        from meshtastic import mesh_pb2, portnums_pb2
+    async def send_traceroute_packet(self, destination: str, hop_limit: int, channel: int,
+                                     on_result: Callable[[dict], None]):
+        """Put a traceroute request on the air via the outbound scheduler.
 
-        loop = asyncio.get_event_loop()
-        try:
-            # Create our own response handler
-            on_response = self._create_traceroute_response_handler(destination)
-
-            # Use sendData directly instead of sendTraceRoute so we control the callback
-            r = mesh_pb2.RouteDiscovery()
-
-            await loop.run_in_executor(
-                None,
-                lambda: self.interface.sendData(
-                    r,
-                    destinationId=dest_int,
-                    portNum=portnums_pb2.PortNum.TRACEROUTE_APP,
-                    wantResponse=True,
-                    onResponse=on_response,
-                    channelIndex=channel,
-                    hopLimit=hop_limit,
-                )
-            )
-
-            # Wait for the response (library's waitForTraceRoute logic)
-            wait_factor = min(len(self.interface.nodes) - 1 if self.interface.nodes else 0, hop_limit)
-            await loop.run_in_executor(
-                None,
-                lambda: self.interface.waitForTraceRoute(wait_factor)
-            )
+        Does not wait for the response; ``on_result`` is called when it arrives.
+        """
+        from meshtastic import mesh_pb2, portnums_pb2
 
-            logger.info(f"Traceroute to {destination} completed")
-        except Exception as trace_err:
-            # Check if it's a timeout error
-            error_msg = str(trace_err).lower()
-            if "timeout" in error_msg or "timed out" in error_msg:
-                logger.warning(f"Traceroute to {destination} timed out")
-                self._schedule_event("traceroute_error", {
-                    "destination": destination,
-                    "error": "TIMEOUT",
-                    "timestamp": datetime.now().isoformat()
-                })
-            else:
-                logger.error(f"Traceroute to {destination} failed: {trace_err}")
-                self._schedule_event("traceroute_error", {
-                    "destination": destination,
-                    "error": str(trace_err),
-                    "timestamp": datetime.now().isoformat()
-                })
+        if not self.connected:
+            raise ConnectionError("Not connected to device")
+
+        dest_int = int(destination[1:], 16)
+        on_response = self._create_traceroute_response_handler(destination, on_result)
+
+        # Use sendData directly instead of sendTraceRoute so we control the callback
+        r = mesh_pb2.RouteDiscovery()
+        interface = self.interface
+        await send_scheduler.run(
+            lambda: interface.sendData(
+                r,
+                destinationId=dest_int,
+                portNum=portnums_pb2.PortNum.TRACEROUTE_APP,
+                wantResponse=True,
+                onResponse=on_response,
+                channelIndex=channel,
+                hopLimit=hop_limit,
+            ),
+            Priority.TRACEROUTE,
+            f"traceroute to {destination}",
+            owner=self.radio_id
+        )
 
     async def send_traceroute(self, destination: str, hop_limit: int = 3, channel: int = 0) -> bool:
         """Send a traceroute request to a destination node.
 
         Returns immediately after dispatching. Response comes via WebSocket.
+        Duplicate requests to a destination already in flight are coalesced.
         """
         if not self.connected:
             logger.error("Not connected to device")
             return False
 
         try:
-            # Convert destination to int if it's a hex string like "!abcd1234"
-            if isinstance(destination, str) and destination.startswith("!"):
-                dest_int = int(destination[1:], 16)
-            else:
-                dest_int = int(destination)
+            # Normalize "!abcd1234" / decimal ids to "!abcd1234"
+            destination = normalize_node_id(destination)
 
             logger.info(f"Sending traceroute to {destination} (hop_limit={hop_limit}, channel={channel})")
-
-            # Create background task - don't await it, let it run independently
-            asyncio.create_task(
-                self._run_traceroute_async(destination, dest_int, hop_limit, channel)
-            )
-
+            traceroute_manager.start(self, destination, hop_limit, channel)
             logger.info(f"Traceroute request dispatched to {destination}")
             return True
 
@@ -1108,18 +1328,17 @@ class MeshtasticClient:
         fw_version = None
         hw_model = None
 
-        if self._metadata:
-            # metadata might be a protobuf or dict
-            if hasattr(self._metadata, 'firmware_version'):
-                fw_version = self._metadata.firmware_version
-                hw_model = getattr(self._metadata, 'hw_model', None)
-            elif isinstance(self._metadata, dict):
-                fw_version = self._metadata.get("firmwareVersion")
-                hw_model = self._metadata.get("hwModel")
+        if self.connected:
+            metadata, _ = self.config_cache.get("metadata", self.interface)
+            if metadata:
+                fw_version = metadata.get("firmwareVersion")
+                hw_model = metadata.get("hwModel")
 
         return {
             "connected": self.connected,
-            "device_name": self.settings.meshtastic_device_name if self.connected else None,
+            "device_name": self.device_name if self.connected else None,
+            "radio": self.radio_id,
+            "transport": self.transport,
             "my_node_num": self.my_node_num,
             "firmware_version": fw_version,
             "hw_model": str(hw_model) if hw_model else None
@@ -1153,6 +1372,3 @@ class MeshtasticClient:
             logger.error(f"Error accessing nodes: {e}", exc_info=True)
             return {}
 
-
-# Singleton instance
-meshtastic_client = MeshtasticClient()
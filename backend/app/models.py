@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Float, DOUBLE_PRECISION, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -64,3 +65,88 @@ class Position(Base):
     longitude = Column(Float)
     altitude = Column(Integer, nullable=True)
     timestamp = Column(DateTime, server_default=func.now())
+
+
+class TelemetrySample(Base):
+    """One reading of one telemetry metric, for every telemetry type.
+
+    Metric IDs are defined in app.telemetry_samples. The primary key doubles
+    as the (node, metric, time) index the queries use.
+    """
+    __tablename__ = "telemetry_samples"
+
+    node_id = Column(String, primary_key=True)
+    metric = Column(SmallInteger, primary_key=True)
+    timestamp = Column(DateTime, primary_key=True)
+    value = Column(DOUBLE_PRECISION)  # Exact for integer metrics such as uptime_seconds
+
+
+class TopologyEdge(Base):
+    """A directed radio link: ``from_node_id`` was heard by ``to_node_id``."""
+    __tablename__ = "topology_edges"
+
+    from_node_id = Column(String, primary_key=True)
+    to_node_id = Column(String, primary_key=True)
+    snr = Column(Float, nullable=True)  # dB, as measured by the receiving node
+    source = Column(String)  # "neighborinfo" or "traceroute"
+    last_seen = Column(DateTime, index=True)
+
+
+class AlertRule(Base):
+    """A condition evaluated on the live event stream (see app.alerts)."""
+    __tablename__ = "alert_rules"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String)
+    kind = Column(String(32))  # One of app.alerts.RULE_KINDS
+    node_id = Column(String, nullable=True)  # None = every node
+    threshold = Column(Float)  # Percent, minutes or meters depending on kind
+    latitude = Column(Float, nullable=True)  # Geofence center
+    longitude = Column(Float, nullable=True)
+    consecutive = Column(Integer, default=1)  # Readings needed to fire or clear
+    enabled = Column(Boolean, default=True)
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class Alert(Base):
+    """An alert rule firing for a node, or clearing again."""
+    __tablename__ = "alerts"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    rule_id = Column(Integer, index=True)
+    node_id = Column(String, index=True)
+    kind = Column(String(32))
+    status = Column(String(16))  # "firing" or "resolved"
+    value = Column(Float, nullable=True)
+    message = Column(Text)
+    timestamp = Column(DateTime, index=True)
+
+
+class Event(Base):
+    """Append-only log of every decoded radio event; the projections are built from it."""
+    __tablename__ = "events"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    timestamp = Column(DateTime, index=True)
+    type = Column(String(32))
+    radio = Column(String, nullable=True)
+    node_id = Column(String, nullable=True, index=True)
+    data = Column(JSONB)  # Payload without null fields or the columns above
+
+
+class ProjectionCheckpoint(Base):
+    """Last event ID applied by each projection."""
+    __tablename__ = "projection_checkpoints"
+
+    name = Column(String, primary_key=True)
+    position = Column(BigInteger, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class SchemaInfo(Base):
+    """Fingerprint of the models the schema was last created from."""
+    __tablename__ = "schema_info"
+
+    id = Column(Integer, primary_key=True)
+    fingerprint = Column(String)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
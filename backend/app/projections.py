@@ -0,0 +1,576 @@
+"""Tables derived from the event log, kept up to date incrementally.
+
+Each projection remembers the last event ID it applied (``projection_checkpoints``)
+and catches up from there in batches, applying a batch and advancing its
+checkpoint in one transaction. To rebuild from scratch, e.g. after changing a
+projection or adding a new one, stop the dashboard and run:
+
+    python -m app.projections rebuild [name ...]
+    python -m app.projections status
+"""
+import asyncio
+import logging
+import zlib
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, update, delete, func, and_, desc, literal_column, null
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.database import async_session
+from app.models import Event, ProjectionCheckpoint, Node, Message, Telemetry, Position, TelemetrySample
+from app.telemetry_samples import sample_rows
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_DEDUP_WINDOW = timedelta(seconds=30)
+# How long an ACK matching no outgoing message is retried. Broadcast jobs
+# write their rows in batches, so the ACK can be logged before its message.
+ACK_MATCH_GRACE = timedelta(seconds=10)
+ACK_RETRY_DELAY = 1.0  # Seconds before the live loop retries a deferred ACK
+# Checkpoint row recording that rows stored before the event log existed were copied into it
+LEGACY_SEED = "legacy_seed"
+# Projections whose tables already hold the copied rows, so they skip the copies
+LEGACY_SEEDED_PROJECTIONS = ("nodes", "messages", "telemetry", "positions")
+SAMPLE_INSERT_CHUNK = 5000  # Rows per INSERT, under the 32767 bind parameter limit
+
+
+def message_tags(channel: int) -> Set[str]:
+    """Response cache tags of message pages a new message on ``channel`` appears in."""
+    return {f"messages:{channel}", "messages:all"}
+
+
+def telemetry_tags(node_id: str) -> Set[str]:
+    """Response cache tags of telemetry lists a new sample from ``node_id`` appears in."""
+    return {f"telemetry:{node_id}", "telemetry:all"}
+
+
+def _jsonb(**fields):
+    """``jsonb`` object of columns, without nulls, like RadioEvent.to_row payloads."""
+    args = []
+    for key, value in fields.items():
+        args += [literal_column(f"'{key}'"), value]
+    return func.jsonb_strip_nulls(func.jsonb_build_object(*args))
+
+
+class Projection:
+    """A table derived from the event log."""
+
+    name = ""
+    event_types: Tuple[str, ...] = ()
+    cache_tag: Optional[str] = None  # Response cache tag of every read built from this table
+
+    async def apply(self, db: AsyncSession, events: List[Event]) -> Optional[int]:
+        """Apply a batch. Return the number applied to stop early and retry the rest later."""
+        raise NotImplementedError
+
+    def changed_tags(self, events: List[Event]) -> Set[str]:
+        """Response cache tags made stale by applying ``events``."""
+        return {self.cache_tag} if self.cache_tag and events else set()
+
+    async def reset(self, db: AsyncSession):
+        """Remove everything this projection derived, before a rebuild."""
+        raise NotImplementedError
+
+
+class NodesProjection(Projection):
+    """Names, last position, battery and last heard time per node.
+
+    Rows are upserted, so nodes are also created for senders we only know
+    from telemetry or positions (the other projections reference them).
+    """
+
+    name = "nodes"
+    event_types = ("node_update", "position", "telemetry", "message")
+    cache_tag = "nodes"
+
+    async def apply(self, db: AsyncSession, events: List[Event]):
+        # Coalesce per node: one upsert row per node per batch
+        rows: Dict[str, dict] = {}
+        for event in events:
+            node_id = event.node_id
+            if not node_id:
+                continue
+            row = rows.setdefault(node_id, {"id": node_id, "last_heard": event.timestamp})
+            row["last_heard"] = max(row["last_heard"], event.timestamp)
+            data = event.data
+            if event.type == "node_update":
+                for field in ("long_name", "short_name", "hw_model"):
+                    if field in data:
+                        row[field] = data[field]
+            elif event.type == "position":
+                for field in ("latitude", "longitude", "altitude"):
+                    if field in data:
+                        row[field] = data[field]
+            elif event.type == "telemetry" and data.get("type") == "device":
+                for field in ("battery_level", "voltage"):
+                    if field in data:
+                        row[field] = data[field]
+
+        columns = ("long_name", "short_name", "hw_model", "latitude", "longitude", "altitude",
+                   "battery_level", "voltage")
+        # Multi-row INSERT needs the same keys in every row
+        values = [{"id": r["id"], "last_heard": r["last_heard"], **{c: r.get(c) for c in columns}}
+                  for r in rows.values()]
+        if not values:
+            return
+        stmt = insert(Node).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Node.id],
+            set_={
+                **{c: func.coalesce(getattr(stmt.excluded, c), getattr(Node, c)) for c in columns},
+                "last_heard": func.greatest(stmt.excluded.last_heard, Node.last_heard),
+                "updated_at": func.now()
+            }
+        )
+        await db.execute(stmt)
+
+    async def reset(self, db: AsyncSession):
+        # Nodes also hold synced and user data (favorites), so rows are kept
+        # and the replay overwrites what the events know
+        pass
+
+
+class MessagesProjection(Projection):
+    """Received messages, and ACK/NAK status of outgoing ones.
+
+    Outgoing messages are written by the API when sent (the response needs
+    their ID), so a rebuild only replaces received messages and ACK status.
+    Received messages from before the event log are in it (Projector.seed_legacy).
+    """
+
+    name = "messages"
+    event_types = ("message", "ack")
+    cache_tag = "messages"
+
+    def changed_tags(self, events: List[Event]) -> Set[str]:
+        # A new message only changes pages of its channel; ACKs can't tell which
+        tags = set()
+        for event in events:
+            if event.type == "message":
+                tags.update(message_tags(event.data.get("channel", 0)))
+            else:
+                tags.add(self.cache_tag)
+        return tags
+
+    async def apply(self, db: AsyncSession, events: List[Event]) -> Optional[int]:
+        for i, event in enumerate(events):
+            data = event.data
+            if event.type == "message":
+                await self._apply_message(db, event.timestamp, data)
+            elif event.type == "ack":
+                if not await self._apply_ack(db, data) and datetime.now() - event.timestamp < ACK_MATCH_GRACE:
+                    return i  # Its message may not be written yet
+        return None
+
+    async def _apply_message(self, db: AsyncSession, ts: datetime, data: dict):
+        from_node = data.get("from_node_id")
+        to_node = data.get("to_node_id")
+        text = data.get("text", "")
+
+        # Same sender, recipient and text within 30 seconds is a duplicate
+        existing = await db.execute(
+            select(Message.id).where(and_(
+                Message.from_node_id == from_node,
+                Message.to_node_id == to_node,
+                Message.text == text,
+                Message.timestamp > ts - MESSAGE_DEDUP_WINDOW,
+                Message.timestamp <= ts
+            )).limit(1)
+        )
+        if existing.scalar_one_or_none():
+            logger.debug(f"Skipping duplicate message from {from_node}")
+            return
+
+        db.add(Message(
+            from_node_id=from_node,
+            to_node_id=to_node,
+            channel=data.get("channel", 0),
+            text=text,
+            timestamp=ts,
+            is_outgoing=False
+        ))
+        await db.flush()  # Visible to the duplicate check of later events in the batch
+
+    async def _apply_ack(self, db: AsyncSession, data: dict) -> bool:
+        """Mark the matching outgoing message. False if there is none."""
+        # Find the most recent outgoing message to this node with this text
+        to_node = data.get("to_node_id")
+        text = data.get("text")
+        if not to_node or not text:
+            return True
+
+        result = await db.execute(
+            select(Message)
+            .where(and_(
+                Message.to_node_id == to_node,
+                Message.text == text,
+                Message.is_outgoing == True,
+                Message.ack_received == False,
+                Message.ack_failed == False
+            ))
+            .order_by(desc(Message.timestamp))
+            .limit(1)
+        )
+        msg = result.scalar_one_or_none()
+        if not msg:
+            return False
+        if data.get("success", True):
+            msg.ack_received = True
+            logger.info(f"Marked message as ACK'd: {text[:30]}...")
+        else:
+            msg.ack_failed = True
+            msg.ack_error = data.get("error")
+            logger.warning(f"Marked message as failed: {text[:30]}... ({data.get('error')})")
+        await db.flush()
+        return True
+
+    async def reset(self, db: AsyncSession):
+        await db.execute(delete(Message).where(Message.is_outgoing == False))
+        await db.execute(
+            update(Message)
+            .where(Message.is_outgoing == True)
+            .values(ack_received=False, ack_failed=False, ack_error=None)
+        )
+
+
+class TelemetryProjection(Projection):
+    """Device metrics history."""
+
+    name = "telemetry"
+    event_types = ("telemetry",)
+    cache_tag = "telemetry"
+
+    def changed_tags(self, events: List[Event]) -> Set[str]:
+        tags = set()
+        for event in events:
+            if event.node_id and event.data.get("type") == "device":
+                tags.update(telemetry_tags(event.node_id))
+        return tags
+
+    async def apply(self, db: AsyncSession, events: List[Event]):
+        rows = [
+            {
+                "node_id": event.node_id,
+                "battery_level": event.data.get("battery_level"),
+                "voltage": event.data.get("voltage"),
+                "channel_utilization": event.data.get("channel_utilization"),
+                "air_util_tx": event.data.get("air_util_tx"),
+                "uptime_seconds": event.data.get("uptime_seconds"),
+                "timestamp": event.timestamp
+            }
+            for event in events
+            if event.node_id and event.data.get("type") == "device"
+        ]
+        if rows:
+            await db.execute(insert(Telemetry), rows)
+
+    async def reset(self, db: AsyncSession):
+        await db.execute(delete(Telemetry))
+
+
+class TelemetrySamplesProjection(Projection):
+    """Every metric of every telemetry type, one row per reading (see app.telemetry_samples)."""
+
+    name = "telemetry_samples"
+    event_types = ("telemetry",)
+
+    async def apply(self, db: AsyncSession, events: List[Event]):
+        rows = [
+            row
+            for event in events
+            if event.node_id
+            for row in sample_rows(event.node_id, event.data.get("type"), event.timestamp, event.data)
+        ]
+        # Re-imported readings are already there
+        for i in range(0, len(rows), SAMPLE_INSERT_CHUNK):
+            stmt = insert(TelemetrySample).values(rows[i:i + SAMPLE_INSERT_CHUNK])
+            await db.execute(stmt.on_conflict_do_nothing())
+
+    async def reset(self, db: AsyncSession):
+        await db.execute(delete(TelemetrySample))
+
+
+class PositionsProjection(Projection):
+    """Position history."""
+
+    name = "positions"
+    event_types = ("position",)
+
+    async def apply(self, db: AsyncSession, events: List[Event]):
+        rows = [
+            {
+                "node_id": event.node_id,
+                "latitude": event.data["latitude"],
+                "longitude": event.data["longitude"],
+                "altitude": event.data.get("altitude"),
+                "timestamp": event.timestamp
+            }
+            for event in events
+            if event.node_id and "latitude" in event.data and "longitude" in event.data
+        ]
+        if rows:
+            await db.execute(insert(Position), rows)
+
+    async def reset(self, db: AsyncSession):
+        await db.execute(delete(Position))
+
+
+class Projector:
+    """Runs the projections, catching each up to the head of the event log.
+
+    Nodes go first, since telemetry and positions reference them. The live
+    loop wakes whenever the event store writes a batch.
+    """
+
+    def __init__(self, projections: List[Projection]):
+        self.settings = get_settings()
+        self.projections = projections
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._applied: Dict[str, int] = {p.name: 0 for p in projections}
+        self._listeners: List[Callable[[Set[str]], None]] = []
+        self._deferred = False  # A projection stopped early and wants a retry soon
+
+    def add_listener(self, callback: Callable[[Set[str]], None]):
+        """Call ``callback(tags)`` with the response cache tags of each committed batch."""
+        self._listeners.append(callback)
+
+    def _changed(self, tags: Set[str]):
+        if not tags:
+            return
+        for callback in self._listeners:
+            callback(tags)
+
+    def get(self, name: str) -> Optional[Projection]:
+        for projection in self.projections:
+            if projection.name == name:
+                return projection
+        return None
+
+    async def _checkpoint(self, db: AsyncSession, name: str) -> int:
+        result = await db.execute(
+            select(ProjectionCheckpoint.position).where(ProjectionCheckpoint.name == name)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def _set_checkpoint(self, db: AsyncSession, name: str, position: int):
+        stmt = insert(ProjectionCheckpoint).values(name=name, position=position)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProjectionCheckpoint.name],
+            set_={"position": stmt.excluded.position, "updated_at": func.now()}
+        )
+        await db.execute(stmt)
+
+    async def catch_up(self, projection: Projection, batch_size: Optional[int] = None) -> int:
+        """Apply all new events to ``projection``. Returns the number applied."""
+        batch_size = batch_size or self.settings.projection_batch_size
+        applied = 0
+        while True:
+            async with async_session() as db:
+                # Serializes catch-up across processes (e.g. an import running next to the dashboard)
+                await db.execute(select(func.pg_advisory_xact_lock(zlib.crc32(projection.name.encode()))))
+                position = await self._checkpoint(db, projection.name)
+                head = (await db.execute(select(func.max(Event.id)))).scalar_one_or_none() or 0
+                if head <= position:
+                    return applied
+
+                result = await db.execute(
+                    select(Event)
+                    .where(Event.id > position, Event.id <= head, Event.type.in_(projection.event_types))
+                    .order_by(Event.id)
+                    .limit(batch_size)
+                )
+                events = result.scalars().all()
+                stopped = await projection.apply(db, events)
+                if stopped is not None:
+                    # Keep the rest, starting with the event it stopped at, for a retry
+                    events = events[:stopped]
+                    if events:
+                        await self._set_checkpoint(db, projection.name, events[-1].id)
+                    await db.commit()
+                    self._deferred = True
+                    self._changed(projection.changed_tags(events))
+                    applied += len(events)
+                    self._applied[projection.name] += len(events)
+                    return applied
+                # A short batch means everything up to head was seen, relevant or not
+                done = len(events) < batch_size
+                await self._set_checkpoint(db, projection.name, head if done else events[-1].id)
+                await db.commit()
+
+            self._changed(projection.changed_tags(events))
+            applied += len(events)
+            self._applied[projection.name] += len(events)
+            if done:
+                return applied
+
+    async def catch_up_all(self):
+        for projection in self.projections:
+            try:
+                await self.catch_up(projection)
+            except Exception as e:
+                logger.error(f"[PROJ] {projection.name} failed to catch up: {e}")
+
+    async def seed_legacy(self) -> int:
+        """Copy rows stored before the event log existed into it, once.
+
+        Received messages, device telemetry and positions older than the first
+        event become events, so a rebuild replays them instead of deleting
+        them. The projections that already hold those rows skip the copies;
+        telemetry_samples backfills from them. Returns the number of events added.
+        """
+        # Projections skip the copies by moving their checkpoint past them, so
+        # they must have applied everything before them
+        for name in LEGACY_SEEDED_PROJECTIONS:
+            await self.catch_up(self.get(name))
+
+        async with async_session() as db:
+            await db.execute(select(func.pg_advisory_xact_lock(zlib.crc32(LEGACY_SEED.encode()))))
+            done = await db.execute(
+                select(ProjectionCheckpoint.position).where(ProjectionCheckpoint.name == LEGACY_SEED)
+            )
+            if done.scalar_one_or_none() is not None:
+                return 0
+
+            head = (await db.execute(select(func.max(Event.id)))).scalar_one_or_none() or 0
+            first = (await db.execute(
+                select(Event.timestamp).order_by(Event.id).limit(1)
+            )).scalar_one_or_none()
+            columns = ["timestamp", "type", "radio", "node_id", "data"]
+            sources = [
+                (Message, select(
+                    Message.timestamp, literal_column("'message'"), null(), Message.from_node_id,
+                    _jsonb(from_node_id=Message.from_node_id, to_node_id=Message.to_node_id,
+                           channel=Message.channel, text=Message.text)
+                ).where(Message.is_outgoing == False)),
+                (Telemetry, select(
+                    Telemetry.timestamp, literal_column("'telemetry'"), null(), Telemetry.node_id,
+                    _jsonb(type=literal_column("'device'"), battery_level=Telemetry.battery_level,
+                           voltage=Telemetry.voltage, channel_utilization=Telemetry.channel_utilization,
+                           air_util_tx=Telemetry.air_util_tx, uptime_seconds=Telemetry.uptime_seconds)
+                )),
+                (Position, select(
+                    Position.timestamp, literal_column("'position'"), null(), Position.node_id,
+                    _jsonb(latitude=Position.latitude, longitude=Position.longitude, altitude=Position.altitude)
+                )),
+            ]
+            seeded = 0
+            for model, query in sources:
+                query = query.where(model.timestamp.isnot(None))
+                if first is not None:
+                    query = query.where(model.timestamp < first)
+                result = await db.execute(insert(Event).from_select(columns, query.order_by(model.timestamp)))
+                seeded += max(result.rowcount or 0, 0)
+
+            if seeded:
+                new_head = (await db.execute(select(func.max(Event.id)))).scalar_one_or_none() or 0
+                for name in LEGACY_SEEDED_PROJECTIONS:
+                    if await self._checkpoint(db, name) >= head:
+                        await self._set_checkpoint(db, name, new_head)
+                    else:
+                        logger.warning(f"[PROJ] {name} is behind the log; it will re-apply copied rows")
+            await self._set_checkpoint(db, LEGACY_SEED, seeded)
+            await db.commit()
+
+        if seeded:
+            logger.info(f"[PROJ] Copied {seeded} rows from before the event log into it")
+        return seeded
+
+    async def rebuild(self, names: Optional[List[str]] = None) -> Dict[str, int]:
+        """Reset and replay projections from the start of the log. Run with ingest stopped."""
+        # Rows from before the event log only survive a reset if they are in it
+        await self.seed_legacy()
+        counts = {}
+        for projection in self.projections:
+            if names and projection.name not in names:
+                continue
+            async with async_session() as db:
+                await projection.reset(db)
+                await self._set_checkpoint(db, projection.name, 0)
+                await db.commit()
+            if projection.cache_tag:
+                self._changed({projection.cache_tag})
+            counts[projection.name] = await self.catch_up(projection, self.settings.projection_rebuild_batch_size)
+            logger.info(f"[PROJ] Rebuilt {projection.name} from {counts[projection.name]} events")
+        return counts
+
+    async def status(self) -> dict:
+        async with async_session() as db:
+            head = (await db.execute(select(func.max(Event.id)))).scalar_one_or_none() or 0
+            projections = {}
+            for projection in self.projections:
+                position = await self._checkpoint(db, projection.name)
+                projections[projection.name] = {
+                    "position": position,
+                    "lag": head - position,
+                    "applied": self._applied[projection.name]
+                }
+        return {"head": head, "projections": projections}
+
+    # ----- Live loop -----
+
+    def notify(self):
+        """New events were written."""
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._deferred = False
+            await self.catch_up_all()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), ACK_RETRY_DELAY if self._deferred else 30.0)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Singleton instance
+projector = Projector([
+    NodesProjection(),
+    MessagesProjection(),
+    TelemetryProjection(),
+    TelemetrySamplesProjection(),
+    PositionsProjection(),
+])
+
+
+async def _main(argv: List[str]):
+    import json
+    from app.database import init_db, engine
+
+    await init_db()
+    try:
+        if argv and argv[0] == "rebuild":
+            names = argv[1:] or None
+            unknown = [n for n in names or [] if projector.get(n) is None]
+            if unknown:
+                raise SystemExit(f"Unknown projection(s): {', '.join(unknown)}")
+            print(json.dumps(await projector.rebuild(names), indent=2))
+        elif argv and argv[0] == "status":
+            print(json.dumps(await projector.status(), indent=2))
+        else:
+            raise SystemExit("usage: python -m app.projections {rebuild [name ...] | status}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s")
+    asyncio.run(_main(sys.argv[1:]))
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from app.config import get_settings
+from app.etag import bytes_response
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    tags: Set[str]
+    expires: float
+
+
+class ResponseCache:
+    """Encoded JSON responses of read endpoints, shared by all clients.
+
+    Entries are keyed by route and query parameters and carry tags naming
+    the data they were built from (``"nodes"``, ``"messages:0"``, ...).
+    The projections invalidate the tags of whatever a batch of events
+    changed, right after committing it, so a cached page is served until
+    the table behind it actually changes. ``response_cache_ttl`` bounds how
+    long anything written outside this process (imports, rebuilds) can stay
+    unseen; the least recently used entries are evicted beyond
+    ``response_cache_size`` entries or ``response_cache_max_bytes``.
+
+    Concurrent misses for the same key share one database query.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._by_tag: Dict[str, Set[Hashable]] = {}
+        # Bumped on each invalidation, so a response read before it isn't stored after it
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0  # Same, for clear()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+        self._listeners: List[Callable[[Iterable[str]], None]] = []
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._shared = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.response_cache_ttl > 0
+
+    def _get(self, key: Hashable) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= len(entry.body)
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def _put(self, key: Hashable, entry: CachedResponse):
+        self._remove(key)
+        self._entries[key] = entry
+        self._bytes += len(entry.body)
+        for tag in entry.tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while self._entries and (len(self._entries) > self.settings.response_cache_size
+                                 or self._bytes > self.settings.response_cache_max_bytes):
+            self._remove(next(iter(self._entries)))
+
+    async def _load(self, key: Hashable, tags: Set[str], load: Callable[[], Awaitable],
+                    adapter: TypeAdapter) -> CachedResponse:
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        epoch = self._epoch
+        generations = {tag: self._generations.get(tag, 0) for tag in tags}
+        entry = None
+        try:
+            rows = await load()
+            body = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+            entry = CachedResponse(
+                body=body,
+                etag=f'"{hashlib.sha1(body).hexdigest()[:20]}"',
+                tags=tags,
+                expires=time.monotonic() + self.settings.response_cache_ttl
+            )
+            if epoch == self._epoch and \
+                    all(self._generations.get(tag, 0) == gen for tag, gen in generations.items()):
+                self._put(key, entry)
+            return entry
+        finally:
+            # Waiters get None if this load failed and run their own
+            future.set_result(entry)
+            if self._loading.get(key) is future:
+                del self._loading[key]
+
+    async def respond(self, request: Request, key: Hashable, tags: Iterable[str],
+                      load: Callable[[], Awaitable], adapter: TypeAdapter) -> Response:
+        """Cached response for ``key``, built with ``load()`` on a miss.
+
+        ``load`` returns ORM rows, which are validated and encoded with
+        ``adapter``. Supports If-None-Match like etag_response.
+        """
+        tags = set(tags)
+        if not self.enabled:
+            rows = await load()
+            return Response(adapter.dump_json(adapter.validate_python(rows, from_attributes=True)),
+                            media_type="application/json")
+
+        entry = self._get(key)
+        if entry is not None:
+            self._hits += 1
+        else:
+            pending = self._loading.get(key)
+            if pending is not None:
+                entry = await asyncio.shield(pending)
+                if entry is not None:
+                    self._shared += 1
+            if entry is None:
+                self._misses += 1
+                entry = await self._load(key, tags, load, adapter)
+        return bytes_response(request, entry.body, entry.etag)
+
+    def invalidate(self, tags: Iterable[str]):
+        """Drop every entry built from any of ``tags``."""
+        tags = set(tags)
+        if not tags:
+            return
+        self._invalidations += 1
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in list(self._by_tag.get(tag, ())):
+                self._remove(key)
+        for callback in self._listeners:
+            callback(tags)
+
+    def clear(self):
+        """Drop everything, e.g. after missing invalidations."""
+        self._epoch += 1
+        for key in list(self._entries):
+            self._remove(key)
+
+    def add_listener(self, callback: Callable[[Iterable[str]], None]):
+        """Call ``callback(tags)`` on every invalidation, e.g. to pass it on to other processes."""
+        self._listeners.append(callback)
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses + self._shared
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "shared": self._shared,  # Misses answered by a query already running for the same key
+            "hit_rate": round(self._hits / lookups, 3) if lookups else None,
+            "invalidations": self._invalidations
+        }
+
+
+# Singleton instance
+response_cache = ResponseCache()
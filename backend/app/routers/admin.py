@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+from typing import Optional
+from app.ble_discovery import ble_discovery
+from app.event_store import event_store
+from app.executors import radio_executors
+from app.logging_setup import logging_pipeline
+from app.profiler import profiler
+from app.projections import projector
+from app.response_cache import response_cache
+from app.routers.websocket import batcher, connected_clients
+from app.startup import startup_timer
+from app.ws_replay import replay_buffer
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+class LogLevelRequest(BaseModel):
+    target: str  # "file", "console", "root" or a logger name such as "app.packets"
+    level: str
+
+
+class PacketLogRateRequest(BaseModel):
+    rate: float  # Per-packet log lines per second (0 = unlimited)
+    burst: Optional[int] = None
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def run_profile(
+    seconds: float = Query(10.0, gt=0, le=120),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    include_idle: bool = False
+):
+    """Sample every thread for N seconds and return collapsed stacks.
+
+    The output can be fed directly to flamegraph.pl, inferno or speedscope.
+    Covers the BLE reader threads, executor threads and the event loop.
+    """
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    logger.info(f"[PROF] Profiling all threads for {seconds}s (interval={interval_ms}ms)")
+
+    # Sample from a dedicated thread so the event loop itself shows up in the stacks
+    loop = asyncio.get_event_loop()
+    future = loop.create_future()
+
+    def worker():
+        try:
+            result = profiler.sample(seconds, interval_ms / 1000.0, include_idle)
+            loop.call_soon_threadsafe(future.set_result, result)
+        except Exception as e:
+            loop.call_soon_threadsafe(future.set_exception, e)
+
+    threading.Thread(target=worker, name="profiler", daemon=True).start()
+
+    try:
+        result = await future
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    filename = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.collapsed"
+    return PlainTextResponse(
+        result["collapsed"],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(result["samples"]),
+            "X-Profile-Unique-Stacks": str(result["unique_stacks"])
+        }
+    )
+
+
+@router.get("/logging")
+async def get_logging_status():
+    """Get handler/logger levels and logging queue health."""
+    return logging_pipeline.get_status()
+
+
+@router.put("/logging/level")
+async def set_log_level(request: LogLevelRequest):
+    """Change log verbosity at runtime."""
+    try:
+        logging_pipeline.set_level(request.target, request.level)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"Log level for '{request.target}' set to {request.level.upper()}")
+    return logging_pipeline.get_status()
+
+
+@router.put("/logging/packet-rate")
+async def set_packet_log_rate(request: PacketLogRateRequest):
+    """Change the rate limit applied to per-packet log lines."""
+    if request.rate < 0 or (request.burst is not None and request.burst < 1):
+        raise HTTPException(status_code=400, detail="rate must be >= 0 and burst >= 1")
+    if logging_pipeline.packet_filter is None:
+        raise HTTPException(status_code=503, detail="Logging pipeline not configured")
+
+    logging_pipeline.packet_filter.configure(request.rate, request.burst)
+    return logging_pipeline.get_status()
+
+
+@router.get("/executors")
+async def get_executor_stats():
+    """Get queue and latency metrics for the radio I/O thread pools."""
+    return radio_executors.stats()
+
+
+@router.get("/startup")
+async def get_startup_report():
+    """Time spent in each startup phase (imports, router setup, DB, ...)."""
+    return startup_timer.report()
+
+
+@router.get("/events")
+async def get_event_log_status():
+    """Event log write stats and how far each projection has caught up."""
+    try:
+        projections = await projector.status()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {e}")
+    return {"store": event_store.stats(), **projections}
+
+
+@router.get("/websocket")
+async def get_websocket_stats():
+    """Connected clients per encoding, broadcast batching counters and the replay buffer."""
+    encodings = {}
+    for client in list(connected_clients):
+        encodings[client.state.encoding] = encodings.get(client.state.encoding, 0) + 1
+    return {"clients": encodings, "batching": batcher.stats(), "replay": replay_buffer.stats()}
+
+
+@router.get("/cache")
+async def get_response_cache_stats():
+    """Hit rate, size and invalidations of the read-path response cache."""
+    return response_cache.stats()
+
+
+@router.get("/ble")
+async def get_ble_discovery_stats():
+    """Background BLE discovery: scanner state and recently advertised Meshtastic radios."""
+    return ble_discovery.stats()
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+from app.alerts import alert_engine, Rule, RULE_KINDS, TRANSITION_KINDS
+from app.client_manager import client_manager
+from app.database import get_db
+from app.models import Alert, AlertRule
+from app.schemas import AlertRuleCreate, AlertRuleResponse, AlertResponse
+
+router = APIRouter(prefix="/api/alerts", tags=["alerts"])
+
+# Evaluate rules on every radio event
+client_manager.add_event_callback(alert_engine.process)
+
+
+@router.get("", response_model=List[AlertResponse])
+async def get_alerts(
+    node_id: Optional[str] = None,
+    rule_id: Optional[int] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db)
+):
+    """Alert history, newest first."""
+    query = select(Alert).order_by(Alert.timestamp.desc())
+    if node_id:
+        query = query.where(Alert.node_id == node_id)
+    if rule_id is not None:
+        query = query.where(Alert.rule_id == rule_id)
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all()
+
+
+@router.get("/active")
+async def get_active_alerts():
+    """Rule/node pairs currently firing."""
+    return {**alert_engine.stats(), "active": alert_engine.active()}
+
+
+@router.get("/rules", response_model=List[AlertRuleResponse])
+async def get_rules(db: AsyncSession = Depends(get_db)):
+    """All alert rules."""
+    result = await db.execute(select(AlertRule).order_by(AlertRule.id))
+    return result.scalars().all()
+
+
+@router.post("/rules", response_model=AlertRuleResponse, status_code=201)
+async def create_rule(rule: AlertRuleCreate, db: AsyncSession = Depends(get_db)):
+    """Add an alert rule. It takes effect immediately."""
+    if rule.kind not in RULE_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown rule kind '{rule.kind}' "
+                                                    f"(expected one of: {', '.join(RULE_KINDS)})")
+    if rule.kind in TRANSITION_KINDS and (rule.latitude is None or rule.longitude is None):
+        raise HTTPException(status_code=400, detail="Geofence rules need latitude and longitude")
+    if rule.threshold < 0 or rule.consecutive < 1:
+        raise HTTPException(status_code=400, detail="threshold must be >= 0 and consecutive >= 1")
+
+    db_rule = AlertRule(**rule.model_dump())
+    db.add(db_rule)
+    await db.commit()
+    await db.refresh(db_rule)
+    if db_rule.enabled:
+        alert_engine.set_rule(Rule.from_row(db_rule))
+    return db_rule
+
+
+@router.delete("/rules/{rule_id}")
+async def delete_rule(rule_id: int, db: AsyncSession = Depends(get_db)):
+    """Delete an alert rule. Its past alerts are kept."""
+    db_rule = await db.get(AlertRule, rule_id)
+    if not db_rule:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    await db.delete(db_rule)
+    await db.commit()
+    alert_engine.remove_rule(rule_id)
+    return {"status": "deleted", "id": rule_id}
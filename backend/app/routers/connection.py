@@ -1,7 +1,10 @@
 import logging
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
 from app.schemas import ConnectionStatus
-from app.meshtastic_client import meshtastic_client
+from app.client_manager import client_manager
+from app.device_config import SECTIONS
+from app.etag import etag_response
 
 logger = logging.getLogger(__name__)
 
@@ -10,41 +13,41 @@ router = APIRouter(prefix="/api/connection", tags=["connection"])
 
 @router.get("", response_model=ConnectionStatus)
 async def get_connection_status():
-    """Get current BLE connection status."""
-    return meshtastic_client.get_connection_status()
+    """Get current BLE connection status (merged across radios)."""
+    return client_manager.get_connection_status()
 
 
 @router.post("/connect")
 async def connect_device():
     """Connect to the Meshtastic device via BLE."""
-    if meshtastic_client.connected:
-        return {"status": "already_connected", **meshtastic_client.get_connection_status()}
+    if client_manager.connected:
+        return {"status": "already_connected", **client_manager.get_connection_status()}
 
-    success = await meshtastic_client.connect()
+    success = await client_manager.connect()
 
     if not success:
-        error_detail = meshtastic_client.last_error or "Failed to connect to device"
+        error_detail = client_manager.last_error or "Failed to connect to device"
         logger.error(f"Connection failed: {error_detail}")
 
         # Include scan results in error response for better UX
         error_response = {"detail": error_detail}
-        if meshtastic_client.last_scan_result:
-            error_response["scan_result"] = meshtastic_client.last_scan_result
+        if client_manager.last_scan_result:
+            error_response["scan_result"] = client_manager.last_scan_result
 
         raise HTTPException(status_code=503, detail=error_response)
 
-    return {"status": "connected", **meshtastic_client.get_connection_status()}
+    return {"status": "connected", **client_manager.get_connection_status()}
 
 
 @router.post("/disconnect")
 async def disconnect_device():
     """Disconnect from the Meshtastic device."""
     logger.info("Disconnect request received")
-    await meshtastic_client.disconnect()
+    await client_manager.disconnect()
     logger.info("Disconnect completed")
 
     result = {"status": "disconnected"}
-    if meshtastic_client._close_failed:
+    if client_manager.close_failed:
         result["warning"] = "BLE close timed out. Try Reset BLE or restart the server if reconnect fails."
     return result
 
@@ -53,7 +56,7 @@ async def disconnect_device():
 async def reset_ble():
     """Reset BLE connection state. Use when connection is stuck."""
     logger.info("BLE reset request received")
-    result = await meshtastic_client.reset_ble()
+    result = await client_manager.reset_ble()
     logger.info(f"BLE reset completed: {result}")
     return result
 
@@ -65,6 +68,43 @@ async def scan_ble_devices():
     Returns categorized list of devices with Meshtastic devices highlighted.
     """
     logger.info("BLE scan request received")
-    result = await meshtastic_client.scan_ble_devices()
+    result = await client_manager.scan_ble_devices()
     logger.info(f"BLE scan completed: {len(result.get('meshtastic_devices', []))} Meshtastic devices found")
     return result
+
+
+@router.get("/config")
+async def get_device_config(request: Request, radio: Optional[str] = None):
+    """Cached channels, local config, module config and metadata (secrets removed).
+
+    Supports If-None-Match; the cache is rebuilt after admin packets or a reconnect.
+    """
+    client, cache = client_manager.device_config(radio)
+    if client is None:
+        raise HTTPException(status_code=404, detail=f"Unknown radio: {radio}")
+    if not client.connected:
+        raise HTTPException(status_code=503, detail="Not connected to device")
+
+    sections, etag = cache.all(client.interface)
+    return etag_response(request, sections, etag)
+
+
+@router.get("/config/{section}")
+async def get_device_config_section(section: str, request: Request, radio: Optional[str] = None):
+    """One cached config section: channels, local_config, module_config or metadata."""
+    if section not in SECTIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown config section: {section}")
+    client, cache = client_manager.device_config(radio)
+    if client is None:
+        raise HTTPException(status_code=404, detail=f"Unknown radio: {radio}")
+    if not client.connected:
+        raise HTTPException(status_code=503, detail="Not connected to device")
+
+    value, etag = cache.get(section, client.interface)
+    return etag_response(request, value, etag)
+
+
+@router.get("/radios")
+async def get_radios():
+    """Get per-radio connection state, ingest queue depth and dedup counters."""
+    return client_manager.stats()
@@ -0,0 +1,53 @@
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.config import get_settings
+from app.export import DATASETS, FORMATS, ExportError, export_stream, require_pyarrow
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+settings = get_settings()
+
+
+@router.get("")
+async def list_exports():
+    """Datasets and formats available for export."""
+    try:
+        require_pyarrow()
+        formats = list(FORMATS)
+    except ExportError:
+        formats = [f for f in FORMATS if f != "parquet"]
+    return {"datasets": list(DATASETS), "formats": formats}
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    fmt: str = Query("ndjson", alias="format"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    node_id: Optional[List[str]] = Query(None),
+    gzip: bool = False
+):
+    """Stream a dataset as NDJSON, CSV or Parquet, oldest first.
+
+    Rows are read through a server-side cursor and encoded batch by batch,
+    so memory use does not depend on the size of the export. ``start``/``end``
+    bound the time range, ``node_id`` (repeatable) limits it to some nodes and
+    ``gzip`` compresses NDJSON/CSV on the fly.
+    """
+    try:
+        stream = export_stream(dataset, fmt, start, end, node_id, gzip, settings.export_batch_size)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    media_type, extension = FORMATS[fmt]
+    filename = f"{dataset}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{extension}"
+    if gzip and fmt != "parquet":
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,59 +1,76 @@
-import asyncio
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from pydantic import TypeAdapter
 from typing import List, Optional
-from app.database import get_db, async_session
+from app.database import get_db
+from app.broadcast_jobs import broadcast_jobs
 from app.models import Message
 from app.schemas import MessageCreate, MessageResponse
-from app.meshtastic_client import meshtastic_client
+from app.client_manager import client_manager
+from app.send_scheduler import send_scheduler, QueueFullError
+from app.etag import etag_response
+from app.projections import message_tags
+from app.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/messages", tags=["messages"])
 
+MESSAGE_LIST = TypeAdapter(List[MessageResponse])
+
 
 class BroadcastToAllRequest(BaseModel):
     text: str
-    delay_seconds: float = 1.0  # Delay between messages to not overwhelm the mesh
+    delay_seconds: float = 0.0  # Optional extra spacing; the outbound scheduler already paces by airtime
 
 
 @router.get("", response_model=List[MessageResponse])
 async def get_messages(
+    request: Request,
     limit: int = 100,
     offset: int = 0,
     channel: Optional[int] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get message history."""
+    """Get message history. The first page is cached until a message arrives on its channel."""
     query = select(Message).order_by(Message.timestamp.desc())
 
     if channel is not None:
         query = query.where(Message.channel == channel)
 
     query = query.limit(limit).offset(offset)
-    result = await db.execute(query)
-    messages = result.scalars().all()
-    return messages
+
+    async def load():
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    if offset:
+        return await load()
+    tags = ("messages", f"messages:{'all' if channel is None else channel}")
+    return await response_cache.respond(request, ("messages", channel, limit), tags, load, MESSAGE_LIST)
 
 
 @router.post("", response_model=MessageResponse)
 async def send_message(message: MessageCreate, db: AsyncSession = Depends(get_db)):
     """Send a text message via Meshtastic."""
-    if not meshtastic_client.connected:
+    if not client_manager.connected:
         raise HTTPException(status_code=503, detail="Not connected to device")
 
     logger.info(f"Sending message: text='{message.text}', to={message.to_node_id}, channel={message.channel}")
 
     # Send via Meshtastic
     try:
-        success = await meshtastic_client.send_message(
+        success = await client_manager.send_message(
             text=message.text,
             destination=message.to_node_id,
             channel=message.channel
         )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         logger.error(f"Exception sending message: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to send message: {str(e)}")
@@ -63,151 +80,117 @@ async def send_message(message: MessageCreate, db: AsyncSession = Depends(get_db
         raise HTTPException(status_code=500, detail="Failed to send message")
 
     # Store in database
-    my_node_id = f"!{meshtastic_client.my_node_num:08x}" if meshtastic_client.my_node_num else None
+    my_node_id = f"!{client_manager.my_node_num:08x}" if client_manager.my_node_num else None
     db_message = Message(
         from_node_id=my_node_id,
         to_node_id=message.to_node_id,
         channel=message.channel,
         text=message.text,
+        timestamp=datetime.now(),  # Received messages use the same local clock (app.events)
         is_outgoing=True
     )
     db.add(db_message)
     await db.commit()
     await db.refresh(db_message)
+    response_cache.invalidate(message_tags(message.channel))
 
     return db_message
 
 
 @router.get("/channels")
-async def get_channels():
-    """Get available channels from the device."""
-    if not meshtastic_client.connected:
+async def get_channels(request: Request):
+    """Get available channels from the device (cached, supports If-None-Match)."""
+    if not client_manager.connected:
         raise HTTPException(status_code=503, detail="Not connected to device")
 
-    interface = meshtastic_client.interface
-    if not interface or not interface.localNode:
-        return []
+    client, cache = client_manager.device_config()
+    channels, etag = cache.get("channels", client.interface)
+    return etag_response(request, channels or [], etag)
+
+
+@router.get("/queue")
+async def get_outbound_queue():
+    """Get outbound send queue depth, pacing rate and pending jobs."""
+    return {**send_scheduler.stats(), "pending": send_scheduler.pending()}
 
-    channels = []
-    for i, ch in enumerate(interface.localNode.channels):
-        if ch.role != 0:  # DISABLED
-            channels.append({
-                "index": i,
-                "name": ch.settings.name or f"Channel {i}",
-                "role": ch.role
-            })
 
-    return channels
+@router.delete("/queue/{job_id}")
+async def cancel_outbound_job(job_id: str):
+    """Cancel a queued send that hasn't gone out yet."""
+    if not send_scheduler.cancel(job_id):
+        raise HTTPException(status_code=404, detail="Job not found or already sent")
+    return {"status": "cancelled", "id": job_id}
 
 
-@router.post("/broadcast-all")
+@router.post("/broadcast-all", status_code=202)
 async def broadcast_to_all_nodes(request: BroadcastToAllRequest):
-    """Send a direct message to every known node individually."""
-    from app.routers.websocket import broadcast
+    """Start a background job that sends a direct message to every known node.
 
-    if not meshtastic_client.connected:
+    Returns immediately with the job; poll GET /broadcast-all/{job_id} or watch
+    the broadcast_progress WebSocket events.
+    """
+    if not client_manager.connected:
         raise HTTPException(status_code=503, detail="Not connected to device")
 
-    nodes = meshtastic_client.get_nodes()
+    nodes = client_manager.get_nodes()
     if not nodes:
         raise HTTPException(status_code=404, detail="No nodes found")
 
-    my_node_num = meshtastic_client.my_node_num
-    my_node_id = f"!{my_node_num:08x}" if my_node_num else None
+    # Skip our own radios
+    my_node_ids = {f"!{num:08x}" for num in client_manager.my_node_nums}
 
-    sent_count = 0
-    failed_count = 0
+    targets = []
     skipped_count = 0
-    total_to_send = len([n for n in nodes.keys() if n != my_node_id])
-    current = 0
-
-    # Notify start
-    await broadcast({
-        "type": "broadcast_progress",
-        "data": {
-            "status": "started",
-            "total": total_to_send,
-            "current": 0,
-            "sent": 0,
-            "failed": 0
-        }
-    })
-
     for node_id, node_data in nodes.items():
         # Skip our own node
-        if node_id == my_node_id:
+        if node_id in my_node_ids:
             skipped_count += 1
             continue
 
-        current += 1
         user = node_data.get("user", {}) if isinstance(node_data, dict) else {}
         node_name = user.get("longName") or user.get("shortName") or node_id[-8:]
+        targets.append((node_id, node_name))
+
+    job = broadcast_jobs.start(
+        text=request.text,
+        targets=targets,
+        skipped=skipped_count,
+        delay_seconds=request.delay_seconds
+    )
+    return job.to_dict()
+
+
+@router.get("/broadcast-all")
+async def list_broadcast_jobs():
+    """List recent broadcast-all jobs, newest first."""
+    return [job.to_dict() for job in broadcast_jobs.list()]
+
+
+@router.get("/broadcast-all/{job_id}")
+async def get_broadcast_job(job_id: str):
+    """Get the status of a broadcast-all job."""
+    job = broadcast_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.post("/broadcast-all/{job_id}/cancel")
+async def cancel_broadcast_job(job_id: str):
+    """Cancel a running broadcast-all job. Messages already sent stay sent."""
+    job = broadcast_jobs.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.post("/broadcast-all/{job_id}/resume")
+async def resume_broadcast_job(job_id: str):
+    """Resume a cancelled or failed job, retrying only nodes not yet sent to."""
+    if not client_manager.connected:
+        raise HTTPException(status_code=503, detail="Not connected to device")
 
-        # Notify progress
-        await broadcast({
-            "type": "broadcast_progress",
-            "data": {
-                "status": "sending",
-                "total": total_to_send,
-                "current": current,
-                "sent": sent_count,
-                "failed": failed_count,
-                "current_node": node_name,
-                "current_node_id": node_id
-            }
-        })
-
-        try:
-            # Send DM to this node
-            success = await meshtastic_client.send_message(
-                text=request.text,
-                destination=node_id,
-                channel=0
-            )
-
-            if success:
-                sent_count += 1
-                # Store in database (separate try/catch so DB errors don't affect send count)
-                try:
-                    async with async_session() as db:
-                        db_message = Message(
-                            from_node_id=my_node_id,
-                            to_node_id=node_id,
-                            channel=0,
-                            text=request.text,
-                            is_outgoing=True
-                        )
-                        db.add(db_message)
-                        await db.commit()
-                except Exception as db_error:
-                    logger.warning(f"Failed to save message to DB for {node_id}: {db_error}")
-                    # Message was sent, just not saved - don't count as failed
-            else:
-                failed_count += 1
-
-            # Delay between messages to not overwhelm the mesh
-            if request.delay_seconds > 0:
-                await asyncio.sleep(request.delay_seconds)
-
-        except Exception as e:
-            logger.error(f"Error sending to {node_id}: {e}")
-            failed_count += 1
-
-    # Notify completion
-    await broadcast({
-        "type": "broadcast_progress",
-        "data": {
-            "status": "completed",
-            "total": total_to_send,
-            "current": total_to_send,
-            "sent": sent_count,
-            "failed": failed_count
-        }
-    })
-
-    return {
-        "total_nodes": len(nodes),
-        "sent": sent_count,
-        "failed": failed_count,
-        "skipped": skipped_count
-    }
+    job = broadcast_jobs.resume(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
@@ -1,20 +1,27 @@
-import json
+import asyncio
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from pydantic import TypeAdapter
 from typing import List
 from datetime import datetime
 from app.database import get_db
 from app.models import Node
 from app.schemas import NodeResponse
-from app.meshtastic_client import meshtastic_client
+from app.client_manager import client_manager
+from app.traceroute_manager import traceroute_manager, normalize_node_id, TracerouteError
+from app.link_stats import link_stats
+from app.liveness import liveness
+from app.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/nodes", tags=["nodes"])
 
+NODE_LIST = TypeAdapter(List[NodeResponse])
+
 
 def sanitize_for_json(obj):
     """Recursively convert objects to JSON-serializable types."""
@@ -36,22 +43,29 @@ def sanitize_for_json(obj):
 
 
 @router.get("", response_model=List[NodeResponse])
-async def get_nodes(db: AsyncSession = Depends(get_db)):
-    """Get all known nodes from database."""
-    result = await db.execute(select(Node).order_by(Node.last_heard.desc()))
-    nodes = result.scalars().all()
-    return nodes
+async def get_nodes(request: Request, db: AsyncSession = Depends(get_db)):
+    """Get all known nodes from database (cached until a node changes)."""
+    async def load():
+        result = await db.execute(select(Node).order_by(Node.last_heard.desc()))
+        return result.scalars().all()
+
+    return await response_cache.respond(request, ("nodes",), ("nodes",), load, NODE_LIST)
 
 
 @router.get("/live")
 async def get_live_nodes():
     """Get nodes directly from the connected Meshtastic device."""
-    if not meshtastic_client.connected:
+    if not client_manager.connected:
         raise HTTPException(status_code=503, detail="Not connected to device")
 
     try:
-        nodes = meshtastic_client.get_nodes()
+        nodes = client_manager.get_nodes()
         logger.info(f"Returning {len(nodes)} nodes")
+        # Server-side liveness so clients don't re-derive it for every node
+        nodes = {
+            node_id: {**node, "status": liveness.status(node_id)} if isinstance(node, dict) else node
+            for node_id, node in nodes.items()
+        }
         # Sanitize the data to ensure JSON serialization works
         sanitized = sanitize_for_json(nodes)
         return JSONResponse(content=sanitized)
@@ -60,6 +74,40 @@ async def get_live_nodes():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/traceroutes")
+async def get_cached_traceroutes():
+    """Get recently discovered routes (cached per destination with a TTL)."""
+    return {**traceroute_manager.stats(), "routes": traceroute_manager.cached()}
+
+
+@router.get("/status")
+async def get_node_status(include_nodes: bool = True):
+    """Online/recent/offline counts and per-node status. Changes are pushed as node_status events."""
+    if not include_nodes:
+        return {"counts": liveness.counts()}
+    return liveness.snapshot()
+
+
+@router.get("/link-stats")
+async def get_link_stats():
+    """Signal quality summary (EWMA/median SNR, RSSI, hops) for every node, per radio that heard it."""
+    return {**link_stats.stats(), "nodes": link_stats.summary()}
+
+
+@router.get("/{node_id}/link-stats")
+async def get_node_link_stats(node_id: str):
+    """Full signal statistics for one node per receiving radio, including direct links."""
+    try:
+        node_id = normalize_node_id(node_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid node id")
+
+    result = link_stats.get_node(node_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No packets heard from this node")
+    return result
+
+
 @router.get("/{node_id}", response_model=NodeResponse)
 async def get_node(node_id: str, db: AsyncSession = Depends(get_db)):
     """Get a specific node by ID."""
@@ -73,10 +121,10 @@ async def get_node(node_id: str, db: AsyncSession = Depends(get_db)):
 @router.post("/sync")
 async def sync_nodes(db: AsyncSession = Depends(get_db)):
     """Sync nodes from device to database."""
-    if not meshtastic_client.connected:
+    if not client_manager.connected:
         raise HTTPException(status_code=503, detail="Not connected to device")
 
-    nodes = meshtastic_client.get_nodes()
+    nodes = client_manager.get_nodes()
     synced_count = 0
 
     for node_id, node_data in nodes.items():
@@ -118,30 +166,55 @@ async def sync_nodes(db: AsyncSession = Depends(get_db)):
         synced_count += 1
 
     await db.commit()
+    response_cache.invalidate({"nodes"})
     return {"synced": synced_count}
 
 
+@router.get("/{node_id}/traceroute")
+async def get_cached_traceroute(node_id: str):
+    """Get the cached route to a node, if one is still fresh."""
+    try:
+        destination = normalize_node_id(node_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid node id")
+
+    result = traceroute_manager.get_cached(destination)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No cached route for this node")
+    return result
+
+
 @router.post("/{node_id}/traceroute")
-async def send_traceroute(node_id: str, hop_limit: int = 3, channel: int = 0):
+async def send_traceroute(node_id: str, hop_limit: int = 3, channel: int = 0, wait: bool = False):
     """Send a traceroute request to a specific node.
 
-    The response will be sent via WebSocket when received.
+    The response will be sent via WebSocket when received. With ``wait=true``
+    the request blocks until the route arrives (or times out) and returns it.
+    A request to a destination already in flight joins the existing one.
     """
-    if not meshtastic_client.connected:
+    if not client_manager.connected:
         raise HTTPException(status_code=503, detail="Not connected to device")
 
-    success = await meshtastic_client.send_traceroute(
-        destination=node_id,
-        hop_limit=hop_limit,
-        channel=channel
-    )
-
-    if not success:
-        raise HTTPException(status_code=500, detail="Failed to send traceroute request")
+    try:
+        destination = normalize_node_id(node_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid node id")
+
+    task, coalesced = client_manager.start_traceroute(destination, hop_limit, channel)
+
+    if wait:
+        try:
+            # Shield so a client disconnect doesn't cancel a traceroute others may share
+            return await asyncio.shield(task)
+        except TracerouteError as e:
+            status_code = 504 if e.code == "TIMEOUT" else 502
+            raise HTTPException(status_code=status_code, detail=f"Traceroute failed: {e.code}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to send traceroute request: {e}")
 
     return {
-        "status": "sent",
-        "destination": node_id,
+        "status": "in_flight" if coalesced else "sent",
+        "destination": destination,
         "hop_limit": hop_limit,
         "channel": channel,
         "message": "Traceroute request sent. Response will be delivered via WebSocket."
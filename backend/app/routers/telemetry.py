@@ -1,29 +1,53 @@
-from fastapi import APIRouter, Depends
+import time
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from pydantic import TypeAdapter
 from typing import List, Optional
 from app.database import get_db
 from app.models import Telemetry, Position
 from app.schemas import TelemetryResponse, PositionResponse
+from app.client_manager import client_manager
+from app.response_cache import response_cache
+from app.telemetry_buffer import telemetry_buffers, TELEMETRY_FIELDS
+from app.telemetry_samples import query_series
 
 router = APIRouter(prefix="/api/telemetry", tags=["telemetry"])
 
+TELEMETRY_LIST = TypeAdapter(List[TelemetryResponse])
+
+
+def record_telemetry_event(event_type: str, data: dict):
+    """Feed live telemetry events into the in-memory ring buffers."""
+    if event_type == "telemetry":
+        telemetry_buffers.record(data)
+
+
+client_manager.add_event_callback(record_telemetry_event)
+
 
 @router.get("", response_model=List[TelemetryResponse])
 async def get_telemetry(
+    request: Request,
     node_id: Optional[str] = None,
     limit: int = 100,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get telemetry data."""
+    """Get telemetry data (cached until the node reports again)."""
     query = select(Telemetry).order_by(Telemetry.timestamp.desc())
 
     if node_id:
         query = query.where(Telemetry.node_id == node_id)
 
     query = query.limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+
+    async def load():
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    tags = ("telemetry", f"telemetry:{node_id or 'all'}")
+    return await response_cache.respond(request, ("telemetry", node_id, limit), tags, load, TELEMETRY_LIST)
 
 
 @router.get("/positions", response_model=List[PositionResponse])
@@ -41,3 +65,81 @@ async def get_positions(
     query = query.limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
+
+
+@router.get("/history")
+async def get_telemetry_history(
+    node_id: str,
+    type: str = "device",
+    seconds: int = Query(default=3600, ge=1),
+    db: AsyncSession = Depends(get_db)
+):
+    """Telemetry for a node over the last ``seconds``, as columns.
+
+    Served from the in-memory ring buffer; the database is only queried for
+    the part of the window older than the buffer horizon.
+    """
+    if type not in TELEMETRY_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Unknown telemetry type: {type}")
+
+    since = time.time() - seconds
+    fields = TELEMETRY_FIELDS[type]
+    timestamps, values = telemetry_buffers.query(node_id, type, since)
+    source = "memory"
+
+    horizon = telemetry_buffers.horizon(node_id, type)
+    if since < horizon:
+        stored_timestamps, stored_values = await query_series(
+            db, node_id, type, fields, datetime.fromtimestamp(since), datetime.fromtimestamp(horizon)
+        )
+        if stored_timestamps:
+            source = "db+memory"
+            timestamps = stored_timestamps + timestamps
+            values = {field: stored_values[field] + values[field] for field in fields}
+
+    return {
+        "node_id": node_id,
+        "type": type,
+        "source": source,
+        "fields": list(fields),
+        "timestamps": timestamps,
+        "values": values
+    }
+
+
+@router.get("/series")
+async def get_telemetry_series(
+    node_id: str,
+    type: str = "environment",
+    fields: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(default=1000, ge=1, le=100000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stored telemetry of any type for a node, as columns, oldest first.
+
+    ``fields`` is a comma-separated subset of the type's fields (default all).
+    At most the newest ``limit`` timestamps in [start, end) are returned.
+    """
+    if type not in TELEMETRY_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Unknown telemetry type: {type}")
+    selected = tuple(f.strip() for f in fields.split(",") if f.strip()) if fields else TELEMETRY_FIELDS[type]
+    unknown = [f for f in selected if f not in TELEMETRY_FIELDS[type]]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown {type} field(s): {', '.join(unknown)}")
+
+    timestamps, values = await query_series(db, node_id, type, selected, start, end, limit)
+    return {
+        "node_id": node_id,
+        "type": type,
+        "fields": list(selected),
+        "timestamps": timestamps,
+        "values": values
+    }
+
+
+@router.get("/buffers")
+async def get_buffer_stats():
+    """Size and memory use of the telemetry ring buffers."""
+    return telemetry_buffers.stats()
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from app.client_manager import client_manager
+from app.topology import topology
+from app.traceroute_manager import normalize_node_id
+
+router = APIRouter(prefix="/api/topology", tags=["topology"])
+
+
+def _node_id(value: str) -> str:
+    try:
+        return normalize_node_id(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid node id: {value}")
+
+
+@router.get("")
+async def get_topology():
+    """Full link graph built from neighborinfo and traceroute packets."""
+    return {**topology.snapshot(), "stats": topology.stats()}
+
+
+@router.get("/path")
+async def get_best_path(target: str, source: Optional[str] = None):
+    """Best known path between two nodes (from our node if ``source`` is omitted)."""
+    if source is None:
+        if client_manager.my_node_num is None:
+            raise HTTPException(status_code=400, detail="source is required when not connected")
+        source = client_manager.my_node_num
+
+    result = topology.best_path(_node_id(source), _node_id(target))
+    if result is None:
+        raise HTTPException(status_code=404, detail="No known path")
+    return result
+
+
+@router.get("/{node_id}/neighbors")
+async def get_neighbors(node_id: str):
+    """Links into and out of a node."""
+    return topology.neighbors(_node_id(node_id))
+
+
+@router.get("/{node_id}/reachable")
+async def get_reachable(node_id: str, hops: int = Query(default=3, ge=1, le=7)):
+    """Nodes reachable from a node within ``hops`` known links."""
+    node = _node_id(node_id)
+    return {"node_id": node, "hops": hops, "reachable": topology.reachable(node, hops)}
@@ -1,31 +1,52 @@
 import asyncio
+import inspect
 import json
 import logging
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Set
-from app.meshtastic_client import meshtastic_client
-from app.database import async_session
-from app.models import Message, Telemetry, Position
+from typing import Dict, List, Optional, Set, Union
+from app.client_manager import client_manager
+from app.config import get_settings
+from app.event_bus import event_bus, REMOTE_CALLS, RemoteError
+from app.event_store import event_store
+from app.send_scheduler import QueueFullError
+from app.ws_encoding import ENCODINGS, JSON, encode, hello
+from app.ws_replay import replay_buffer
 
 logger = logging.getLogger(__name__)
 
+REPLAY_CHUNK = 500  # Events per frame when catching a resuming client up
+# Raised by _radio_call when the ingest process can't be reached or the call fails there
+RADIO_CALL_ERRORS = (ConnectionError, RemoteError, asyncio.TimeoutError)
+
 router = APIRouter()
 
 # Connected WebSocket clients
 connected_clients: Set[WebSocket] = set()
 
 
-async def broadcast(message: dict):
-    """Broadcast a message to all connected WebSocket clients."""
-    if not connected_clients:
-        return
+async def _send_frame(websocket: WebSocket, frame: Union[str, bytes]):
+    if isinstance(frame, bytes):
+        await websocket.send_bytes(frame)
+    else:
+        await websocket.send_text(frame)
+
+
+async def send(websocket: WebSocket, message: dict):
+    """Send a message to one client in the encoding it asked for."""
+    await _send_frame(websocket, encode(message, websocket.state.encoding))
+
 
-    data = json.dumps(message)
+async def _send_to_all(message: dict):
+    frames: Dict[str, Union[str, bytes]] = {}  # Encoded once per encoding in use
     disconnected = set()
 
-    for client in connected_clients:
+    for client in list(connected_clients):
+        encoding = client.state.encoding
+        frame = frames.get(encoding)
+        if frame is None:
+            frame = frames[encoding] = encode(message, encoding)
         try:
-            await client.send_text(data)
+            await _send_frame(client, frame)
         except Exception as e:
             logger.error(f"Error sending to client: {e}")
             disconnected.add(client)
@@ -34,102 +55,225 @@ async def broadcast(message: dict):
         connected_clients.discard(client)
 
 
+def _coalesce_key(message: dict) -> Optional[tuple]:
+    """Events that supersede an earlier one with the same key in the same batch."""
+    kind = message.get("type")
+    data = message.get("data") or {}
+    if kind in ("position", "node_status"):
+        return kind, data.get("node_id")
+    if kind == "telemetry":
+        return kind, data.get("node_id"), data.get("type")
+    if kind == "connection":
+        return kind, data.get("radio")  # Each radio's latest state
+    if kind == "broadcast_progress" and data.get("status") == "sending":
+        return kind, data.get("job_id")
+    return None
+
+
+class BroadcastBatcher:
+    """Packs the events of a short window into one frame per client.
+
+    The first event starts a ``ws_batch_window`` timer; everything broadcast
+    until it fires goes out together as ``{"type": "batch", "data": [...]}``
+    (a lone event is sent as-is). Within a window only the latest position,
+    telemetry (per type) and status of a node is kept, in the slot of the
+    first one. Messages, ACKs and other events are never dropped.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._pending: List[dict] = []
+        self._slots: Dict[tuple, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._events = 0
+        self._coalesced = 0
+        self._frames = 0
+
+    def add(self, message: dict):
+        self._events += 1
+        key = _coalesce_key(message)
+        if key is not None:
+            slot = self._slots.get(key)
+            if slot is not None:
+                self._pending[slot] = message
+                self._coalesced += 1
+                return
+            self._slots[key] = len(self._pending)
+        self._pending.append(message)
+
+        if len(self._pending) >= self.settings.ws_batch_max_events:
+            self._schedule(0)
+        elif self._task is None:
+            self._schedule(self.settings.ws_batch_window)
+
+    def _schedule(self, delay: float):
+        if self._task is not None and delay > 0:
+            return
+        if self._task is not None:
+            self._task.cancel()
+        self._task = asyncio.create_task(self._flush_after(delay))
+
+    async def _flush_after(self, delay: float):
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._task = None
+        messages = self._pending
+        self._pending = []
+        self._slots = {}
+        if not messages:
+            return
+        self._frames += 1
+        await _send_to_all(messages[0] if len(messages) == 1 else {"type": "batch", "data": messages})
+
+    def stats(self) -> dict:
+        return {
+            "window": self.settings.ws_batch_window,
+            "events": self._events,
+            "coalesced": self._coalesced,
+            "frames": self._frames,
+            "pending": len(self._pending)
+        }
+
+
+batcher = BroadcastBatcher()
+
+
+def _coalesce(messages: List[dict]) -> List[dict]:
+    """Drop events superseded later in the list, keeping the order of the rest."""
+    latest = {}
+    for i, message in enumerate(messages):
+        key = _coalesce_key(message)
+        if key is not None:
+            latest[key] = i
+    return [m for i, m in enumerate(messages) if latest.get(_coalesce_key(m), i) == i]
+
+
+async def broadcast(message: dict, stream_id: Optional[str] = None):
+    """Broadcast a message to all connected WebSocket clients.
+
+    Events are numbered for resuming clients; ``stream_id`` is given for
+    events already numbered by the ingest process.
+    """
+    if stream_id is None:
+        replay_buffer.stamp(message)
+    else:
+        replay_buffer.record(message, stream_id)
+    if event_bus.is_ingest:
+        await event_bus.publish(message, replay_buffer.stream_id)
+    if not connected_clients:
+        return
+    if batcher.settings.ws_batch_window > 0:
+        batcher.add(message)
+    else:
+        await _send_to_all(message)
+
+
 async def handle_meshtastic_event(event_type: str, data: dict):
-    """Handle events from the Meshtastic client and broadcast to WebSockets."""
-    from sqlalchemy import select, and_, desc
+    """Broadcast events from the radios and append them to the event log.
 
-    # Broadcast to connected clients
+    The messages, nodes, telemetry and positions tables are projected from
+    the log (see app.projections).
+    """
     await broadcast({"type": event_type, "data": data})
-
-    # Store incoming messages in database (with deduplication)
-    if event_type == "message":
-        async with async_session() as db:
-            try:
-                from_node = data.get("from_node_id")
-                to_node = data.get("to_node_id")
-                channel = data.get("channel", 0)
-                text = data.get("text", "")
-
-                # Check for duplicate message (same sender, recipient, text within last 30 seconds)
-                from datetime import datetime, timedelta
-                cutoff = datetime.utcnow() - timedelta(seconds=30)
-                existing = await db.execute(
-                    select(Message).where(and_(
-                        Message.from_node_id == from_node,
-                        Message.to_node_id == to_node,
-                        Message.text == text,
-                        Message.timestamp > cutoff
-                    )).limit(1)
-                )
-                if existing.scalar_one_or_none():
-                    logger.debug(f"Skipping duplicate message from {from_node}")
-                    return
-
-                msg = Message(
-                    from_node_id=from_node,
-                    to_node_id=to_node,
-                    channel=channel,
-                    text=text,
-                    is_outgoing=False
-                )
-                db.add(msg)
-                await db.commit()
-            except Exception as e:
-                logger.error(f"Error storing message: {e}")
-                await db.rollback()
-
-    # Handle ACK/NAK - update message in database
-    elif event_type == "ack":
-        async with async_session() as db:
-            try:
-                # Find the most recent outgoing message to this node with this text
-                to_node = data.get("to_node_id")
-                text = data.get("text")
-                success = data.get("success", True)
-                error = data.get("error")
-
-                if to_node and text:
-                    result = await db.execute(
-                        select(Message)
-                        .where(and_(
-                            Message.to_node_id == to_node,
-                            Message.text == text,
-                            Message.is_outgoing == True,
-                            Message.ack_received == False,
-                            Message.ack_failed == False
-                        ))
-                        .order_by(desc(Message.timestamp))
-                        .limit(1)
-                    )
-                    msg = result.scalar_one_or_none()
-                    if msg:
-                        if success:
-                            msg.ack_received = True
-                            logger.info(f"Marked message as ACK'd: {text[:30]}...")
-                        else:
-                            msg.ack_failed = True
-                            msg.ack_error = error
-                            logger.warning(f"Marked message as failed: {text[:30]}... ({error})")
-                        await db.commit()
-            except Exception as e:
-                logger.error(f"Error updating ACK status: {e}")
-                await db.rollback()
+    event_store.append(event_type, data)
 
 
 # Register the event handler
-meshtastic_client.add_event_callback(handle_meshtastic_event)
+client_manager.add_event_callback(handle_meshtastic_event)
+
+
+async def _resume(websocket: WebSocket):
+    """Send the ``resume`` frame and any missed events, up to the live stream.
+
+    Runs before the client joins ``connected_clients``. Events broadcast while
+    the replay is being sent are picked up by the next pass; the last check
+    and joining happen without yielding to the event loop, so nothing falls
+    in between. Events still waiting in the batcher may arrive again live;
+    clients skip sequence numbers they have already seen.
+    """
+    missed = None
+    stream_id = replay_buffer.stream_id
+    resume_from = websocket.query_params.get("resume_from")
+    if resume_from is not None:
+        try:
+            missed = replay_buffer.since(int(resume_from), websocket.query_params.get("stream"))
+        except ValueError:
+            pass
+    if missed:
+        missed = _coalesce(missed)
+
+    await send(websocket, {"type": "resume", "data": {
+        "stream": stream_id,
+        "seq": replay_buffer.seq,
+        "resumed": missed is not None,
+        "replayed": len(missed) if missed else 0
+    }})
+    if missed is None:
+        if resume_from is not None:
+            logger.info(f"WebSocket client can't resume from {resume_from}, needs a snapshot")
+        return
+
+    while missed:
+        for i in range(0, len(missed), REPLAY_CHUNK):
+            await send(websocket, {"type": "batch", "data": missed[i:i + REPLAY_CHUNK]})
+        missed = replay_buffer.since(missed[-1]["seq"], stream_id)
+        if missed is None:
+            # Numbering restarted mid-replay; the client will reconnect and reload
+            await websocket.close(code=1012, reason="Event stream restarted")
+            raise WebSocketDisconnect(1012)
+        missed = _coalesce(missed)
+    logger.info(f"WebSocket client resumed from {resume_from}")
+
+
+async def _radio_call(method: str, **kwargs):
+    """Call a client manager method, on the ingest process when running as an API worker.
+
+    Returns None if no radio is connected.
+    """
+    if event_bus.is_worker:
+        return await event_bus.call(method, **kwargs)
+    if REMOTE_CALLS[method] and not client_manager.connected:
+        return None
+    result = getattr(client_manager, method)(**kwargs)
+    return await result if inspect.isawaitable(result) else result
 
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time updates."""
+    """WebSocket endpoint for real-time updates.
+
+    Connect with ``?encoding=msgpack`` to receive binary MessagePack frames
+    (null fields omitted, known field names as integer keys; the key table is
+    sent in the first frame). Client-to-server messages are always JSON text.
+
+    Broadcast events carry ``seq``. A client reconnecting with
+    ``?resume_from=<seq>&stream=<id>`` is sent the events it missed before
+    live ones; the ``resume`` frame says whether that was possible or it has
+    to reload its state.
+    """
+    encoding = websocket.query_params.get("encoding", JSON)
+    if encoding not in ENCODINGS:
+        await websocket.close(code=1003, reason=f"Unsupported encoding '{encoding}'")
+        return
+    websocket.state.encoding = encoding
     await websocket.accept()
+    first_frame = hello(encoding)
+    if first_frame is not None:
+        await websocket.send_bytes(first_frame)
+    try:
+        await _resume(websocket)
+    except WebSocketDisconnect:
+        return
     connected_clients.add(websocket)
     logger.info(f"WebSocket client connected. Total: {len(connected_clients)}")
 
     # Send current connection status
-    status = meshtastic_client.get_connection_status()
-    await websocket.send_text(json.dumps({"type": "connection", "data": status}))
+    try:
+        status = await _radio_call("get_connection_status")
+    except RADIO_CALL_ERRORS as e:
+        logger.warning(f"Connection status unavailable: {e}")
+        status = client_manager.get_connection_status()  # Disconnected, as seen from this process
+    await send(websocket, {"type": "connection", "data": status})
 
     try:
         while True:
@@ -141,38 +285,49 @@ async def websocket_endpoint(websocket: WebSocket):
                 msg_type = msg.get("type")
 
                 if msg_type == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong"}))
+                    await send(websocket, {"type": "pong"})
 
                 elif msg_type == "send_message":
                     text = msg.get("text", "")
                     destination = msg.get("destination")
                     channel = msg.get("channel", 0)
 
-                    if meshtastic_client.connected:
-                        success = await meshtastic_client.send_message(text, destination, channel)
-                        await websocket.send_text(json.dumps({
+                    error = None
+                    try:
+                        success = await _radio_call("send_message", text=text, destination=destination,
+                                                    channel=channel)
+                    except (QueueFullError, *RADIO_CALL_ERRORS) as e:
+                        success = False
+                        error = str(e)
+                    if success is not None:
+                        await send(websocket, {
                             "type": "message_sent",
-                            "data": {"success": success, "text": text}
-                        }))
+                            "data": {"success": success, "text": text, "error": error}
+                        })
 
                 elif msg_type == "traceroute":
                     destination = msg.get("destination")
                     hop_limit = msg.get("hop_limit", 3)
                     channel = msg.get("channel", 0)
 
-                    if meshtastic_client.connected and destination:
-                        success = await meshtastic_client.send_traceroute(
-                            destination=destination,
-                            hop_limit=hop_limit,
-                            channel=channel
-                        )
-                        await websocket.send_text(json.dumps({
-                            "type": "traceroute_sent",
-                            "data": {
-                                "success": success,
-                                "destination": destination
-                            }
-                        }))
+                    if destination:
+                        try:
+                            success = await _radio_call(
+                                "send_traceroute",
+                                destination=destination,
+                                hop_limit=hop_limit,
+                                channel=channel
+                            )
+                        except RADIO_CALL_ERRORS:
+                            success = False
+                        if success is not None:
+                            await send(websocket, {
+                                "type": "traceroute_sent",
+                                "data": {
+                                    "success": success,
+                                    "destination": destination
+                                }
+                            })
 
             except json.JSONDecodeError:
                 pass
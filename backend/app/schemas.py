@@ -88,3 +88,36 @@ class ConnectionStatus(BaseModel):
 class WebSocketMessage(BaseModel):
     type: str  # "message", "node_update", "telemetry", "position", "connection"
     data: dict
+
+
+class AlertRuleCreate(BaseModel):
+    name: str
+    kind: str  # battery_below, channel_utilization_above, silent, geofence_enter, geofence_leave
+    node_id: Optional[str] = None  # None = every node
+    threshold: float  # Percent, minutes of silence, or geofence radius in meters
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    consecutive: int = 1
+    enabled: bool = True
+
+
+class AlertRuleResponse(AlertRuleCreate):
+    id: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class AlertResponse(BaseModel):
+    id: int
+    rule_id: int
+    node_id: str
+    kind: str
+    status: str
+    value: Optional[float] = None
+    message: str
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,319 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import uuid
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional
+from app.config import get_settings
+from app.executors import radio_executors
+
+logger = logging.getLogger(__name__)
+
+# Channel utilization / airtime thresholds (percent), see README "Telemetry Thresholds"
+CH_UTIL_THROTTLE_START = 25.0
+CH_UTIL_CONGESTED = 50.0
+AIR_UTIL_TX_ACCEPTABLE = 5.0
+AIR_UTIL_TX_LIMIT = 8.0
+
+# Telemetry older than this no longer drives pacing
+AIRTIME_STALE_SECONDS = 15 * 60
+
+
+class Priority(IntEnum):
+    """Outbound priority classes. Lower value is sent first."""
+    DM = 0
+    BROADCAST = 1
+    BULK = 2
+    TRACEROUTE = 3
+
+
+class QueueFullError(Exception):
+    """Raised when the outbound queue is at capacity."""
+
+
+class OutboundJob:
+    """A pending radio send."""
+
+    def __init__(self, fn: Callable[[], Any], priority: Priority, description: str,
+                 future: asyncio.Future, owner: Optional[str] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.fn = fn
+        self.priority = priority
+        self.description = description
+        self.owner = owner  # Radio the send goes out on
+        self.future = future
+        self.created = time.monotonic()
+        self.created_at = time.time()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.future.cancelled()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "priority": self.priority.name.lower(),
+            "description": self.description,
+            "radio": self.owner,
+            "queued_seconds": round(time.monotonic() - self.created, 2)
+        }
+
+
+class RadioPacer:
+    """Token bucket and airtime telemetry of one radio, plus its share of the queue.
+
+    Each radio transmits on its own channel, so one radio's traffic or
+    congestion never slows another.
+    """
+
+    def __init__(self, owner: Optional[str], burst: int):
+        self.owner = owner
+        self.heap: List[tuple] = []
+        self.wakeup = asyncio.Event()
+        self.worker: Optional[asyncio.Task] = None
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+
+        self.local_channel_util: Optional[float] = None
+        self.local_air_util_tx: Optional[float] = None
+        self.local_updated = 0.0
+        self.mesh_channel_util: Optional[float] = None  # EWMA across nodes this radio hears
+        self.mesh_updated = 0.0
+
+    def report_airtime(self, channel_utilization: Optional[float], air_util_tx: Optional[float],
+                       local: bool):
+        now = time.monotonic()
+        if local:
+            if channel_utilization is not None:
+                self.local_channel_util = float(channel_utilization)
+            if air_util_tx is not None:
+                self.local_air_util_tx = float(air_util_tx)
+            self.local_updated = now
+        elif channel_utilization is not None:
+            value = float(channel_utilization)
+            if self.mesh_channel_util is None or now - self.mesh_updated > AIRTIME_STALE_SECONDS:
+                self.mesh_channel_util = value
+            else:
+                self.mesh_channel_util += 0.2 * (value - self.mesh_channel_util)
+            self.mesh_updated = now
+
+    def airtime(self) -> tuple:
+        """Return (channel_utilization, air_util_tx) from fresh telemetry, else None."""
+        now = time.monotonic()
+        local_fresh = now - self.local_updated < AIRTIME_STALE_SECONDS
+        mesh_fresh = now - self.mesh_updated < AIRTIME_STALE_SECONDS
+
+        channel_util = self.local_channel_util if local_fresh else None
+        if channel_util is None and mesh_fresh:
+            channel_util = self.mesh_channel_util
+        air_util_tx = self.local_air_util_tx if local_fresh else None
+        return channel_util, air_util_tx
+
+    def rate(self, base: float, minimum: float) -> float:
+        """Messages per second allowed under this radio's channel conditions."""
+        minimum = min(minimum, base)
+        channel_util, air_util_tx = self.airtime()
+
+        factor = 1.0
+        if channel_util is not None and channel_util > CH_UTIL_THROTTLE_START:
+            span = CH_UTIL_CONGESTED - CH_UTIL_THROTTLE_START
+            factor *= max(0.0, 1.0 - (channel_util - CH_UTIL_THROTTLE_START) / span)
+        if air_util_tx is not None and air_util_tx > AIR_UTIL_TX_ACCEPTABLE:
+            span = AIR_UTIL_TX_LIMIT - AIR_UTIL_TX_ACCEPTABLE
+            factor *= max(0.0, 1.0 - (air_util_tx - AIR_UTIL_TX_ACCEPTABLE) / span)
+
+        return max(minimum, base * factor)
+
+
+class OutboundScheduler:
+    """Priority queues with token-bucket pacing driven by mesh airtime telemetry.
+
+    Each radio (the job's ``owner``) has its own queue, bucket and airtime
+    estimate (RadioPacer), drained one send at a time (the radio serializes
+    them anyway). A bucket refills at ``send_rate`` messages/second, scaled
+    down as the channel utilization that radio reports or hears and its own
+    air_util_tx rise past the Meshtastic throttling thresholds.
+    ``send_queue_size`` caps the pending sends of all radios together.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._pacers: Dict[Optional[str], RadioPacer] = {}
+        self._seq = itertools.count()
+        self._jobs: Dict[str, OutboundJob] = {}
+
+        # Metrics
+        self._submitted = 0
+        self._sent = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+
+    def _pacer(self, owner: Optional[str]) -> RadioPacer:
+        pacer = self._pacers.get(owner)
+        if pacer is None:
+            pacer = self._pacers[owner] = RadioPacer(owner, self.settings.send_burst)
+        return pacer
+
+    # ----- Airtime -----
+
+    def report_airtime(self, channel_utilization: Optional[float], air_util_tx: Optional[float],
+                       local: bool, owner: Optional[str] = None):
+        """Feed device-metrics telemetry heard by radio ``owner``. ``local`` is True for that radio's own."""
+        self._pacer(owner).report_airtime(channel_utilization, air_util_tx, local)
+
+    def current_rate(self, owner: Optional[str] = None) -> float:
+        """Messages per second allowed on radio ``owner`` under current channel conditions."""
+        return self._pacer(owner).rate(self.settings.send_rate, self.settings.send_min_rate)
+
+    # ----- Queue -----
+
+    @property
+    def depth(self) -> int:
+        return len(self._jobs)
+
+    def submit(self, fn: Callable[[], Any], priority: Priority, description: str = "",
+               owner: Optional[str] = None) -> OutboundJob:
+        """Queue a blocking send callable. Raises QueueFullError at capacity."""
+        if len(self._jobs) >= self.settings.send_queue_size:
+            self._rejected += 1
+            raise QueueFullError(f"Outbound queue full ({self.settings.send_queue_size} pending)")
+
+        loop = asyncio.get_event_loop()
+        pacer = self._pacer(owner)
+        self._ensure_worker(loop, pacer)
+
+        job = OutboundJob(fn, priority, description, loop.create_future(), owner)
+        self._jobs[job.id] = job
+        heapq.heappush(pacer.heap, (int(priority), next(self._seq), job))
+        self._submitted += 1
+        pacer.wakeup.set()
+        return job
+
+    async def run(self, fn: Callable[[], Any], priority: Priority, description: str = "",
+                  owner: Optional[str] = None) -> Any:
+        """Queue a send and wait for it to go out. Returns the callable's result."""
+        job = self.submit(fn, priority, description, owner)
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            self.cancel(job.id)
+            raise
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a pending job. Returns False if it is unknown or already sending."""
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return False
+        if not job.future.done():
+            job.future.cancel()
+        self._cancelled += 1
+        return True
+
+    def cancel_all(self, reason: str = "", owner: Optional[str] = None) -> int:
+        """Cancel every pending job, or only those for one radio (e.g. on disconnect)."""
+        job_ids = [job.id for job in self._jobs.values() if owner is None or job.owner == owner]
+        for job_id in job_ids:
+            self.cancel(job_id)
+        for pacer in self._pacers.values():
+            if owner is None or pacer.owner == owner:
+                pacer.heap.clear()
+        if job_ids:
+            logger.info(f"[SEND] Cancelled {len(job_ids)} pending sends{f' ({reason})' if reason else ''}")
+        return len(job_ids)
+
+    def pending(self) -> List[dict]:
+        jobs = sorted(self._jobs.values(), key=lambda j: (int(j.priority), j.created))
+        return [job.to_dict() for job in jobs]
+
+    def stats(self) -> dict:
+        depth_by_priority = {p.name.lower(): 0 for p in Priority}
+        depth_by_radio: Dict[Optional[str], int] = {}
+        for job in self._jobs.values():
+            depth_by_priority[job.priority.name.lower()] += 1
+            depth_by_radio[job.owner] = depth_by_radio.get(job.owner, 0) + 1
+
+        radios = {}
+        for owner, pacer in self._pacers.items():
+            channel_util, air_util_tx = pacer.airtime()
+            radios[owner or "default"] = {
+                "depth": depth_by_radio.get(owner, 0),
+                "rate_per_second": round(self.current_rate(owner), 3),
+                "tokens": round(pacer.tokens, 2),
+                "channel_utilization": channel_util,
+                "air_util_tx": air_util_tx
+            }
+
+        completed = self._sent + self._failed
+        return {
+            "depth": len(self._jobs),
+            "capacity": self.settings.send_queue_size,
+            "depth_by_priority": depth_by_priority,
+            "radios": radios,
+            "submitted": self._submitted,
+            "sent": self._sent,
+            "failed": self._failed,
+            "cancelled": self._cancelled,
+            "rejected": self._rejected,
+            "avg_wait_seconds": round(self._total_wait / completed, 3) if completed else 0.0
+        }
+
+    # ----- Workers -----
+
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop, pacer: RadioPacer):
+        if pacer.worker is None or pacer.worker.done():
+            pacer.worker = loop.create_task(self._worker(pacer))
+
+    def _pop_next(self, pacer: RadioPacer) -> Optional[OutboundJob]:
+        while pacer.heap:
+            _, _, job = heapq.heappop(pacer.heap)
+            if job.id in self._jobs and not job.cancelled:
+                return job
+        return None
+
+    async def _wait_for_token(self, pacer: RadioPacer):
+        burst = float(self.settings.send_burst)
+        while True:
+            now = time.monotonic()
+            rate = self.current_rate(pacer.owner)
+            pacer.tokens = min(burst, pacer.tokens + (now - pacer.last_refill) * rate)
+            pacer.last_refill = now
+            if pacer.tokens >= 1.0:
+                pacer.tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - pacer.tokens) / rate)
+
+    async def _worker(self, pacer: RadioPacer):
+        while True:
+            if not pacer.heap:
+                pacer.wakeup.clear()
+                await pacer.wakeup.wait()
+                continue
+
+            await self._wait_for_token(pacer)
+
+            job = self._pop_next(pacer)
+            if job is None:
+                # Everything left was cancelled while we waited; refund the token
+                pacer.tokens = min(float(self.settings.send_burst), pacer.tokens + 1.0)
+                continue
+
+            self._jobs.pop(job.id, None)
+            self._total_wait += time.monotonic() - job.created
+            try:
+                result = await radio_executors.send.run(job.fn)
+                self._sent += 1
+                if not job.future.done():
+                    job.future.set_result(result)
+            except Exception as e:
+                self._failed += 1
+                logger.error(f"[SEND] {job.description or job.id} failed: {e}")
+                if not job.future.done():
+                    job.future.set_exception(e)
+
+
+# Singleton instance
+send_scheduler = OutboundScheduler()
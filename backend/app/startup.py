@@ -0,0 +1,53 @@
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Wall-clock time spent in each startup phase (imports, router setup, DB, ...)."""
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._last_mark = self._origin
+        self.phases: "OrderedDict[str, float]" = OrderedDict()
+        self.ready_after: Optional[float] = None
+
+    def mark(self, name: str):
+        """Record the time since the previous mark as phase ``name``."""
+        now = time.perf_counter()
+        self.phases[name] = now - self._last_mark
+        self._last_mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+            self._last_mark = time.perf_counter()
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_after is not None
+
+    def mark_ready(self):
+        self.ready_after = time.perf_counter() - self._origin
+        logger.info("Startup: " + ", ".join(
+            f"{name}={seconds * 1000:.0f}ms" for name, seconds in self.phases.items()
+        ) + f" (ready after {self.ready_after * 1000:.0f}ms)")
+
+    def report(self) -> dict:
+        return {
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+            "ready": self.ready,
+            "ready_after_ms": round(self.ready_after * 1000, 1) if self.ready else None
+        }
+
+
+# Singleton instance
+startup_timer = StartupTimer()
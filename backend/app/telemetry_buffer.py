@@ -0,0 +1,165 @@
+import math
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from app.config import get_settings
+
+# Fields per telemetry type, matching the events emitted by _handle_telemetry.
+# Append new fields at the end: the position is part of the stored metric ID
+# (see app.telemetry_samples).
+TELEMETRY_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "device": ("battery_level", "voltage", "channel_utilization", "air_util_tx", "uptime_seconds"),
+    "environment": ("temperature", "relative_humidity", "barometric_pressure", "gas_resistance", "iaq",
+                    "distance", "lux", "white_lux", "ir_lux", "uv_lux", "wind_direction", "wind_speed",
+                    "weight"),
+    "air_quality": ("pm10", "pm25", "pm100", "pm10_env", "pm25_env", "pm100_env", "co2"),
+    "power": ("ch1_voltage", "ch1_current", "ch2_voltage", "ch2_current", "ch3_voltage", "ch3_current"),
+}
+
+
+class RingSeries:
+    """Fixed-capacity columnar ring buffer of samples for one node and type.
+
+    Timestamps and values are float64 (NaN for missing), one ``array`` per
+    field, so a sample costs 8 + 8 * fields bytes. Values are doubles so
+    integer metrics such as ``uptime_seconds`` stay exact past 2^24. Arrays
+    grow until ``capacity`` and are then overwritten in place.
+    """
+
+    __slots__ = ("fields", "capacity", "timestamps", "columns", "head", "complete_from")
+
+    def __init__(self, fields: Tuple[str, ...], capacity: int, complete_from: float = 0.0):
+        self.fields = fields
+        self.capacity = capacity
+        self.complete_from = complete_from  # Every sample since then is held, until full
+        self.timestamps = array("d")
+        self.columns = [array("d") for _ in fields]
+        self.head = 0  # Next slot to overwrite once full
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def full(self) -> bool:
+        return len(self.timestamps) >= self.capacity
+
+    def append(self, timestamp: float, values: dict):
+        if not self.full:
+            self.timestamps.append(timestamp)
+            for field, column in zip(self.fields, self.columns):
+                value = values.get(field)
+                column.append(float(value) if value is not None else math.nan)
+            return
+
+        i = self.head
+        self.timestamps[i] = timestamp
+        for field, column in zip(self.fields, self.columns):
+            value = values.get(field)
+            column[i] = float(value) if value is not None else math.nan
+        self.head = (i + 1) % self.capacity
+
+    def oldest(self) -> Optional[float]:
+        if not self.timestamps:
+            return None
+        return self.timestamps[self.head if self.full else 0]
+
+    def window(self, since: float) -> Tuple[List[float], Dict[str, List[Optional[float]]]]:
+        """Samples at or after ``since``, oldest first, as columns."""
+        n = len(self.timestamps)
+        order = range(self.head, self.head + n) if self.full else range(n)
+        indexes = [i % n for i in order if self.timestamps[i % n] >= since]
+        timestamps = [self.timestamps[i] for i in indexes]
+        columns = {}
+        for field, column in zip(self.fields, self.columns):
+            values = [column[i] for i in indexes]
+            columns[field] = [None if math.isnan(v) else round(v, 4) for v in values]
+        return timestamps, columns
+
+
+class TelemetryBuffers:
+    """Recent telemetry per node and type, kept in memory for chart windows.
+
+    Filled from the live telemetry events. Each (node, type) series holds the
+    last ``telemetry_buffer_size`` samples; at most ``telemetry_buffer_max_nodes``
+    nodes are kept (least recently updated evicted first). Only touched from
+    the event loop, so no locking is needed.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._series: "OrderedDict[str, Dict[str, RingSeries]]" = OrderedDict()
+        self._evicted: Set[str] = set()  # Nodes whose earlier samples were dropped
+        self._started = time.time()
+        self._samples = 0
+
+    def record(self, data: dict):
+        """Add a telemetry event payload."""
+        node_id = data.get("node_id")
+        kind = data.get("type")
+        fields = TELEMETRY_FIELDS.get(kind)
+        if not node_id or fields is None:
+            return
+
+        ts_ms = getattr(data, "ts_ms", None)  # Typed events (app.events) skip the ISO parse
+        if ts_ms is not None:
+            ts = ts_ms / 1000
+        else:
+            timestamp = data.get("timestamp")
+            try:
+                ts = datetime.fromisoformat(timestamp).timestamp() if timestamp else time.time()
+            except ValueError:
+                ts = time.time()
+
+        node_series = self._series.get(node_id)
+        if node_series is None:
+            node_series = self._series[node_id] = {}
+            while len(self._series) > self.settings.telemetry_buffer_max_nodes:
+                evicted, _ = self._series.popitem(last=False)
+                self._evicted.add(evicted)
+        else:
+            self._series.move_to_end(node_id)
+
+        series = node_series.get(kind)
+        if series is None:
+            # A new series holds everything since startup, unless the node was evicted before
+            complete_from = min(ts, time.time()) if node_id in self._evicted else self._started
+            series = node_series[kind] = RingSeries(fields, self.settings.telemetry_buffer_size, complete_from)
+        series.append(ts, data)
+        self._samples += 1
+
+    def horizon(self, node_id: str, kind: str) -> float:
+        """Earliest time the buffer is complete from. Older data must come from the DB."""
+        series = self._series.get(node_id, {}).get(kind)
+        if series is None:
+            # Nothing buffered (never heard, or evicted): the whole window is in the DB
+            return time.time()
+        if series.full:
+            return series.oldest()
+        return series.complete_from
+
+    def query(self, node_id: str, kind: str, since: float) -> Tuple[List[float], Dict[str, List[Optional[float]]]]:
+        series = self._series.get(node_id, {}).get(kind)
+        if series is None:
+            return [], {field: [] for field in TELEMETRY_FIELDS[kind]}
+        return series.window(since)
+
+    def stats(self) -> dict:
+        series = [s for node in self._series.values() for s in node.values()]
+        return {
+            "nodes": len(self._series),
+            "series": len(series),
+            "samples_buffered": sum(len(s) for s in series),
+            "samples_recorded": self._samples,
+            "bytes": sum(
+                s.timestamps.buffer_info()[1] * s.timestamps.itemsize
+                + sum(c.buffer_info()[1] * c.itemsize for c in s.columns)
+                for s in series
+            ),
+            "capacity_per_series": self.settings.telemetry_buffer_size
+        }
+
+
+# Singleton instance
+telemetry_buffers = TelemetryBuffers()
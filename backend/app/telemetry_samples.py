@@ -0,0 +1,76 @@
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import TelemetrySample
+from app.telemetry_buffer import TELEMETRY_FIELDS
+
+# First metric ID of each telemetry type. A field's ID is its base plus its
+# position in TELEMETRY_FIELDS, so fields must only ever be appended there.
+METRIC_BASE: Dict[str, int] = {"device": 0, "environment": 100, "air_quality": 200, "power": 300}
+METRIC_IDS: Dict[Tuple[str, str], int] = {
+    (kind, field): METRIC_BASE[kind] + i
+    for kind, fields in TELEMETRY_FIELDS.items()
+    for i, field in enumerate(fields)
+}
+METRIC_NAMES: Dict[int, Tuple[str, str]] = {metric: key for key, metric in METRIC_IDS.items()}
+
+
+def sample_rows(node_id: str, kind: str, timestamp: datetime, data: dict) -> List[dict]:
+    """``telemetry_samples`` rows for the metrics present in a telemetry event payload."""
+    rows = []
+    for field in TELEMETRY_FIELDS.get(kind, ()):
+        value = data.get(field)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or math.isnan(value):
+            continue
+        rows.append({
+            "node_id": node_id,
+            "metric": METRIC_IDS[(kind, field)],
+            "timestamp": timestamp,
+            "value": float(value)
+        })
+    return rows
+
+
+async def query_series(db: AsyncSession, node_id: str, kind: str, fields: Sequence[str],
+                       start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       limit: Optional[int] = None) -> Tuple[List[float], Dict[str, List[Optional[float]]]]:
+    """Stored readings of ``fields`` in [start, end) as columns, oldest first.
+
+    With ``limit``, only the newest ``limit`` timestamps are returned.
+    Timestamps are Unix seconds, like TelemetryBuffers.query.
+    """
+    metrics = {METRIC_IDS[(kind, field)]: field for field in fields}
+    conditions = [TelemetrySample.node_id == node_id, TelemetrySample.metric.in_(metrics)]
+    if start:
+        conditions.append(TelemetrySample.timestamp >= start)
+    if end:
+        conditions.append(TelemetrySample.timestamp < end)
+
+    if limit:
+        # Oldest of the newest ``limit`` timestamps, so no sample is cut in half
+        result = await db.execute(
+            select(TelemetrySample.timestamp).where(*conditions).distinct()
+            .order_by(desc(TelemetrySample.timestamp)).offset(limit - 1).limit(1)
+        )
+        cutoff = result.scalar_one_or_none()
+        if cutoff is not None:
+            conditions.append(TelemetrySample.timestamp >= cutoff)
+
+    result = await db.execute(
+        select(TelemetrySample.timestamp, TelemetrySample.metric, TelemetrySample.value)
+        .where(*conditions)
+        .order_by(TelemetrySample.timestamp)
+    )
+    timestamps: List[float] = []
+    values: Dict[str, List[Optional[float]]] = {field: [] for field in fields}
+    last = None
+    for timestamp, metric, value in result:
+        if timestamp != last:
+            last = timestamp
+            timestamps.append(timestamp.timestamp())
+            for column in values.values():
+                column.append(None)
+        values[metrics[metric]][-1] = round(value, 4)
+    return timestamps, values
@@ -0,0 +1,381 @@
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, delete, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from app.config import get_settings
+from app.database import async_session
+from app.models import TopologyEdge
+
+logger = logging.getLogger(__name__)
+
+# Traceroute SNRs are int8 in quarter-dB; this value means "not measured"
+TRACEROUTE_SNR_UNKNOWN = -128
+
+# Rows per upsert statement (asyncpg caps bind parameters at 32767)
+FLUSH_CHUNK = 1000
+
+
+class Edge:
+    """A directed link: ``src`` was heard by ``dst`` at ``snr`` dB."""
+
+    __slots__ = ("src", "dst", "snr", "source", "last_seen")
+
+    def __init__(self, src: str, dst: str, snr: Optional[float], source: str, last_seen: float):
+        self.src = src
+        self.dst = dst
+        self.snr = snr
+        self.source = source
+        self.last_seen = last_seen
+
+    def to_dict(self) -> dict:
+        return {
+            "from": self.src,
+            "to": self.dst,
+            "snr": self.snr,
+            "source": self.source,
+            "last_seen": datetime.fromtimestamp(self.last_seen).isoformat()
+        }
+
+
+def link_cost(snr: Optional[float]) -> float:
+    """Path weight of one hop. Every hop costs 1; weak links cost up to 1 more."""
+    if snr is None:
+        return 1.5
+    # 10 dB or better is a clean link, -20 dB is about the LoRa floor
+    return 1.0 + min(1.0, max(0.0, (10.0 - snr) / 30.0))
+
+
+def _valid_node(node_id) -> bool:
+    return isinstance(node_id, str) and node_id.startswith("!") and node_id != "!ffffffff"
+
+
+class TopologyGraph:
+    """Mesh topology built incrementally from neighborinfo and traceroute packets.
+
+    Edges are directed (transmitter -> receiver) and carry the SNR measured by
+    the receiver, when they were last seen and which packet type reported them.
+    Edges not re-seen within ``topology_edge_ttl`` are dropped.
+
+    Changed edges are written to the database in batches every
+    ``topology_flush_interval``. Reachability and path results are cached; each
+    cached result remembers the nodes it expanded, and is invalidated only when
+    an outgoing edge of one of those nodes is added, removed or changes SNR.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        # Updated from the radios' ingest threads, queried from the event loop
+        self._lock = threading.RLock()
+        self._out: Dict[str, Dict[str, Edge]] = {}
+        self._in: Dict[str, Dict[str, Edge]] = {}
+        self._dirty: Set[Tuple[str, str]] = set()
+        self._removed: Set[Tuple[str, str]] = set()
+        self._cache: "OrderedDict[tuple, Tuple[object, Set[str]]]" = OrderedDict()
+        self._cache_deps: Dict[str, Set[tuple]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._flush_task: Optional[asyncio.Task] = None
+
+    # ----- Updates -----
+
+    def update_edge(self, src: str, dst: str, snr: Optional[float], source: str,
+                    seen: Optional[float] = None):
+        if not _valid_node(src) or not _valid_node(dst) or src == dst:
+            return
+        seen = seen or time.time()
+        with self._lock:
+            edge = self._out.get(src, {}).get(dst)
+            if edge is None:
+                edge = Edge(src, dst, snr, source, seen)
+                self._out.setdefault(src, {})[dst] = edge
+                self._in.setdefault(dst, {})[src] = edge
+                self._invalidate(src)
+            else:
+                if snr is not None and snr != edge.snr:
+                    edge.snr = snr
+                    self._invalidate(src)
+                edge.source = source
+                edge.last_seen = max(edge.last_seen, seen)
+            self._dirty.add((src, dst))
+            self._removed.discard((src, dst))
+
+    def record_neighborinfo(self, reporter: str, neighbors: List[dict]):
+        """``reporter`` heard each neighbor at the given SNR."""
+        for neighbor in neighbors:
+            self.update_edge(neighbor.get("node_id"), reporter, neighbor.get("snr"), "neighborinfo")
+
+    def record_traceroute(self, result: dict):
+        """Add the hops of a traceroute response (as emitted by the client)."""
+        origin = result.get("to_node_id")
+        destination = result.get("from_node_id")
+
+        def add_path(path: List[str], snrs: List[int]):
+            for i in range(len(path) - 1):
+                raw = snrs[i] if i < len(snrs) else TRACEROUTE_SNR_UNKNOWN
+                snr = None if raw == TRACEROUTE_SNR_UNKNOWN else raw / 4.0
+                self.update_edge(path[i], path[i + 1], snr, "traceroute")
+
+        add_path([origin] + list(result.get("route") or []) + [destination],
+                 list(result.get("snr_towards") or []))
+
+        # Firmware before 2.5 doesn't report the return path
+        snr_back = list(result.get("snr_back") or [])
+        if snr_back:
+            add_path([destination] + list(result.get("route_back") or []) + [origin], snr_back)
+
+    def expire(self) -> int:
+        """Drop edges not seen within the TTL. Returns the number removed."""
+        cutoff = time.time() - self.settings.topology_edge_ttl
+        with self._lock:
+            stale = [
+                edge for edges in self._out.values() for edge in edges.values()
+                if edge.last_seen < cutoff
+            ]
+            for edge in stale:
+                self._remove(edge)
+        if stale:
+            logger.info(f"[TOPO] Expired {len(stale)} edges")
+        return len(stale)
+
+    def _remove(self, edge: Edge):
+        out = self._out.get(edge.src, {})
+        out.pop(edge.dst, None)
+        if not out:
+            self._out.pop(edge.src, None)
+        incoming = self._in.get(edge.dst, {})
+        incoming.pop(edge.src, None)
+        if not incoming:
+            self._in.pop(edge.dst, None)
+        self._dirty.discard((edge.src, edge.dst))
+        self._removed.add((edge.src, edge.dst))
+        self._invalidate(edge.src)
+
+    # ----- Query cache -----
+
+    def _invalidate(self, node: str):
+        for key in self._cache_deps.pop(node, ()):
+            entry = self._cache.pop(key, None)
+            if entry is None:
+                continue
+            self._invalidations += 1
+            for dep in entry[1]:
+                if dep != node:
+                    self._cache_deps.get(dep, set()).discard(key)
+
+    def _cached(self, key: tuple, compute: Callable[[], Tuple[object, Set[str]]]):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._hits += 1
+                self._cache.move_to_end(key)
+                return entry[0]
+
+            self._misses += 1
+            result, deps = compute()
+            self._cache[key] = (result, deps)
+            for dep in deps:
+                self._cache_deps.setdefault(dep, set()).add(key)
+
+            while len(self._cache) > self.settings.topology_cache_size:
+                old_key, (_, old_deps) = self._cache.popitem(last=False)
+                for dep in old_deps:
+                    self._cache_deps.get(dep, set()).discard(old_key)
+            return result
+
+    # ----- Queries -----
+
+    def neighbors(self, node: str) -> dict:
+        """Nodes ``node`` hears and nodes that hear it."""
+        with self._lock:
+            return {
+                "node_id": node,
+                "hears": [edge.to_dict() for edge in self._in.get(node, {}).values()],
+                "heard_by": [edge.to_dict() for edge in self._out.get(node, {}).values()]
+            }
+
+    def reachable(self, node: str, max_hops: int) -> List[dict]:
+        """Nodes reachable from ``node`` within ``max_hops`` along known links."""
+        def compute():
+            hops = {node: 0}
+            expanded = set()
+            queue = deque([node])
+            while queue:
+                current = queue.popleft()
+                if hops[current] >= max_hops:
+                    continue
+                expanded.add(current)
+                for nxt in self._out.get(current, {}):
+                    if nxt not in hops:
+                        hops[nxt] = hops[current] + 1
+                        queue.append(nxt)
+            result = [
+                {"node_id": n, "hops": h}
+                for n, h in sorted(hops.items(), key=lambda item: (item[1], item[0]))
+                if n != node
+            ]
+            return result, expanded
+
+        return self._cached(("reachable", node, max_hops), compute)
+
+    def best_path(self, source: str, target: str) -> Optional[dict]:
+        """Lowest-cost path from ``source`` to ``target`` (see ``link_cost``)."""
+        def compute():
+            dist = {source: 0.0}
+            prev: Dict[str, str] = {}
+            expanded = set()
+            heap = [(0.0, source)]
+            while heap:
+                cost, current = heapq.heappop(heap)
+                if current in expanded:
+                    continue
+                expanded.add(current)
+                if current == target:
+                    break
+                for nxt, edge in self._out.get(current, {}).items():
+                    new_cost = cost + link_cost(edge.snr)
+                    if new_cost < dist.get(nxt, float("inf")):
+                        dist[nxt] = new_cost
+                        prev[nxt] = current
+                        heapq.heappush(heap, (new_cost, nxt))
+
+            if target not in expanded:
+                return None, expanded
+
+            path = [target]
+            while path[-1] != source:
+                path.append(prev[path[-1]])
+            path.reverse()
+            links = [
+                {"from": a, "to": b, "snr": self._out[a][b].snr}
+                for a, b in zip(path, path[1:])
+            ]
+            return {
+                "path": path,
+                "hops": len(path) - 1,
+                "cost": round(dist[target], 3),
+                "links": links
+            }, expanded
+
+        return self._cached(("path", source, target), compute)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            edges = [edge.to_dict() for out in self._out.values() for edge in out.values()]
+            nodes = sorted(set(self._out) | set(self._in))
+        return {"nodes": nodes, "edges": edges}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "nodes": len(set(self._out) | set(self._in)),
+                "edges": sum(len(out) for out in self._out.values()),
+                "pending_writes": len(self._dirty) + len(self._removed),
+                "cache_entries": len(self._cache),
+                "cache_hits": self._hits,
+                "cache_misses": self._misses,
+                "cache_invalidations": self._invalidations
+            }
+
+    # ----- Persistence -----
+
+    async def load(self):
+        """Load unexpired edges from the database."""
+        cutoff = datetime.fromtimestamp(time.time() - self.settings.topology_edge_ttl)
+        try:
+            async with async_session() as db:
+                result = await db.execute(select(TopologyEdge).where(TopologyEdge.last_seen >= cutoff))
+                rows = result.scalars().all()
+        except Exception as e:
+            logger.warning(f"[TOPO] Could not load topology: {e}")
+            return
+
+        with self._lock:
+            for row in rows:
+                edge = Edge(row.from_node_id, row.to_node_id, row.snr, row.source, row.last_seen.timestamp())
+                self._out.setdefault(edge.src, {})[edge.dst] = edge
+                self._in.setdefault(edge.dst, {})[edge.src] = edge
+            self._cache.clear()
+            self._cache_deps.clear()
+        logger.info(f"[TOPO] Loaded {len(rows)} edges")
+
+    async def flush(self):
+        """Write changed and expired edges to the database."""
+        with self._lock:
+            rows = []
+            for src, dst in self._dirty:
+                edge = self._out.get(src, {}).get(dst)
+                if edge is not None:
+                    rows.append({
+                        "from_node_id": src,
+                        "to_node_id": dst,
+                        "snr": edge.snr,
+                        "source": edge.source,
+                        "last_seen": datetime.fromtimestamp(edge.last_seen)
+                    })
+            removed = list(self._removed)
+            dirty = self._dirty
+            self._dirty = set()
+            self._removed = set()
+
+        if not rows and not removed:
+            return
+
+        try:
+            async with async_session() as db:
+                for i in range(0, len(rows), FLUSH_CHUNK):
+                    stmt = insert(TopologyEdge).values(rows[i:i + FLUSH_CHUNK])
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[TopologyEdge.from_node_id, TopologyEdge.to_node_id],
+                        set_={
+                            "snr": stmt.excluded.snr,
+                            "source": stmt.excluded.source,
+                            "last_seen": stmt.excluded.last_seen
+                        }
+                    )
+                    await db.execute(stmt)
+                for i in range(0, len(removed), FLUSH_CHUNK):
+                    await db.execute(delete(TopologyEdge).where(
+                        tuple_(TopologyEdge.from_node_id, TopologyEdge.to_node_id).in_(removed[i:i + FLUSH_CHUNK])
+                    ))
+                await db.commit()
+            logger.debug(f"[TOPO] Flushed {len(rows)} edges, deleted {len(removed)}")
+        except Exception as e:
+            logger.warning(f"[TOPO] Failed to persist topology: {e}")
+            # Retry on the next flush, unless the edge changed state meanwhile
+            with self._lock:
+                self._dirty |= {key for key in dirty if key not in self._removed}
+                self._removed |= {key for key in removed if key not in self._dirty}
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.settings.topology_flush_interval)
+            try:
+                self.expire()
+                await self.flush()
+            except Exception as e:
+                logger.error(f"[TOPO] Flush loop error: {e}")
+
+    def start(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+
+# Singleton instance
+topology = TopologyGraph()
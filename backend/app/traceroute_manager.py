@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.events import TracerouteErrorEvent
+
+logger = logging.getLogger(__name__)
+
+
+class TracerouteError(Exception):
+    """Raised when a traceroute fails or times out. ``code`` is e.g. TIMEOUT or NO_ROUTE."""
+
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
+
+
+def normalize_node_id(destination) -> str:
+    """Return the canonical "!xxxxxxxx" form for an int or hex/decimal string id."""
+    if isinstance(destination, str) and destination.startswith("!"):
+        return f"!{int(destination[1:], 16):08x}"
+    return f"!{int(destination):08x}"
+
+
+class TracerouteManager:
+    """Coordinates traceroutes so they can't starve the radio or each other.
+
+    - At most ``traceroute_concurrency`` traceroutes are outstanding at once.
+    - Duplicate requests to a destination that is already in flight share the
+      same result instead of putting another packet on the air.
+    - Responses are awaited on an asyncio future resolved from the response
+      callback, so no thread is parked in ``waitForTraceRoute``.
+    - Successful routes are cached per destination for ``traceroute_cache_ttl``.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._inflight_clients: Dict[str, object] = {}
+        self._cache: Dict[str, Tuple[float, dict]] = {}
+        self._coalesced = 0
+        self._completed = 0
+        self._failed = 0
+
+    # ----- Cache -----
+
+    def record(self, destination: str, result: dict):
+        """Cache a route. Also called for unsolicited traceroute responses."""
+        self._cache[destination] = (time.monotonic() + self.settings.traceroute_cache_ttl, result)
+
+    def get_cached(self, destination: str) -> Optional[dict]:
+        entry = self._cache.get(destination)
+        if entry is None:
+            return None
+        expires, result = entry
+        if time.monotonic() >= expires:
+            del self._cache[destination]
+            return None
+        return result
+
+    def cached(self) -> List[dict]:
+        """All unexpired cached routes."""
+        now = time.monotonic()
+        expired = [dest for dest, (expires, _) in self._cache.items() if now >= expires]
+        for dest in expired:
+            del self._cache[dest]
+        return [
+            {**result, "destination": dest, "expires_in": round(expires - now, 1)}
+            for dest, (expires, result) in self._cache.items()
+        ]
+
+    # ----- Requests -----
+
+    def in_flight(self, destination: str) -> bool:
+        task = self._inflight.get(destination)
+        return task is not None and not task.done()
+
+    def start(self, client, destination: str, hop_limit: int, channel: int) -> Tuple[asyncio.Task, bool]:
+        """Start (or join) a traceroute. Returns (task, coalesced).
+
+        Results and errors are also emitted as traceroute/traceroute_error events.
+        """
+        task = self._inflight.get(destination)
+        if task is not None and not task.done():
+            self._coalesced += 1
+            logger.info(f"Traceroute to {destination} already in flight, coalescing")
+            return task, True
+
+        task = asyncio.create_task(self._run(client, destination, hop_limit, channel))
+        self._inflight[destination] = task
+        self._inflight_clients[destination] = client
+
+        def done(t: asyncio.Task):
+            if self._inflight.get(destination) is t:
+                del self._inflight[destination]
+                self._inflight_clients.pop(destination, None)
+            if not t.cancelled():
+                t.exception()  # Mark retrieved; errors are reported via events
+
+        task.add_done_callback(done)
+        return task, False
+
+    async def _run(self, client, destination: str, hop_limit: int, channel: int) -> dict:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, self.settings.traceroute_concurrency))
+
+        async with self._semaphore:
+            loop = asyncio.get_event_loop()
+            future = loop.create_future()
+
+            def on_result(result: dict):
+                # Called from the radio's reader thread
+                def resolve():
+                    if not future.done():
+                        future.set_result(result)
+                loop.call_soon_threadsafe(resolve)
+
+            try:
+                await client.send_traceroute_packet(destination, hop_limit, channel, on_result)
+
+                # Same budget the library's waitForTraceRoute would use
+                nodes = client.nodes or {}
+                wait_factor = max(1, min(len(nodes) - 1, hop_limit))
+                timeout = self.settings.traceroute_timeout_per_hop * wait_factor
+
+                try:
+                    result = await asyncio.wait_for(future, timeout=timeout)
+                except asyncio.TimeoutError:
+                    raise TracerouteError("TIMEOUT")
+
+                if result.get("error"):
+                    raise TracerouteError(result["error"])
+
+                self.record(destination, result)
+                self._completed += 1
+                logger.info(f"Traceroute to {destination} completed")
+                return result
+
+            except TracerouteError as e:
+                self._failed += 1
+                if e.code == "TIMEOUT":
+                    logger.warning(f"Traceroute to {destination} timed out")
+                    # Routing errors were already emitted by the response handler
+                    client._schedule_event("traceroute_error", TracerouteErrorEvent(destination, "TIMEOUT"))
+                raise
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed += 1
+                logger.error(f"Traceroute to {destination} failed: {e}")
+                client._schedule_event("traceroute_error", TracerouteErrorEvent(destination, str(e)))
+                raise
+
+    def cancel_all(self, client=None):
+        """Cancel in-flight traceroutes, or only those sent through ``client``."""
+        for destination, task in list(self._inflight.items()):
+            if client is None or self._inflight_clients.get(destination) is client:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": sorted(d for d in self._inflight if self.in_flight(d)),
+            "concurrency": self.settings.traceroute_concurrency,
+            "cached": len(self._cache),
+            "completed": self._completed,
+            "failed": self._failed,
+            "coalesced": self._coalesced
+        }
+
+
+# Singleton instance
+traceroute_manager = TracerouteManager()
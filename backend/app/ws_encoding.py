@@ -0,0 +1,149 @@
+import json
+import struct
+from typing import Dict, List, Optional, Union
+from app.telemetry_buffer import TELEMETRY_FIELDS
+
+# Encodings a WebSocket client can ask for with ?encoding=...
+JSON = "json"
+MSGPACK = "msgpack"
+ENCODINGS = (JSON, MSGPACK)
+
+# Field names sent as small integer keys in binary frames. The table is sent
+# to each binary client when it connects, so it can be extended freely.
+FIELD_KEYS: List[str] = list(dict.fromkeys([
+    "type", "data", "node_id", "from_node_id", "to_node_id", "channel", "text", "timestamp", "radio",
+    "id", "long_name", "short_name", "hw_model", "latitude", "longitude", "altitude",
+    *(field for fields in TELEMETRY_FIELDS.values() for field in fields),
+    "success", "error", "route", "route_back", "snr_towards", "snr_back", "neighbors", "snr",
+    "status", "previous", "last_heard", "counts", "connected", "request_id", "error_reason",
+    "portnum", "decoded", "rx_time", "rx_snr", "rx_rssi", "hop_limit", "hop_start",
+    "job_id", "sent", "failed", "total", "current", "current_node", "current_node_id",
+    "seq", "stream", "resumed", "replayed",
+    "rule_id", "rule", "kind", "value", "message",
+]))
+KEY_INDEX: Dict[str, int] = {name: i for i, name in enumerate(FIELD_KEYS)}
+
+
+def _pack(obj, out: bytearray, short_keys: bool):
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xff)
+        elif 0 <= obj <= 0xffffffff:
+            out += struct.pack(">BI", 0xce, obj) if obj > 0xffff else \
+                struct.pack(">BH", 0xcd, obj) if obj > 0xff else struct.pack(">BB", 0xcc, obj)
+        elif -0x80000000 <= obj < 0:
+            out += struct.pack(">Bi", 0xd2, obj) if obj < -0x8000 else \
+                struct.pack(">Bh", 0xd1, obj) if obj < -0x80 else struct.pack(">Bb", 0xd0, obj)
+        elif obj > 0:
+            out += struct.pack(">BQ", 0xcf, obj)
+        else:
+            out += struct.pack(">Bq", 0xd3, obj)
+    elif isinstance(obj, float):
+        # Radio metrics are float32 on the wire; keep them at 4 bytes when exact
+        single = struct.pack(">f", obj) if abs(obj) < 3.4e38 else None
+        if single is not None and struct.unpack(">f", single)[0] == obj:
+            out.append(0xca)
+            out += single
+        else:
+            out += struct.pack(">Bd", 0xcb, obj)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        n = len(data)
+        if n < 32:
+            out.append(0xa0 | n)
+        elif n <= 0xff:
+            out += struct.pack(">BB", 0xd9, n)
+        elif n <= 0xffff:
+            out += struct.pack(">BH", 0xda, n)
+        else:
+            out += struct.pack(">BI", 0xdb, n)
+        out += data
+    elif isinstance(obj, (bytes, bytearray)):
+        n = len(obj)
+        out += struct.pack(">BB", 0xc4, n) if n <= 0xff else \
+            struct.pack(">BH", 0xc5, n) if n <= 0xffff else struct.pack(">BI", 0xc6, n)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        out += bytes([0x90 | n]) if n < 16 else \
+            struct.pack(">BH", 0xdc, n) if n <= 0xffff else struct.pack(">BI", 0xdd, n)
+        for item in obj:
+            _pack(item, out, short_keys)
+    elif isinstance(obj, dict):
+        items = [(k, v) for k, v in obj.items() if v is not None]
+        n = len(items)
+        out += bytes([0x80 | n]) if n < 16 else \
+            struct.pack(">BH", 0xde, n) if n <= 0xffff else struct.pack(">BI", 0xdf, n)
+        for key, value in items:
+            index = KEY_INDEX.get(key) if short_keys else None
+            _pack(index if index is not None else str(key), out, short_keys)
+            _pack(value, out, short_keys)
+    elif short_keys and hasattr(obj, "to_msgpack"):
+        out += obj.to_msgpack()  # Typed event, encoded once (app.events)
+    elif hasattr(obj, "to_dict"):
+        _pack(obj.to_dict(), out, short_keys)
+    else:
+        _pack(str(obj), out, short_keys)
+
+
+def packb(obj, short_keys: bool = True) -> bytes:
+    """MessagePack encoding of ``obj`` with null map values dropped.
+
+    With ``short_keys``, map keys listed in FIELD_KEYS are sent as their
+    index. Implemented here to avoid a dependency for the few types events use.
+    """
+    out = bytearray()
+    _pack(obj, out, short_keys)
+    return bytes(out)
+
+
+# Keys whose values may hold typed events, see dumps()
+_NESTED_KEYS = ("data", "message")
+
+
+def json_default(obj):
+    """``json.dumps`` fallback: typed events as their payload, anything else as a string."""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    return str(obj)
+
+
+def dumps(obj) -> str:
+    """JSON text of a message, splicing in the cached encoding of typed events.
+
+    Follows ``"data"`` (and the event bus' ``"message"``) through messages and
+    batch lists; everything else goes through ``json.dumps``.
+    """
+    if hasattr(obj, "to_json"):
+        return obj.to_json()
+    if isinstance(obj, list):
+        return "[" + ", ".join(dumps(item) for item in obj) + "]"
+    if isinstance(obj, dict):
+        nested = [key for key in _NESTED_KEYS if key in obj]
+        if nested:
+            head = json.dumps({k: v for k, v in obj.items() if k not in nested}, default=json_default)
+            tail = ", ".join(f'"{key}": {dumps(obj[key])}' for key in nested)
+            return f'{head[:-1]}{", " if len(head) > 2 else ""}{tail}}}'
+    return json.dumps(obj, default=json_default)
+
+
+def encode(message: dict, encoding: str) -> Union[str, bytes]:
+    """One frame: text for JSON, bytes for binary encodings."""
+    if encoding == MSGPACK:
+        return packb(message)
+    return dumps(message)
+
+
+def hello(encoding: str) -> Optional[bytes]:
+    """First frame sent to a binary client, carrying the key table."""
+    if encoding == MSGPACK:
+        return packb({"type": "encoding", "data": {"encoding": encoding, "keys": FIELD_KEYS}}, short_keys=False)
+    return None
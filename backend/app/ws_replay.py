@@ -0,0 +1,70 @@
+import secrets
+from collections import deque
+from typing import Deque, List, Optional
+from app.config import get_settings
+
+
+class ReplayBuffer:
+    """Recent broadcast events, numbered so a client can resume after a drop.
+
+    Every event gets ``seq``, one more than the previous. The last
+    ``ws_replay_size`` are kept; a client that reconnects with
+    ``resume_from=<seq>`` gets the ones after it, or a snapshot is needed if
+    they are no longer here. ``stream_id`` changes whenever numbering starts
+    over, so sequence numbers from before a restart are never mistaken for
+    current ones.
+
+    In the ingest and all-in-one roles events are numbered here. Workers
+    record the numbers and stream assigned by the ingest process, so a client
+    can resume on any worker.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._events: Deque[dict] = deque(maxlen=self.settings.ws_replay_size)
+        self.stream_id = secrets.token_hex(6)
+        self.seq = 0
+
+    def stamp(self, message: dict) -> dict:
+        """Number a locally produced event and keep it."""
+        self.seq += 1
+        message["seq"] = self.seq
+        self._events.append(message)
+        return message
+
+    def record(self, message: dict, stream_id: Optional[str]):
+        """Keep an event numbered by the ingest process."""
+        seq = message.get("seq")
+        if seq is None:
+            return
+        if stream_id != self.stream_id or seq != self.seq + 1:
+            # Ingest restarted, or this worker missed events while disconnected:
+            # what is kept no longer leads up to this event
+            self._events.clear()
+            self.stream_id = stream_id or secrets.token_hex(6)
+        self.seq = seq
+        self._events.append(message)
+
+    def since(self, seq: int, stream_id: Optional[str] = None) -> Optional[List[dict]]:
+        """Events after ``seq``, or None if they can't all be replayed."""
+        if stream_id is not None and stream_id != self.stream_id:
+            return None
+        if seq > self.seq:
+            return None
+        if seq == self.seq:
+            return []
+        if not self._events or seq < self._events[0]["seq"] - 1:
+            return None
+        return [m for m in self._events if m["seq"] > seq]
+
+    def stats(self) -> dict:
+        return {
+            "stream": self.stream_id,
+            "seq": self.seq,
+            "buffered": len(self._events),
+            "oldest": self._events[0]["seq"] if self._events else None
+        }
+
+
+# Singleton instance
+replay_buffer = ReplayBuffer()
@@ -0,0 +1,102 @@
+"""Alert engine: debounced thresholds, geofences and the silence heap."""
+import time
+
+from app.alerts import AlertEngine, Rule, FIRING, RESOLVED
+
+
+def _drain(engine: AlertEngine):
+    alerts, engine._outbox = engine._outbox, []
+    return [(alert["node_id"], alert["status"]) for alert in alerts]
+
+
+def test_threshold_fires_and_clears_after_consecutive_readings():
+    engine = AlertEngine()
+    engine.set_rules([Rule(1, "Low battery", "battery_below", None, 20, consecutive=2)])
+
+    def reading(level):
+        engine.process("telemetry", {"node_id": "!a", "type": "device", "battery_level": level})
+
+    reading(15)
+    assert _drain(engine) == []  # One low reading is not enough
+    reading(25)
+    reading(15)
+    assert _drain(engine) == []  # The streak was broken
+    reading(14)
+    assert _drain(engine) == [("!a", FIRING)]
+    reading(30)
+    assert _drain(engine) == []
+    reading(31)
+    assert _drain(engine) == [("!a", RESOLVED)]
+
+
+def test_rules_only_see_their_node():
+    engine = AlertEngine()
+    engine.set_rules([Rule(1, "Busy", "channel_utilization_above", "!a", 50)])
+
+    engine.process("telemetry", {"node_id": "!b", "type": "device", "channel_utilization": 90})
+    engine.process("telemetry", {"node_id": "!a", "type": "device", "channel_utilization": 90})
+
+    assert _drain(engine) == [("!a", FIRING)]
+
+
+def test_geofence_alerts_on_crossing_only():
+    engine = AlertEngine()
+    engine.set_rules([Rule(1, "Base", "geofence_leave", None, 100, latitude=50.0, longitude=8.0)])
+
+    def position(lat):
+        engine.process("position", {"node_id": "!a", "latitude": lat, "longitude": 8.0})
+
+    position(51.0)  # First sighting, already outside: no alert
+    assert _drain(engine) == []
+    position(50.0)  # Back inside: nothing was announced, so nothing resolves
+    assert _drain(engine) == []
+    position(50.01)  # About 1.1 km out
+    assert _drain(engine) == [("!a", FIRING)]
+    position(50.0)
+    assert _drain(engine) == [("!a", RESOLVED)]
+
+
+def test_silence_fires_from_the_heap_and_is_pushed_back_by_traffic():
+    engine = AlertEngine()
+    start = time.time()
+    engine._heard["!a"] = start
+    engine.set_rules([Rule(1, "Quiet", "silent", None, 10)])  # Minutes
+
+    engine.advance(start + 599)
+    assert _drain(engine) == []
+
+    engine._heard["!a"] = start + 300  # Heard again: the deadline moves to start + 900
+    engine.advance(start + 601)
+    assert _drain(engine) == []
+    engine.advance(start + 901)
+    alerts = engine._outbox[:]
+    assert _drain(engine) == [("!a", FIRING)]
+    assert alerts[0]["value"] == 10.0
+
+    engine.advance(start + 2000)
+    assert _drain(engine) == []  # Fires once
+
+    engine.process("position", {"node_id": "!a", "latitude": 1.0, "longitude": 1.0})
+    assert _drain(engine) == [("!a", RESOLVED)]
+
+
+def test_nodes_silent_at_load_neither_fire_nor_resolve():
+    engine = AlertEngine()
+    engine._heard["!gone"] = time.time() - 3600
+    engine.set_rules([Rule(1, "Quiet", "silent", None, 10)])
+
+    engine.advance()
+    engine.process("position", {"node_id": "!gone", "latitude": 1.0, "longitude": 1.0})
+
+    assert _drain(engine) == []
+
+
+def test_removed_rule_leaves_no_pending_deadlines():
+    engine = AlertEngine()
+    engine._heard["!a"] = time.time()
+    engine.set_rules([Rule(1, "Quiet", "silent", "!a", 1)])
+
+    engine.remove_rule(1)
+    engine.advance(time.time() + 120)
+
+    assert _drain(engine) == []
@@ -0,0 +1,41 @@
+"""Secrets are stripped from the cached device config."""
+import json
+from types import SimpleNamespace
+
+from meshtastic.protobuf import localonly_pb2
+
+from app.device_config import DeviceConfigCache
+
+
+def _interface(local_config=None, module_config=None):
+    node = SimpleNamespace(channels=[], localConfig=local_config, moduleConfig=module_config)
+    return SimpleNamespace(localNode=node, metadata=None)
+
+
+def test_wifi_psk_is_redacted():
+    config = localonly_pb2.LocalConfig()
+    config.network.wifi_ssid = "meshnet"
+    config.network.wifi_psk = "hunter2"
+    config.security.private_key = b"\x01" * 32
+    config.security.admin_key.append(b"\x02" * 32)
+
+    cache = DeviceConfigCache()
+    sections, _ = cache.all(_interface(local_config=config))
+    body = json.dumps(sections)
+
+    assert "hunter2" not in body
+    assert "wifiPsk" not in body
+    assert "privateKey" not in body and "adminKey" not in body
+    assert sections["local_config"]["network"]["wifiSsid"] == "meshnet"
+
+
+def test_module_config_passwords_are_redacted():
+    config = localonly_pb2.LocalModuleConfig()
+    config.mqtt.username = "mesh"
+    config.mqtt.password = "s3cret"
+
+    value, etag = DeviceConfigCache().get("module_config", _interface(module_config=config))
+
+    assert "s3cret" not in json.dumps(value)
+    assert value["mqtt"]["username"] == "mesh"
+    assert etag
@@ -0,0 +1,89 @@
+"""Typed radio events: payloads, rows and encodings."""
+import json
+from datetime import datetime
+
+from app.events import (
+    AckEvent, AdminEvent, ConnectionEvent, DeviceTelemetry, MessageEvent, RawPacketEvent,
+    RoutingEvent, TracerouteErrorEvent, WaypointEvent
+)
+from app.ws_encoding import dumps, packb
+
+TS_MS = 1_700_000_000_123
+TIMESTAMP = datetime.fromtimestamp(TS_MS / 1000)
+
+
+def test_payload_matches_dict_form():
+    event = MessageEvent("!a", "!b", 0, "hi", ts_ms=TS_MS)
+    event.set_radio("radio1")
+
+    assert event.to_dict() == {
+        "from_node_id": "!a", "to_node_id": "!b", "channel": 0, "text": "hi",
+        "timestamp": TIMESTAMP.isoformat(), "radio": "radio1"
+    }
+    assert event.get("text") == "hi"
+    assert event["radio"] == "radio1"
+    assert dict(event) == event.to_dict()
+
+
+def test_row_drops_none_and_moves_node_to_its_column():
+    event = DeviceTelemetry("!a", ts_ms=TS_MS, battery_level=90, voltage=None)
+
+    row = event.to_row()
+
+    assert row["timestamp"] == TIMESTAMP
+    assert row["type"] == "telemetry"
+    assert row["node_id"] == "!a"
+    assert row["data"] == {"type": "device", "battery_level": 90}
+
+
+def test_optional_fields_are_left_out():
+    assert "error" not in AckEvent("!b", "hi", True).to_dict()
+    assert AckEvent("!b", "hi", False, "NO_ROUTE").to_dict()["error"] == "NO_ROUTE"
+    assert AckEvent("!b", "hi", True).to_row()["node_id"] is None
+
+
+def test_events_without_a_node():
+    assert TracerouteErrorEvent("!b", "TIMEOUT").to_row()["node_id"] is None
+    waypoint = WaypointEvent("!a", 7, "camp", None, 1.5, 2.5, None, None)
+    assert waypoint.to_row()["node_id"] == "!a"
+    assert waypoint.to_dict()["id"] == 7
+
+
+def test_raw_payloads_are_json_safe_in_rows_and_frames():
+    event = AdminEvent("!a", {"portnum": "ADMIN_APP", "payload": b"\x01\x02"})
+
+    row = event.to_row()
+    json.dumps(row["data"])  # Bytes were stringified
+    assert row["data"]["raw"]["portnum"] == "ADMIN_APP"
+    frame = json.loads(dumps({"type": "admin", "data": event}))
+    assert frame["data"]["from_node_id"] == "!a"
+    assert packb({"type": "admin", "data": event})
+
+    routing = RoutingEvent("!a", "!b", 42, "NONE", {"errorReason": "NONE"})
+    assert routing.to_dict()["raw"] == {"errorReason": "NONE"}
+
+
+def test_raw_packet_event():
+    event = RawPacketEvent("PRIVATE_APP", "!a", "!b", {"payload": b"x"}, 1, 2.5, -90, 2, 3)
+    assert event.to_dict()["portnum"] == "PRIVATE_APP"
+    assert event.to_row()["node_id"] == "!a"
+
+
+def test_connection_event_keeps_status_keys():
+    event = ConnectionEvent({"connected": False, "reconnecting": True, "attempt": 2}, ts_ms=TS_MS)
+    event.set_radio("radio1")
+
+    assert event.to_dict() == {"connected": False, "reconnecting": True, "attempt": 2, "radio": "radio1"}
+    assert event.get("attempt") == 2
+    assert "reconnecting" in event
+    row = event.to_row()
+    assert row["node_id"] is None and row["radio"] == "radio1"
+    assert row["data"] == {"connected": False, "reconnecting": True, "attempt": 2}
+
+
+def test_cached_forms_are_rebuilt_after_changes():
+    event = MessageEvent("!a", "!b", 0, "hi", ts_ms=TS_MS)
+    before = event.to_json()
+    assert event.to_json() is before
+    event.set_time(TS_MS + 1000)
+    assert event.to_json() != before
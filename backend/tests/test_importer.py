@@ -0,0 +1,115 @@
+"""Importer: dataset detection and the deterministic rows re-imports are deduplicated on."""
+import asyncio
+import gzip
+import json
+
+import pytest
+from sqlalchemy import Boolean, Float, Integer, String
+
+from app.importer import (ImportFileError, Importer, _capture_decoder, _coerce, detect_dataset, detect_format,
+                          record_to_events)
+
+PACKET = {"from": 0x1234, "fromId": "!00001234", "to": 0xffffffff, "toId": "^all", "id": 42,
+          "rxTime": 1700000000, "channel": 0, "decoded": {"portnum": "TEXT_MESSAGE_APP", "text": "hello"}}
+
+
+def test_dataset_and_format_come_from_the_file_name():
+    assert detect_dataset("/tmp/telemetry-20250401-120000.csv.gz") == "telemetry"
+    assert detect_dataset("Messages.ndjson") == "messages"
+    assert detect_format("nodes.csv.gz") == "csv"
+    assert detect_format("capture.jsonl") == "ndjson"
+    with pytest.raises(ImportFileError, match="rebuilt from the event log"):
+        detect_dataset("telemetry_samples-20250401.csv")
+    with pytest.raises(ImportFileError):
+        detect_dataset("backup.csv")
+    with pytest.raises(ImportFileError):
+        detect_format("telemetry.parquet")
+
+
+def test_csv_fields_are_typed_by_column():
+    assert _coerce(Integer(), "3.0") == 3
+    assert _coerce(Float(), "3.5") == 3.5
+    assert _coerce(Boolean(), "True") is True
+    assert _coerce(Boolean(), "0") is False
+    assert _coerce(String(), "") is None
+    assert _coerce(None, "x") == "x"
+
+
+def _rows(dataset, record, decoder=None):
+    return [data.to_row() for _, data in record_to_events(dataset, record, decoder)]
+
+
+def test_reimported_records_give_identical_rows():
+    record = {"timestamp": "2025-04-01T12:00:00.250000", "node_id": "!a", "battery_level": 80,
+              "voltage": 4.1, "channel_utilization": None}
+
+    first, second = _rows("telemetry", record), _rows("telemetry", dict(record))
+
+    assert first == second
+    assert first[0]["timestamp"].isoformat() == record["timestamp"]
+    assert first[0]["data"] == {"type": "device", "battery_level": 80, "voltage": 4.1}
+
+
+def test_captured_packets_are_stamped_with_their_receive_time():
+    decoder = _capture_decoder()
+
+    first, second = _rows("capture", dict(PACKET), decoder), _rows("capture", dict(PACKET), decoder)
+
+    assert first == second
+    assert first[0]["type"] == "message" and first[0]["node_id"] == "!00001234"
+    assert first[0]["timestamp"].timestamp() == PACKET["rxTime"]
+
+
+def test_captured_packets_without_receive_time_are_rejected():
+    decoder = _capture_decoder()
+    packet = {k: v for k, v in PACKET.items() if k != "rxTime"}
+
+    with pytest.raises(ValueError, match="no rxTime"):
+        record_to_events("capture", packet, decoder)
+
+
+def _import(path, batch_size=100):
+    """Run import_file with the database loaders replaced; returns the importer and the event batches."""
+    importer = Importer(batch_size=batch_size)
+    batches = []
+
+    async def load_events(rows):
+        if rows:
+            batches.append(list(rows))  # flush() reuses the list
+
+    async def load_direct(records):
+        assert not records
+
+    importer.load_events = load_events
+    importer.load_outgoing_messages = load_direct
+    asyncio.run(importer.import_file(str(path), detect_dataset(str(path)), detect_format(str(path))))
+    return importer, batches
+
+
+def test_import_file_batches_rows_for_the_loaders(tmp_path):
+    path = tmp_path / "positions-20250401.ndjson.gz"
+    records = [{"timestamp": "2025-04-01T12:00:00", "node_id": "!a", "latitude": 50.0, "longitude": 8.0},
+               {"timestamp": "2025-04-01T12:00:00", "node_id": "!a", "latitude": 50.0, "longitude": 8.0},
+               {"timestamp": "2025-04-01T12:02:00", "node_id": "!b", "latitude": 51.0, "longitude": 9.0}]
+    with gzip.open(path, "wt") as f:
+        f.write("\n".join(json.dumps(record) for record in records) + "\nnot json\n")
+
+    importer, batches = _import(path, batch_size=2)
+
+    # The repeated record gives an identical row, which load_events inserts once
+    assert [len(rows) for rows in batches] == [2, 1]
+    assert batches[0][0] == batches[0][1]
+    assert batches[1][0]["node_id"] == "!b"
+    assert importer.counts["records"] == 3
+
+
+def test_capture_import_skips_packets_without_receive_time(tmp_path):
+    path = tmp_path / "capture-field-kit.ndjson"
+    packets = [PACKET, {**PACKET, "id": 43, "rxTime": 0}, {k: v for k, v in PACKET.items() if k != "rxTime"}]
+    path.write_text("\n".join(json.dumps(packet) for packet in packets) + "\n")
+
+    importer, batches = _import(path)
+
+    assert len(batches) == 1 and len(batches[0]) == 1
+    assert batches[0][0]["timestamp"].timestamp() == PACKET["rxTime"]
+    assert importer.counts["skipped"] == 2
@@ -0,0 +1,75 @@
+"""Per-radio ingest thread: stopping with a full queue."""
+import asyncio
+import queue
+import threading
+
+import pytest
+
+from app import meshtastic_client
+from app.meshtastic_client import MeshtasticClient
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(meshtastic_client, "INGEST_STOP_TIMEOUT", 0.5)
+    client = MeshtasticClient(radio_id="test", transport="tcp")
+    client.decoded = []
+    client.release = threading.Event()
+
+    def process(packet):
+        client.release.wait()
+        client.decoded.append(packet)
+
+    client._process_packet = process
+    return client
+
+
+def _fill(client, n):
+    client._start_ingest()
+    for i in range(n):
+        client._ingest_queue.put(i, timeout=1)
+    return client._ingest_thread
+
+
+def test_stop_decodes_the_backlog_first(client):
+    thread = _fill(client, client._ingest_queue.maxsize)
+    client.release.set()
+
+    asyncio.run(client._stop_ingest())
+
+    assert not thread.is_alive()
+    assert client._ingest_thread is None
+    assert len(client.decoded) == client._ingest_queue.maxsize
+
+
+def test_stop_gets_through_a_queue_that_does_not_drain(client, monkeypatch):
+    monkeypatch.setattr(client.settings, "ingest_queue_size", 4)
+    client._ingest_queue = queue.Queue(maxsize=4)
+    thread = _fill(client, 5)  # One being decoded, four queued
+    threading.Timer(0.7, client.release.set).start()  # Stuck past the sentinel timeout
+
+    asyncio.run(client._stop_ingest())
+
+    assert not thread.is_alive()
+    assert client.decoded == [0]
+    assert client.ingest_stats()["dropped"] == 4
+
+
+def test_reconnect_while_stopping_gets_its_own_thread(client):
+    old = _fill(client, 3)
+
+    async def run():
+        stopping = asyncio.create_task(client._stop_ingest())
+        await asyncio.sleep(0)
+        client._start_ingest()
+        client._ingest_queue.put_nowait("new")
+        client.release.set()
+        await stopping
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+
+    assert not old.is_alive()
+    assert client._ingest_thread.is_alive()
+    assert sorted(client.decoded, key=str) == [0, 1, 2, "new"]  # Old and new threads run side by side
+    asyncio.run(client._stop_ingest())
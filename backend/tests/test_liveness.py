@@ -0,0 +1,61 @@
+"""Node liveness: online/recent/offline transitions from the deadline heap."""
+import time
+
+import pytest
+
+from app.liveness import LivenessIndex, OFFLINE, ONLINE, RECENT, UNKNOWN
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = LivenessIndex()
+    monkeypatch.setattr(index.settings, "liveness_online_threshold", 100)
+    monkeypatch.setattr(index.settings, "liveness_recent_threshold", 1000)
+    return index
+
+
+def _statuses(transitions):
+    return [(t["node_id"], t["previous"], t["status"]) for t in transitions]
+
+
+def test_nodes_age_through_each_state_once(index):
+    start = time.time()
+    index.heard("!a", start)
+    index.heard("!b", start - 500)
+    index.heard("^all", start)  # Not a node
+
+    assert index.advance(start) == []  # First sightings are not transitions
+    assert index.counts() == {ONLINE: 1, RECENT: 1, OFFLINE: 0, UNKNOWN: 0}
+
+    assert _statuses(index.advance(start + 101)) == [("!a", ONLINE, RECENT)]
+    assert _statuses(index.advance(start + 501)) == [("!b", RECENT, OFFLINE)]
+    assert _statuses(index.advance(start + 1001)) == [("!a", RECENT, OFFLINE)]
+    assert index.advance(start + 5000) == []
+    assert index.counts() == {ONLINE: 0, RECENT: 0, OFFLINE: 2, UNKNOWN: 0}
+
+
+def test_hearing_a_node_again_reschedules_it(index):
+    start = time.time()
+    index.heard("!a", start - 90)
+    index.heard("!a", start)  # The entry due at start + 10 is now stale
+
+    assert index.advance(start + 50) == []
+    assert index.status("!a") == ONLINE
+    assert _statuses(index.advance(start + 101)) == [("!a", ONLINE, RECENT)]
+
+    index.heard("!a", start - 10)  # Older than what we have: ignored
+    index.heard("!a")
+    transitions = index.advance()
+    assert _statuses(transitions) == [("!a", RECENT, ONLINE)]
+    assert transitions[0]["last_heard"] is not None
+
+
+def test_seed_marks_nodes_without_last_heard_unknown(index):
+    index.seed({"!a": {"lastHeard": time.time()}, "!b": {}, "!c": "not a node"})
+
+    assert index.status("!a") == ONLINE
+    assert index.status("!b") == UNKNOWN
+    assert index.snapshot()["counts"][UNKNOWN] == 1
+
+    index.heard("!b")
+    assert _statuses(index.advance()) == [("!b", UNKNOWN, ONLINE)]
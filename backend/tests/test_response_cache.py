@@ -0,0 +1,113 @@
+"""Response cache: hits, tag invalidation and concurrent misses."""
+import asyncio
+import json
+from typing import List
+
+import pytest
+from fastapi import Request
+from pydantic import TypeAdapter
+
+from app.response_cache import ResponseCache
+
+ADAPTER = TypeAdapter(List[int])
+
+
+def _request(etag: str = None) -> Request:
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache()
+    monkeypatch.setattr(cache.settings, "response_cache_ttl", 60.0)
+    monkeypatch.setattr(cache.settings, "response_cache_size", 100)
+    monkeypatch.setattr(cache.settings, "response_cache_max_bytes", 1 << 20)
+    return cache
+
+
+class Table:
+    """Stand-in for a query, counting how often it runs."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    async def load(self):
+        self.queries += 1
+        await asyncio.sleep(0)
+        return list(self.rows)
+
+
+def _get(cache, key, tags, table, etag=None):
+    return cache.respond(_request(etag), key, tags, table.load, ADAPTER)
+
+
+def test_hits_until_a_tag_is_invalidated(cache):
+    nodes, messages = Table([1, 2]), Table([3])
+
+    async def run():
+        first = await _get(cache, "nodes", ["nodes"], nodes)
+        again = await _get(cache, "nodes", ["nodes"], nodes)
+        await _get(cache, ("messages", 0), ["messages:0", "nodes"], messages)
+        assert json.loads(first.body) == [1, 2] and again.body == first.body
+        assert nodes.queries == 1
+
+        not_modified = await _get(cache, "nodes", ["nodes"], nodes, etag=first.headers["etag"])
+        assert not_modified.status_code == 304
+
+        cache.invalidate(["messages:0"])
+        assert "nodes" in cache._entries and ("messages", 0) not in cache._entries
+        nodes.rows = [1, 2, 5]
+        cache.invalidate(["nodes"])
+        assert not cache._entries and not cache._by_tag
+        changed = await _get(cache, "nodes", ["nodes"], nodes, etag=first.headers["etag"])
+        assert json.loads(changed.body) == [1, 2, 5]
+        assert nodes.queries == 2
+
+    asyncio.run(run())
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (2, 3, 2)
+
+
+def test_response_loaded_across_an_invalidation_is_not_stored(cache):
+    table = Table([1])
+
+    async def load():
+        rows = await table.load()
+        cache.invalidate(["nodes"])  # The table changed while the query ran
+        return rows
+
+    async def run():
+        await cache.respond(_request(), "nodes", ["nodes"], load, ADAPTER)
+        assert "nodes" not in cache._entries
+        cache.clear()
+        await _get(cache, "nodes", ["nodes"], table)
+        assert "nodes" in cache._entries
+
+    asyncio.run(run())
+
+
+def test_concurrent_misses_share_one_query(cache):
+    table = Table([7])
+
+    async def run():
+        return await asyncio.gather(*(_get(cache, "nodes", ["nodes"], table) for _ in range(5)))
+
+    responses = asyncio.run(run())
+
+    assert table.queries == 1
+    assert {response.body for response in responses} == {b"[7]"}
+    assert cache.stats()["shared"] == 4
+
+
+def test_disabled_cache_always_queries(cache, monkeypatch):
+    monkeypatch.setattr(cache.settings, "response_cache_ttl", 0)
+    table = Table([1])
+
+    async def run():
+        for _ in range(2):
+            await _get(cache, "nodes", ["nodes"], table)
+
+    asyncio.run(run())
+    assert table.queries == 2 and not cache._entries
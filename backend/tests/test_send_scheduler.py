@@ -0,0 +1,116 @@
+"""Outbound scheduler: priority order, pacing, cancellation and token refunds."""
+import asyncio
+import time
+
+import pytest
+
+from app.send_scheduler import OutboundScheduler, Priority, QueueFullError
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = OutboundScheduler()
+    monkeypatch.setattr(scheduler.settings, "send_rate", 50.0)
+    monkeypatch.setattr(scheduler.settings, "send_min_rate", 0.1)
+    monkeypatch.setattr(scheduler.settings, "send_burst", 10)
+    monkeypatch.setattr(scheduler.settings, "send_queue_size", 100)
+    return scheduler
+
+
+def test_higher_priority_is_sent_first(scheduler):
+    sent = []
+
+    async def run():
+        jobs = [
+            scheduler.submit(lambda name=name: sent.append(name), priority, name)
+            for name, priority in (("bulk", Priority.BULK), ("traceroute", Priority.TRACEROUTE),
+                                   ("dm", Priority.DM), ("broadcast", Priority.BROADCAST), ("dm2", Priority.DM))
+        ]
+        await asyncio.gather(*(job.future for job in jobs))
+
+    asyncio.run(run())
+
+    assert sent == ["dm", "dm2", "broadcast", "bulk", "traceroute"]
+    assert scheduler.stats()["sent"] == 5
+
+
+def test_sends_are_paced_once_the_burst_is_spent(scheduler, monkeypatch):
+    monkeypatch.setattr(scheduler.settings, "send_rate", 20.0)
+    monkeypatch.setattr(scheduler.settings, "send_burst", 1)
+
+    async def run():
+        started = time.monotonic()
+        await asyncio.gather(*(scheduler.run(lambda: None, Priority.DM) for _ in range(3)))
+        return time.monotonic() - started
+
+    # One token up front, then one every 1/20 s
+    assert asyncio.run(run()) >= 0.09
+
+
+def test_rate_follows_channel_utilization_per_radio(scheduler, monkeypatch):
+    monkeypatch.setattr(scheduler.settings, "send_rate", 10.0)
+
+    scheduler.report_airtime(37.5, None, local=True, owner="a")  # Halfway to congested
+    assert scheduler.current_rate("a") == pytest.approx(5.0)
+    assert scheduler.current_rate("b") == 10.0
+
+    scheduler.report_airtime(80.0, None, local=True, owner="a")
+    assert scheduler.current_rate("a") == pytest.approx(0.1)
+
+    scheduler.report_airtime(None, 6.5, local=True, owner="b")  # air_util_tx halfway to the limit
+    assert scheduler.current_rate("b") == pytest.approx(5.0)
+
+
+def test_cancelled_jobs_are_skipped_and_the_token_refunded(scheduler, monkeypatch):
+    monkeypatch.setattr(scheduler.settings, "send_burst", 2)
+    sent = []
+
+    async def run():
+        cancelled = scheduler.submit(lambda: sent.append("cancelled"), Priority.DM)
+        assert scheduler.cancel(cancelled.id)
+        assert not scheduler.cancel(cancelled.id)
+        await asyncio.sleep(0.05)  # Worker takes a token, finds nothing, refunds it
+        pacer = scheduler._pacer(None)
+        assert pacer.tokens <= 2.0
+        await scheduler.run(lambda: sent.append("sent"), Priority.DM)
+        return cancelled
+
+    cancelled = asyncio.run(run())
+
+    assert sent == ["sent"]
+    assert cancelled.future.cancelled()
+    stats = scheduler.stats()
+    assert stats["cancelled"] == 1 and stats["sent"] == 1 and stats["depth"] == 0
+
+
+def test_cancelling_the_caller_cancels_the_queued_job(scheduler, monkeypatch):
+    monkeypatch.setattr(scheduler.settings, "send_rate", 0.5)
+    monkeypatch.setattr(scheduler.settings, "send_min_rate", 0.5)
+    monkeypatch.setattr(scheduler.settings, "send_burst", 1)
+    sent = []
+
+    async def run():
+        await scheduler.run(lambda: sent.append(1), Priority.DM)  # Spends the only token
+        waiting = asyncio.create_task(scheduler.run(lambda: sent.append(2), Priority.DM))
+        await asyncio.sleep(0.05)
+        assert scheduler.depth == 1
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        return scheduler.depth
+
+    assert asyncio.run(run()) == 0
+    assert sent == [1]
+
+
+def test_queue_full_is_rejected(scheduler, monkeypatch):
+    monkeypatch.setattr(scheduler.settings, "send_queue_size", 1)
+
+    async def run():
+        scheduler.submit(lambda: None, Priority.BULK)
+        with pytest.raises(QueueFullError):
+            scheduler.submit(lambda: None, Priority.BULK)
+        scheduler.cancel_all("test")
+
+    asyncio.run(run())
+    assert scheduler.stats()["rejected"] == 1
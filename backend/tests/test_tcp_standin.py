@@ -0,0 +1,66 @@
+"""The TCP transport against the stand-in node from tools/tcp_standin.py.
+
+Run from backend/:  python -m pytest tests
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.config import get_settings
+from tools.tcp_standin import StandinNode, start
+
+NODE_NUM = 0x5EED0001
+
+
+@pytest.fixture
+def standin_port():
+    """Run the stand-in on a free port in its own event loop thread."""
+    loop = asyncio.new_event_loop()
+    node = StandinNode(NODE_NUM, NODE_NUM + 1, chatter=0.2)
+    server = loop.run_until_complete(start("127.0.0.1", 0, node))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield server.sockets[0].getsockname()[1]
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def tcp_settings(monkeypatch, standin_port):
+    monkeypatch.setenv("MESHTASTIC_TRANSPORT", "tcp")
+    monkeypatch.setenv("MESHTASTIC_TCP_HOST", "127.0.0.1")
+    monkeypatch.setenv("MESHTASTIC_TCP_PORT", str(standin_port))
+    get_settings.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
+
+
+def test_tcp_client_connects_to_standin(tcp_settings):
+    from app.meshtastic_client import MeshtasticClient
+
+    async def run():
+        client = MeshtasticClient()
+        assert client.transport == "tcp"
+        messages = asyncio.Queue()
+
+        def on_event(event_type, data):
+            if event_type == "message":
+                messages.put_nowait(data)
+
+        client.add_event_callback(on_event)
+        try:
+            assert await client.connect(), client.last_error
+            assert client.connected
+            assert client.my_node_num == NODE_NUM
+            assert f"!{NODE_NUM + 1:08x}" in client.get_nodes()
+
+            # Chatter from the fake remote node comes through the live handlers
+            message = await asyncio.wait_for(messages.get(), timeout=10)
+            assert message.get("from_node_id") == f"!{NODE_NUM + 1:08x}"
+            assert message.get("text").startswith("standin chatter")
+        finally:
+            await client.disconnect()
+
+    asyncio.run(run())
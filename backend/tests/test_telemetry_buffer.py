@@ -0,0 +1,81 @@
+"""In-memory telemetry ring buffers and the history route's DB fallback."""
+import asyncio
+import time
+
+import pytest
+
+from app.routers import telemetry
+from app.telemetry_buffer import RingSeries, TelemetryBuffers, TELEMETRY_FIELDS
+
+
+def test_ring_series_keeps_integer_metrics_exact():
+    series = RingSeries(TELEMETRY_FIELDS["device"], capacity=4)
+    uptime = 2 ** 24 + 1  # About 194 days; float32 would round it
+    series.append(1000.0, {"uptime_seconds": uptime, "battery_level": 80})
+
+    _, columns = series.window(0)
+
+    assert columns["uptime_seconds"] == [uptime]
+    assert columns["battery_level"] == [80]
+    assert columns["voltage"] == [None]
+
+
+def test_ring_series_overwrites_oldest_once_full():
+    series = RingSeries(("battery_level",), capacity=3)
+    for i in range(5):
+        series.append(float(i), {"battery_level": i})
+
+    timestamps, columns = series.window(0)
+
+    assert series.full
+    assert series.oldest() == 2.0
+    assert timestamps == [2.0, 3.0, 4.0]
+    assert columns["battery_level"] == [2, 3, 4]
+    assert series.window(3.5)[0] == [4.0]
+
+
+def _history(monkeypatch, buffers, node_id, seconds=3600):
+    """Call the history route with ``buffers``, recording the DB range it asks for."""
+    queried = []
+
+    async def query_series(db, node_id, kind, fields, start, end):
+        queried.append((start.timestamp(), end.timestamp()))
+        return [start.timestamp()], {field: [1.0] for field in fields}
+
+    monkeypatch.setattr(telemetry, "telemetry_buffers", buffers)
+    monkeypatch.setattr(telemetry, "query_series", query_series)
+    result = asyncio.run(telemetry.get_telemetry_history(node_id, "device", seconds, db=None))
+    return result, queried
+
+
+def test_evicted_node_history_comes_from_the_db(monkeypatch):
+    buffers = TelemetryBuffers()
+    monkeypatch.setattr(buffers.settings, "telemetry_buffer_max_nodes", 2)
+    buffers._started = time.time() - 7200
+    for node in ("!a", "!b", "!c"):  # Evicts !a
+        buffers.record({"node_id": node, "type": "device", "battery_level": 50})
+
+    assert buffers.query("!a", "device", 0)[0] == []
+    result, queried = _history(monkeypatch, buffers, "!a")
+
+    # The whole window, up to now, not just up to process start
+    assert len(queried) == 1
+    start, end = queried[0]
+    assert end >= time.time() - 5
+    assert result["source"] == "db+memory"
+
+    # Heard again: the buffer only covers the time since then
+    buffers.record({"node_id": "!a", "type": "device", "battery_level": 60})
+    _, queried = _history(monkeypatch, buffers, "!a")
+    assert queried[0][1] > buffers._started + 3600
+
+
+def test_unevicted_node_history_uses_memory_since_start(monkeypatch):
+    buffers = TelemetryBuffers()
+    buffers._started = time.time() - 60
+    buffers.record({"node_id": "!a", "type": "device", "battery_level": 50})
+
+    result, queried = _history(monkeypatch, buffers, "!a")
+
+    assert queried[0][1] == pytest.approx(buffers._started, abs=1e-3)
+    assert result["values"]["battery_level"][-1] == 50
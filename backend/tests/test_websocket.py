@@ -0,0 +1,56 @@
+"""WebSocket endpoint on an API worker whose calls to the ingest process fail."""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.event_bus import ROLE_API, BusUnavailableError, RemoteError
+from app.routers import websocket
+
+
+@pytest.fixture
+def failing_bus(monkeypatch):
+    """A worker whose bus raises the next error in ``errors`` on each call."""
+    errors = []
+
+    async def call(method, **kwargs):
+        raise errors.pop(0)
+
+    monkeypatch.setattr(websocket.event_bus, "role", ROLE_API)
+    monkeypatch.setattr(websocket.event_bus, "call", call)
+    app = FastAPI()
+    app.include_router(websocket.router)
+    return TestClient(app), errors
+
+
+@pytest.mark.parametrize("error", [
+    RemoteError("AttributeError", "no radio"),
+    asyncio.TimeoutError(),
+    BusUnavailableError("Ingest process not connected"),
+])
+def test_status_falls_back_to_disconnected(failing_bus, error):
+    client, errors = failing_bus
+    errors.append(error)
+
+    with client.websocket_connect("/ws") as ws:
+        assert ws.receive_json()["type"] == "resume"
+        message = ws.receive_json()
+        assert message["type"] == "connection"
+        assert message["data"]["connected"] is False
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+
+
+def test_failed_sends_are_reported(failing_bus):
+    client, errors = failing_bus
+    errors.extend([RemoteError("ValueError", "bad destination"), RemoteError("ValueError", "bad destination"),
+                   asyncio.TimeoutError()])
+
+    with client.websocket_connect("/ws") as ws:
+        ws.receive_json()  # resume
+        ws.receive_json()  # connection
+        ws.send_json({"type": "send_message", "text": "hi", "destination": "!a"})
+        assert ws.receive_json()["data"] == {"success": False, "text": "hi", "error": "bad destination"}
+        ws.send_json({"type": "traceroute", "destination": "!a"})
+        assert ws.receive_json() == {"type": "traceroute_sent", "data": {"success": False, "destination": "!a"}}
@@ -0,0 +1,76 @@
+"""WebSocket frame encoding: the built-in MessagePack encoder and JSON splicing."""
+import json
+import struct
+
+import pytest
+
+from app.events import MessageEvent
+from app.ws_encoding import FIELD_KEYS, KEY_INDEX, MSGPACK, dumps, encode, hello, packb
+
+msgpack = pytest.importorskip("msgpack")
+
+
+def _expand(obj):
+    """Short integer keys back to field names, as a client does with the hello table."""
+    if isinstance(obj, dict):
+        return {FIELD_KEYS[k] if isinstance(k, int) else k: _expand(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_expand(item) for item in obj]
+    return obj
+
+
+@pytest.mark.parametrize("value", [
+    0, 127, 128, 255, 256, 65535, 65536, 2**32 - 1, 2**32, 2**63 - 1,
+    -1, -32, -33, -128, -129, -32768, -32769, -2**31, -2**31 - 1, -2**63,
+    "", "x" * 31, "x" * 32, "x" * 256, "x" * 70000, "ü",
+    b"", b"\x00" * 300, True, False, None,
+    list(range(15)), list(range(16)), list(range(70000)),
+])
+def test_scalars_and_containers_match_the_reference_library(value):
+    assert msgpack.unpackb(packb(value), strict_map_key=False) == value
+
+
+def test_maps_use_short_keys_and_drop_nulls():
+    message = {"type": "message", "data": {"text": "hi", "channel": 0, "snr": None, "custom": [1, 2]}}
+
+    packed = msgpack.unpackb(packb(message), strict_map_key=False)
+
+    assert packed == {KEY_INDEX["type"]: "message",
+                      KEY_INDEX["data"]: {KEY_INDEX["text"]: "hi", KEY_INDEX["channel"]: 0, "custom": [1, 2]}}
+    assert msgpack.unpackb(packb(message, short_keys=False))["data"] == {"text": "hi", "channel": 0,
+                                                                         "custom": [1, 2]}
+    wide = {str(i): i for i in range(20)}  # map16
+    assert msgpack.unpackb(packb(wide, short_keys=False)) == wide
+
+
+def test_floats_are_single_precision_only_when_exact():
+    assert packb(0.5) == b"\xca" + struct.pack(">f", 0.5)
+    assert packb(0.1) == b"\xcb" + struct.pack(">d", 0.1)
+    assert packb(1e300) == b"\xcb" + struct.pack(">d", 1e300)
+    assert msgpack.unpackb(packb([0.5, 0.1, -12.25])) == [0.5, 0.1, -12.25]
+
+
+def test_typed_events_are_spliced_into_frames():
+    event = MessageEvent("!a", "^all", 0, "hello", ts_ms=1_700_000_000_000)
+    message = {"type": "message", "data": event, "seq": 3}
+
+    frame = msgpack.unpackb(encode(message, MSGPACK), strict_map_key=False)
+
+    assert _expand(frame) == {"type": "message", "data": event.to_dict(), "seq": 3}
+    assert json.loads(encode(message, "json")) == {"type": "message", "seq": 3, "data": event.to_dict()}
+
+
+def test_dumps_follows_batches_and_bus_messages():
+    event = MessageEvent("!a", None, 0, "hi")
+    batch = [{"type": "message", "data": event}, {"type": "ping"}]
+    bus = {"channel": "events", "message": {"type": "message", "data": event}}
+
+    assert json.loads(dumps(batch)) == [{"type": "message", "data": event.to_dict()}, {"type": "ping"}]
+    assert json.loads(dumps(bus))["message"]["data"] == event.to_dict()
+    assert json.loads(dumps({"data": None})) == {"data": None}
+
+
+def test_hello_sends_the_key_table_with_long_keys():
+    assert hello("json") is None
+    assert msgpack.unpackb(hello(MSGPACK)) == {"type": "encoding",
+                                               "data": {"encoding": MSGPACK, "keys": FIELD_KEYS}}
@@ -0,0 +1,61 @@
+"""WebSocket replay buffer: resuming from a sequence number."""
+import pytest
+
+from app.ws_replay import ReplayBuffer
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    from app.config import get_settings
+    monkeypatch.setattr(get_settings(), "ws_replay_size", 5)
+    return ReplayBuffer()
+
+
+def _seqs(messages):
+    return [message["seq"] for message in messages]
+
+
+def test_since_replays_what_follows(buffer):
+    for i in range(3):
+        buffer.stamp({"type": "message", "n": i})
+
+    assert _seqs(buffer.since(0)) == [1, 2, 3]
+    assert _seqs(buffer.since(2)) == [3]
+    assert buffer.since(3) == []
+    assert buffer.since(4) is None  # Ahead of this stream
+
+
+def test_since_gives_up_once_events_are_dropped(buffer):
+    for i in range(8):
+        buffer.stamp({"type": "message", "n": i})
+
+    assert _seqs(buffer.since(3)) == [4, 5, 6, 7, 8]
+    assert buffer.since(2) is None  # Event 3 is gone
+    assert buffer.stats()["oldest"] == 4
+
+
+def test_since_rejects_another_stream(buffer):
+    buffer.stamp({"type": "message"})
+
+    assert buffer.since(0, buffer.stream_id) is not None
+    assert buffer.since(0, "elsewhere") is None
+
+
+def test_record_follows_the_ingest_numbering(buffer):
+    buffer.record({"type": "message", "seq": 10}, "ingest")
+    buffer.record({"type": "message", "seq": 11}, "ingest")
+    assert buffer.stream_id == "ingest"
+    assert _seqs(buffer.since(10, "ingest")) == [11]
+
+    buffer.record({"type": "message"}, "ingest")  # Unnumbered: not kept
+    assert buffer.seq == 11
+
+    # A gap means events were missed, so nothing before it can be replayed
+    buffer.record({"type": "message", "seq": 14}, "ingest")
+    assert buffer.since(11, "ingest") is None
+    assert buffer.since(13, "ingest") == [{"type": "message", "seq": 14}]
+
+    # Ingest restarted: numbering starts over on a new stream
+    buffer.record({"type": "message", "seq": 1}, "restarted")
+    assert buffer.since(14, "ingest") is None
+    assert _seqs(buffer.since(0, "restarted")) == [1]
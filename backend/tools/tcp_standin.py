@@ -0,0 +1,227 @@
+"""Local stand-in for a network-attached Meshtastic node.
+
+Speaks the stream API framing used by TCPInterface/SerialInterface
+(0x94 0xC3, 16-bit big-endian length, protobuf payload) so the TCP transport
+can be exercised without hardware:
+
+    python -m tools.tcp_standin --port 4403 --chatter 5
+
+then start the backend with MESHTASTIC_TRANSPORT=tcp MESHTASTIC_TCP_HOST=127.0.0.1.
+
+It answers the config handshake, ACKs DMs that want an ACK, replies to
+traceroutes, and with --chatter periodically injects text and telemetry
+packets from a fake remote node.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import struct
+import time
+from meshtastic import mesh_pb2, portnums_pb2, telemetry_pb2, channel_pb2
+
+logger = logging.getLogger("tcp_standin")
+
+START1 = 0x94
+START2 = 0xC3
+MAX_PAYLOAD = 512
+
+BROADCAST_NUM = 0xFFFFFFFF
+
+
+def frame(message) -> bytes:
+    payload = message.SerializeToString()
+    return bytes([START1, START2]) + struct.pack(">H", len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    """Read one framed payload, skipping any bytes that aren't a frame header."""
+    while True:
+        b = await reader.readexactly(1)
+        if b[0] != START1:
+            continue
+        b = await reader.readexactly(1)
+        if b[0] != START2:
+            continue
+        (length,) = struct.unpack(">H", await reader.readexactly(2))
+        if length > MAX_PAYLOAD:
+            continue
+        return await reader.readexactly(length)
+
+
+class StandinNode:
+    def __init__(self, node_num: int, remote_num: int, chatter: float):
+        self.node_num = node_num
+        self.remote_num = remote_num
+        self.chatter = chatter
+
+    def _node_info(self, num: int, long_name: str, short_name: str, hops: int):
+        info = mesh_pb2.FromRadio()
+        info.node_info.num = num
+        info.node_info.user.id = f"!{num:08x}"
+        info.node_info.user.long_name = long_name
+        info.node_info.user.short_name = short_name
+        info.node_info.last_heard = int(time.time())
+        info.node_info.hops_away = hops
+        return info
+
+    def config_messages(self, config_id: int) -> list:
+        messages = []
+
+        my_info = mesh_pb2.FromRadio()
+        my_info.my_info.my_node_num = self.node_num
+        messages.append(my_info)
+
+        metadata = mesh_pb2.FromRadio()
+        metadata.metadata.firmware_version = "2.5.0.standin"
+        messages.append(metadata)
+
+        messages.append(self._node_info(self.node_num, "Standin Gateway", "STND", 0))
+        messages.append(self._node_info(self.remote_num, "Standin Remote", "RMTE", 1))
+
+        channel = mesh_pb2.FromRadio()
+        channel.channel.index = 0
+        channel.channel.role = channel_pb2.Channel.Role.PRIMARY
+        messages.append(channel)
+
+        complete = mesh_pb2.FromRadio()
+        complete.config_complete_id = config_id
+        messages.append(complete)
+        return messages
+
+    def _packet(self, from_num: int, to_num: int, portnum: int, payload: bytes,
+                request_id: int = 0) -> mesh_pb2.FromRadio:
+        message = mesh_pb2.FromRadio()
+        packet = message.packet
+        setattr(packet, "from", from_num)
+        packet.to = to_num
+        packet.id = random.randint(1, 0x7FFFFFFF)
+        packet.rx_time = int(time.time())
+        packet.rx_snr = round(random.uniform(-5.0, 10.0), 2)
+        packet.rx_rssi = random.randint(-120, -60)
+        packet.hop_start = 3
+        packet.hop_limit = 2
+        packet.decoded.portnum = portnum
+        packet.decoded.payload = payload
+        if request_id:
+            packet.decoded.request_id = request_id
+        return message
+
+    def responses_to(self, to_radio: mesh_pb2.ToRadio) -> list:
+        """Replies for a packet the client put on the air."""
+        packet = to_radio.packet
+        dest = packet.to
+        replies = []
+
+        if packet.decoded.portnum == portnums_pb2.PortNum.TRACEROUTE_APP and packet.decoded.want_response:
+            route = mesh_pb2.RouteDiscovery()
+            route.snr_towards.append(int(random.uniform(-20, 40)))
+            replies.append(self._packet(
+                dest, self.node_num, portnums_pb2.PortNum.TRACEROUTE_APP,
+                route.SerializeToString(), request_id=packet.id
+            ))
+        elif packet.want_ack and dest != BROADCAST_NUM:
+            routing = mesh_pb2.Routing()
+            routing.error_reason = mesh_pb2.Routing.Error.NONE
+            replies.append(self._packet(
+                dest, self.node_num, portnums_pb2.PortNum.ROUTING_APP,
+                routing.SerializeToString(), request_id=packet.id
+            ))
+        return replies
+
+    def chatter_messages(self) -> list:
+        text = self._packet(
+            self.remote_num, BROADCAST_NUM, portnums_pb2.PortNum.TEXT_MESSAGE_APP,
+            f"standin chatter {int(time.time())}".encode("utf-8")
+        )
+
+        telemetry = telemetry_pb2.Telemetry()
+        telemetry.time = int(time.time())
+        telemetry.device_metrics.battery_level = random.randint(20, 100)
+        telemetry.device_metrics.voltage = round(random.uniform(3.5, 4.2), 2)
+        telemetry.device_metrics.channel_utilization = round(random.uniform(0, 40), 2)
+        telemetry.device_metrics.air_util_tx = round(random.uniform(0, 6), 2)
+        telemetry.device_metrics.uptime_seconds = int(time.monotonic())
+        metrics = self._packet(
+            self.remote_num, BROADCAST_NUM, portnums_pb2.PortNum.TELEMETRY_APP,
+            telemetry.SerializeToString()
+        )
+        return [text, metrics]
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        logger.info(f"Client connected: {peer}")
+        chatter_task = None
+
+        async def chatter():
+            while True:
+                await asyncio.sleep(self.chatter)
+                for message in self.chatter_messages():
+                    writer.write(frame(message))
+                await writer.drain()
+
+        try:
+            while True:
+                payload = await read_frame(reader)
+                to_radio = mesh_pb2.ToRadio()
+                try:
+                    to_radio.ParseFromString(payload)
+                except Exception:
+                    continue
+
+                kind = to_radio.WhichOneof("payload_variant")
+                if kind == "want_config_id":
+                    logger.info(f"Config requested (id={to_radio.want_config_id})")
+                    for message in self.config_messages(to_radio.want_config_id):
+                        writer.write(frame(message))
+                    if self.chatter > 0 and chatter_task is None:
+                        chatter_task = asyncio.create_task(chatter())
+                elif kind == "packet":
+                    logger.info(f"Packet to !{to_radio.packet.to:08x} port={to_radio.packet.decoded.portnum}")
+                    for message in self.responses_to(to_radio):
+                        writer.write(frame(message))
+                elif kind == "disconnect":
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            if chatter_task:
+                chatter_task.cancel()
+            writer.close()
+            logger.info(f"Client disconnected: {peer}")
+
+
+async def start(host: str, port: int, node: StandinNode) -> asyncio.AbstractServer:
+    """Listen for clients. Port 0 picks a free port (see ``server.sockets``)."""
+    server = await asyncio.start_server(node.handle, host, port)
+    port = server.sockets[0].getsockname()[1]
+    logger.info(f"Stand-in node !{node.node_num:08x} listening on {host}:{port}")
+    return server
+
+
+async def serve(host: str, port: int, node: StandinNode):
+    server = await start(host, port, node)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local TCP stand-in for a Meshtastic node")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4403)
+    parser.add_argument("--node-num", type=lambda v: int(v, 0), default=0x5EED0001)
+    parser.add_argument("--chatter", type=float, default=0.0,
+                        help="Seconds between injected text/telemetry packets (0 = off)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s")
+    node = StandinNode(args.node_num, args.node_num + 1, args.chatter)
+    try:
+        asyncio.run(serve(args.host, args.port, node))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,12 @@ import axios from 'axios'
 import { useNodesStore } from './nodes'
 import { useMessagesStore } from './messages'
 import { useConsoleStore } from './console'
+import { decodeMsgpack } from '../utils/msgpack'
+
+// Binary frames are much smaller on slow links. Enable with ?ws=msgpack in the
+// page URL or VITE_WS_ENCODING=msgpack at build time.
+const WS_ENCODING = new URLSearchParams(window.location.search).get('ws') ||
+  import.meta.env.VITE_WS_ENCODING || 'json'
 
 export const useConnectionStore = defineStore('connection', () => {
   const connected = ref(false)
@@ -24,6 +30,11 @@ export const useConnectionStore = defineStore('connection', () => {
   const lastScanResult = ref(null)  // Store BLE scan results
   const scanning = ref(false)
 
+  // Position in the server's event stream, sent back when reconnecting so
+  // only the missed events are replayed instead of reloading everything
+  let streamId = null
+  let lastSeq = null
+
   const status = computed(() => ({
     connected: connected.value,
     deviceName: deviceName.value,
@@ -174,9 +185,18 @@ export const useConnectionStore = defineStore('connection', () => {
 
   function initWebSocket() {
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:'
-    const wsUrl = `${protocol}//${window.location.host}/ws`
+    const params = new URLSearchParams()
+    if (WS_ENCODING !== 'json') params.set('encoding', WS_ENCODING)
+    if (streamId !== null && lastSeq !== null) {
+      params.set('resume_from', lastSeq)
+      params.set('stream', streamId)
+    }
+    const query = params.toString()
+    const wsUrl = `${protocol}//${window.location.host}/ws${query ? `?${query}` : ''}`
+    let fieldKeys = []
 
     ws.value = new WebSocket(wsUrl)
+    ws.value.binaryType = 'arraybuffer'
 
     ws.value.onopen = () => {
       console.log('WebSocket connected')
@@ -186,8 +206,8 @@ export const useConnectionStore = defineStore('connection', () => {
     ws.value.onclose = () => {
       console.log('WebSocket disconnected')
       wsConnected.value = false
-      // Reconnect after 3 seconds
-      setTimeout(initWebSocket, 3000)
+      // Reconnect after 2-4 seconds, spread out so clients don't all return at once
+      setTimeout(initWebSocket, 2000 + Math.random() * 2000)
     }
 
     ws.value.onerror = (error) => {
@@ -196,14 +216,60 @@ export const useConnectionStore = defineStore('connection', () => {
 
     ws.value.onmessage = async (event) => {
       try {
-        const message = JSON.parse(event.data)
-        await handleWebSocketMessage(message)
+        let message
+        if (typeof event.data === 'string') {
+          message = JSON.parse(event.data)
+        } else {
+          message = decodeMsgpack(event.data, fieldKeys)
+          if (message.type === 'encoding') {
+            // Key table for the short field keys in the frames that follow
+            fieldKeys = message.data.keys
+            return
+          }
+        }
+        if (message.type === 'resume') {
+          await handleResume(message.data)
+          return
+        }
+        // Events already seen (replayed, then sent again live) are skipped
+        const seen = lastSeq
+        const items = message.type === 'batch' ? message.data : [message]
+        for (const item of items) {
+          if (item.seq != null) {
+            if (seen !== null && item.seq <= seen) continue
+            if (lastSeq === null || item.seq > lastSeq) lastSeq = item.seq
+          }
+          await handleWebSocketMessage(item)
+        }
       } catch (error) {
         console.error('Failed to parse WebSocket message:', error)
       }
     }
   }
 
+  async function handleResume(data) {
+    const isReconnect = streamId !== null
+    streamId = data.stream
+    if (data.resumed) {
+      console.log(`WebSocket resumed, ${data.replayed} missed events`)
+      return
+    }
+    lastSeq = data.seq
+    if (isReconnect && connected.value) {
+      // Too far behind (or the server restarted): reload state from the API
+      console.log('WebSocket could not resume, reloading nodes and messages...')
+      const nodesStore = useNodesStore()
+      const messagesStore = useMessagesStore()
+      try {
+        await nodesStore.fetchNodes()
+        await messagesStore.fetchMessages()
+        await messagesStore.fetchChannels()
+      } catch (err) {
+        console.error('Error reloading data after reconnect:', err)
+      }
+    }
+  }
+
   async function handleWebSocketMessage(message) {
     const nodesStore = useNodesStore()
     const messagesStore = useMessagesStore()
@@ -272,6 +338,10 @@ export const useConnectionStore = defineStore('connection', () => {
       case 'node_update':
         nodesStore.updateNode(message.data)
         break
+      case 'node_status':
+        // Server-side liveness transition (online/recent/offline)
+        nodesStore.applyNodeStatus(message.data)
+        break
       case 'telemetry':
         nodesStore.updateTelemetry(message.data)
         break
@@ -285,6 +355,11 @@ export const useConnectionStore = defineStore('connection', () => {
         // Emit event for broadcast progress - handled by Messages view
         window.dispatchEvent(new CustomEvent('broadcast-progress', { detail: message.data }))
         break
+      case 'alert':
+        // Alert rule fired or cleared - shown by whichever view listens
+        console.log('Alert:', message.data.message)
+        window.dispatchEvent(new CustomEvent('mesh-alert', { detail: message.data }))
+        break
       case 'ack':
         // Update message ACK status in store
         messagesStore.markMessageAcked(message.data)
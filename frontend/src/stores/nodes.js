@@ -4,6 +4,8 @@ import axios from 'axios'
 
 // Status thresholds in milliseconds
 // Per Meshtastic docs: "online" = heard in last 2 hours (used by firmware for mesh scaling)
+// The backend classifies live nodes itself; these are only the fallback for
+// nodes that don't carry a server-provided status (e.g. rows from the database)
 const ONLINE_THRESHOLD = 2 * 60 * 60 * 1000   // 2 hours - matches Meshtastic "online" definition
 const RECENT_THRESHOLD = 24 * 60 * 60 * 1000  // 24 hours - seen today
 
@@ -13,6 +15,8 @@ export const useNodesStore = defineStore('nodes', () => {
   const error = ref(null)
   const pollInterval = ref(null)
   const lastPollTime = ref(null)
+  // Counts per status from the server's liveness index
+  const statusCounts = ref(null)
 
   // Traceroute state
   const tracerouteInProgress = ref(false)
@@ -27,7 +31,9 @@ export const useNodesStore = defineStore('nodes', () => {
     // If this is our connected device, it's always online
     if (isConnectedDevice) return 'online'
 
-    if (!node || !node.last_heard) return 'unknown'
+    if (!node) return 'unknown'
+    if (node.status) return node.status
+    if (!node.last_heard) return 'unknown'
 
     const lastHeard = new Date(node.last_heard).getTime()
     const now = Date.now()
@@ -90,11 +96,15 @@ export const useNodesStore = defineStore('nodes', () => {
     })
   })
 
-  // Count nodes by status
-  const onlineCount = computed(() => nodeList.value.filter(n => getNodeStatus(n) === 'online').length)
-  const recentCount = computed(() => nodeList.value.filter(n => getNodeStatus(n) === 'recent').length)
-  const offlineCount = computed(() => nodeList.value.filter(n => getNodeStatus(n) === 'offline').length)
-  const unknownCount = computed(() => nodeList.value.filter(n => getNodeStatus(n) === 'unknown').length)
+  // Count nodes by status (server counts when available)
+  function countStatus(status) {
+    if (statusCounts.value) return statusCounts.value[status] || 0
+    return nodeList.value.filter(n => getNodeStatus(n) === status).length
+  }
+  const onlineCount = computed(() => countStatus('online'))
+  const recentCount = computed(() => countStatus('recent'))
+  const offlineCount = computed(() => countStatus('offline'))
+  const unknownCount = computed(() => countStatus('unknown'))
 
   const nodesWithPosition = computed(() => {
     return nodeList.value.filter(n => n.latitude && n.longitude)
@@ -110,7 +120,13 @@ export const useNodesStore = defineStore('nodes', () => {
     }
     error.value = null
     try {
-      const response = await axios.get('/api/nodes/live')
+      const [response, statusResponse] = await Promise.all([
+        axios.get('/api/nodes/live'),
+        axios.get('/api/nodes/status', { params: { include_nodes: false } }).catch(() => null)
+      ])
+      if (statusResponse) {
+        statusCounts.value = statusResponse.data.counts
+      }
       // Transform from object to our format
       const statusBreakdown = { online: [], recent: [], offline: [], unknown: [] }
       const newNodes = {}
@@ -187,6 +203,7 @@ export const useNodesStore = defineStore('nodes', () => {
       uptime_seconds: deviceMetrics.uptimeSeconds,
       snr: data.snr,
       hops_away: data.hopsAway,
+      status: data.status,
       // Handle lastHeard: 0 is falsy but valid (epoch), null/undefined means no data
       last_heard: data.lastHeard != null ? new Date(data.lastHeard * 1000).toISOString() : null,
       is_favorite: data.isFavorite || false
@@ -202,6 +219,16 @@ export const useNodesStore = defineStore('nodes', () => {
     }
   }
 
+  // Apply a node_status WebSocket event
+  function applyNodeStatus(data) {
+    if (nodes.value[data.node_id]) {
+      nodes.value[data.node_id].status = data.status
+    }
+    if (data.counts) {
+      statusCounts.value = data.counts
+    }
+  }
+
   function updateTelemetry(data) {
     const id = data.node_id
     if (nodes.value[id]) {
@@ -373,6 +400,7 @@ export const useNodesStore = defineStore('nodes', () => {
     updateNode,
     updateTelemetry,
     updatePosition,
+    applyNodeStatus,
     getNode,
     getNodeStatus,
     isNodeOnline,